@@ -1,9 +1,13 @@
 from fastapi import APIRouter, HTTPException, Depends, status
-from typing import List, Optional
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, List, Optional
 from pydantic import BaseModel
 import structlog
+import uuid
 
+from app.services.bedrock import BedrockAgentService, get_bedrock_service, user_session_id
 from app.utils.auth import get_current_user
+from app.utils.responses import sse_event
 
 router = APIRouter()
 logger = structlog.get_logger()
@@ -26,6 +30,11 @@ class CreateAgentRequest(BaseModel):
     description: str = ""
 
 
+class InvokeAgentRequest(BaseModel):
+    message: str
+    session_id: Optional[str] = None
+
+
 @router.get("/", response_model=List[Agent])
 async def list_agents(
     project_id: Optional[str] = None,
@@ -114,4 +123,57 @@ async def get_agent(
         return mock_agent
     except Exception as e:
         logger.error("Failed to get agent", agent_id=agent_id, error=str(e))
-        raise HTTPException(status_code=500, detail="Internal server error")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+async def _sse_stream(first: Optional[str], chunks: AsyncIterator[str], session_id: str) -> AsyncIterator[bytes]:
+    try:
+        if first is not None:
+            yield sse_event("chunk", {"text": first})
+        async for text in chunks:
+            yield sse_event("chunk", {"text": text})
+        yield sse_event("done", {"session_id": session_id})
+    except Exception as e:
+        # Headers are already sent; report the failure in-band
+        logger.error("Agent stream failed", session_id=session_id, error=str(e))
+        yield sse_event("error", {"detail": "Agent response failed"})
+    finally:
+        await chunks.aclose()
+
+
+@router.post("/{agent_type}/stream")
+async def stream_agent_response(
+    agent_type: str,
+    request: InvokeAgentRequest,
+    current_user: dict = Depends(get_current_user),
+    bedrock: BedrockAgentService = Depends(get_bedrock_service)
+):
+    """Stream an agent's answer as Server-Sent Events while it is generated.
+
+    Emits ``chunk`` events (``{"text": ...}``), then ``done`` with the
+    session ID to continue the conversation, or ``error``.
+    """
+    agent_id = bedrock.agent_id_for(agent_type)
+    if agent_id is None:
+        raise HTTPException(status_code=404, detail="Agent not found")
+    
+    session_id = request.session_id or str(uuid.uuid4())
+    chunks = bedrock.stream_agent(agent_id, user_session_id(current_user['user_id'], session_id), request.message)
+    try:
+        # Wait for the first chunk so failures before any output get a real status code
+        first = await chunks.__anext__()
+    except StopAsyncIteration:
+        first = None
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Failed to invoke agent", agent_type=agent_type, error=str(e))
+        raise HTTPException(status_code=502, detail="Agent invocation failed")
+    
+    logger.info("Agent stream started", agent_type=agent_type, session_id=session_id, user_id=current_user['user_id'])
+    
+    return StreamingResponse(
+        _sse_stream(first, chunks, session_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
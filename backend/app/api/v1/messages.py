@@ -1,10 +1,17 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Query, status
 from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime
 import structlog
 
+from app.api.v1.projects import _has_access
+from app.services.dynamodb import DynamoDBService, get_dynamodb_service
+from app.services.pubsub import get_pubsub
+from app.services.search import get_search_index
 from app.utils.auth import get_current_user
+from app.utils.pagination import PaginationParams
+from app.utils.responses import FastJSONResponse
+from app.utils.search_index import SearchIndex
 
 router = APIRouter()
 logger = structlog.get_logger()
@@ -20,6 +27,39 @@ class Message(BaseModel):
     timestamp: datetime
     parent_message_id: Optional[str] = None
     attachments: List[str] = []
+    reply_count: int = 0
+    last_reply_at: Optional[datetime] = None
+
+
+class Thread(BaseModel):
+    root: Message
+    replies: List[Message]
+    reply_count: int
+    has_more: bool
+
+
+class SearchResult(BaseModel):
+    message: Message
+    score: float
+
+
+class MessageSearchResponse(BaseModel):
+    results: List[SearchResult]
+    total: int
+    page: int
+    page_size: int
+    has_next: bool
+
+
+class ChannelUnread(BaseModel):
+    channel_id: str
+    unread_count: int
+    last_read_message_id: Optional[str] = None
+    last_read_at: Optional[datetime] = None
+
+
+class MarkReadRequest(BaseModel):
+    message_id: str
 
 
 class CreateMessageRequest(BaseModel):
@@ -30,6 +70,22 @@ class CreateMessageRequest(BaseModel):
     attachments: List[str] = []
 
 
+async def _check_project_access(db_service: DynamoDBService, project_id: str, current_user: dict):
+    project = await db_service.get_project(project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    if not _has_access(project['user_id'], project.get('team_members', []), current_user):
+        raise HTTPException(status_code=403, detail="Access denied")
+
+
+async def _check_channel_access(db_service: DynamoDBService, channel_id: str, current_user: dict):
+    """Channels are readable by whoever can access their project"""
+    channel = await db_service.get_channel(channel_id)
+    if not channel:
+        raise HTTPException(status_code=404, detail="Channel not found")
+    await _check_project_access(db_service, channel['project_id'], current_user)
+
+
 class Channel(BaseModel):
     channel_id: str
     name: str
@@ -72,60 +128,194 @@ async def list_channels(
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+@router.get("/search", response_model=MessageSearchResponse)
+async def search_messages(
+    q: str = Query(..., min_length=1, max_length=200),
+    channel_id: Optional[str] = None,
+    project_id: Optional[str] = None,
+    pagination: PaginationParams = Depends(PaginationParams.as_query),
+    current_user: dict = Depends(get_current_user),
+    db_service: DynamoDBService = Depends(get_dynamodb_service),
+    search_index: Optional[SearchIndex] = Depends(get_search_index)
+):
+    """Search message text in a channel or in all channels of a project, best matches first.
+
+    Each API node indexes the messages it has seen since it started (plus
+    the whole table when ``search_backfill_on_startup`` is set), so without
+    the backfill older history is not found after a deploy or restart.
+    """
+    if search_index is None:
+        raise HTTPException(status_code=503, detail="Search is disabled")
+    if not channel_id and not project_id:
+        raise HTTPException(status_code=400, detail="Pass channel_id or project_id")
+    
+    try:
+        if project_id:
+            await _check_project_access(db_service, project_id, current_user)
+            channel_ids = await db_service.get_project_channel_ids(project_id)
+            if channel_id:
+                channel_ids = [channel_id] if channel_id in channel_ids else []
+        else:
+            await _check_channel_access(db_service, channel_id, current_user)
+            channel_ids = [channel_id]
+        
+        # Scored on the event loop, which also writes the index, one channel at a time
+        result = await search_index.search_async(q, channel_ids, offset=pagination.offset, limit=pagination.limit)
+        
+        messages = await db_service.batch_get_messages(result['hits']) if result['hits'] else []
+        scores = {hit['message_id']: hit['score'] for hit in result['hits']}
+        if len(messages) < len(result['hits']):
+            # Deleted, or archived without an archive to read from; drop them from the index and the total
+            found = {item['message_id'] for item in messages}
+            missing = [hit for hit in result['hits'] if hit['message_id'] not in found]
+            for hit in missing:
+                search_index.remove(hit['channel_id'], [hit['message_id']])
+            result['total'] -= len(missing)
+        response = MessageSearchResponse.model_construct(
+            results=[
+                SearchResult.model_construct(message=Message.model_construct(**item), score=scores[item['message_id']])
+                for item in messages
+            ],
+            total=result['total'],
+            page=pagination.page,
+            page_size=pagination.page_size,
+            has_next=pagination.offset + pagination.limit < result['total']
+        )
+        return FastJSONResponse(response)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Failed to search messages", error=str(e))
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.get("/unread", response_model=List[ChannelUnread])
+async def get_unread_counts(
+    current_user: dict = Depends(get_current_user),
+    db_service: DynamoDBService = Depends(get_dynamodb_service)
+):
+    """Unread message counts for every channel the user has opened"""
+    try:
+        counts = await db_service.get_unread_counts(current_user["user_id"])
+        return FastJSONResponse([ChannelUnread.model_construct(**count) for count in counts])
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Failed to get unread counts", error=str(e))
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.put("/{channel_id}/read", status_code=status.HTTP_204_NO_CONTENT)
+async def mark_channel_read(
+    channel_id: str,
+    read: MarkReadRequest,
+    current_user: dict = Depends(get_current_user),
+    db_service: DynamoDBService = Depends(get_dynamodb_service)
+):
+    """Mark a channel read up to ``message_id`` (the newest message the client shows)"""
+    try:
+        await db_service.mark_channel_read(current_user["user_id"], channel_id, read.message_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Failed to mark channel read", channel_id=channel_id, error=str(e))
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
 @router.get("/{channel_id}", response_model=List[Message])
 async def get_messages(
     channel_id: str,
-    limit: int = 50,
+    limit: int = Query(50, ge=1, le=100),
     before: Optional[str] = None,
-    current_user: dict = Depends(get_current_user)
+    after: Optional[str] = None,
+    current_user: dict = Depends(get_current_user),
+    db_service: DynamoDBService = Depends(get_dynamodb_service)
 ):
-    """Get messages from a channel"""
+    """Get messages from a channel, oldest first.
+
+    Returns the newest ``limit`` messages older than the ``before`` message ID;
+    pass the first returned ID as ``before`` to page further back. After a
+    reconnect, pass the last message ID seen as ``after`` to get the oldest
+    ``limit`` messages sent since.
+    """
+    if before and after:
+        raise HTTPException(status_code=400, detail="Use either before or after, not both")
+    
     try:
-        # Mock messages
-        mock_messages = [
-            Message(
-                message_id="msg_001",
-                channel_id=channel_id,
-                sender_id="user_123",
-                sender_name="Admin User",
-                content="Hello, let's start the project planning.",
-                timestamp=datetime.utcnow()
-            ),
-            Message(
-                message_id="msg_002",
-                channel_id=channel_id,
-                sender_id="agent_pm_001",
-                sender_name="Project Manager Agent",
-                content="I'll analyze the requirements and create a project plan. What are the key objectives?",
-                timestamp=datetime.utcnow()
-            )
-        ]
+        result = await db_service.get_messages(channel_id, limit=limit, before=before, after=after)
         
-        return mock_messages
+        # Items are exactly what send_message stored; skip re-validation
+        messages = [Message.model_construct(**item) for item in result['items']]
+        return FastJSONResponse(messages)
+        
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error("Failed to get messages", channel_id=channel_id, error=str(e))
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
-@router.post("/", response_model=Message)
+@router.get("/{channel_id}/threads/{message_id}", response_model=Thread)
+async def get_thread(
+    channel_id: str,
+    message_id: str,
+    limit: int = Query(50, ge=1, le=100),
+    after: Optional[str] = None,
+    current_user: dict = Depends(get_current_user),
+    db_service: DynamoDBService = Depends(get_dynamodb_service)
+):
+    """Get a message and its replies, oldest first.
+
+    Returns the oldest ``limit`` replies; pass the last returned reply ID as
+    ``after`` to get the next page.
+    """
+    try:
+        result = await db_service.get_thread(message_id, limit=limit, after=after)
+        
+        root = result['root']
+        if root is None:
+            # Messages join the thread index with their first reply, and later pages start past the root
+            root = await db_service.get_message(channel_id, message_id)
+        if root is None or root['channel_id'] != channel_id:
+            raise HTTPException(status_code=404, detail="Message not found")
+        
+        thread = Thread.model_construct(
+            root=Message.model_construct(**root),
+            replies=[Message.model_construct(**item) for item in result['replies']],
+            reply_count=root.get('reply_count', 0),
+            has_more=result['has_more']
+        )
+        return FastJSONResponse(thread)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Failed to get thread", message_id=message_id, error=str(e))
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.post("/", response_model=Message, status_code=status.HTTP_201_CREATED)
 async def send_message(
     message_data: CreateMessageRequest,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    db_service: DynamoDBService = Depends(get_dynamodb_service),
+    pubsub=Depends(get_pubsub)
 ):
-    """Send a message to a channel"""
+    """Send a message to a channel and push it to the channel's WebSocket subscribers"""
     try:
-        # Mock message creation
-        message = Message(
-            message_id=f"msg_{hash(message_data.content) % 10000:04d}",
-            channel_id=message_data.channel_id,
-            sender_id=current_user["user_id"],
-            sender_name=current_user["name"],
-            content=message_data.content,
-            message_type=message_data.message_type,
-            timestamp=datetime.utcnow(),
-            parent_message_id=message_data.parent_message_id,
-            attachments=message_data.attachments
-        )
+        message_dict = message_data.model_dump(exclude_none=True)
+        message_dict['sender_id'] = current_user["user_id"]
+        message_dict['sender_name'] = current_user.get("name") or current_user["user_id"]
+        
+        message = Message(**await db_service.create_message(message_dict))
+        
+        # Subscribers on every node get it over their WebSocket
+        try:
+            await pubsub.publish(message.channel_id, {"type": "message", "data": message.model_dump()})
+        except Exception as e:
+            # The message is stored; clients still see it when they next load history
+            logger.warning("Failed to publish message", message_id=message.message_id, error=str(e))
         
         logger.info(
             "Message sent",
@@ -135,6 +325,10 @@ async def send_message(
         )
         
         return message
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error("Failed to send message", error=str(e))
-        raise HTTPException(status_code=500, detail="Internal server error")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Internal server error")
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, Depends, Query, status
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, status
 from fastapi.responses import JSONResponse
 from typing import Optional, List
 import structlog
@@ -7,17 +7,23 @@ from app.models.project import (
     Project, CreateProjectRequest, UpdateProjectRequest, 
     ProjectListResponse, ProjectStatsResponse, ProjectStatus
 )
-from app.services.dynamodb import DynamoDBService
+from app.config import settings
+from app.services.dynamodb import DynamoDBService, get_dynamodb_service
 from app.utils.auth import get_current_user
 from app.utils.pagination import PaginationParams
+from app.utils.etag import (
+    ETagCache, etag_headers, etag_matches, list_etag, not_modified, project_etag
+)
+from app.utils.responses import FastJSONResponse
 
 
 router = APIRouter()
 logger = structlog.get_logger()
+etag_cache = ETagCache(ttl=settings.etag_cache_ttl_seconds)
 
 
-def get_dynamodb_service() -> DynamoDBService:
-    return DynamoDBService()
+def _has_access(owner_id: str, team_members: List[str], current_user: dict) -> bool:
+    return owner_id == current_user['user_id'] or current_user['user_id'] in team_members
 
 
 @router.post("/", response_model=Project, status_code=status.HTTP_201_CREATED)
@@ -41,10 +47,17 @@ async def create_project(
             user_id=current_user['user_id']
         )
         
-        return Project(**created_project)
+        etag_cache.set(created_project)
+        return FastJSONResponse(
+            Project.from_db(created_project),
+            status_code=status.HTTP_201_CREATED,
+            headers=etag_headers(project_etag(created_project))
+        )
         
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error("Failed to create project", error=str(e))
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -53,21 +66,37 @@ async def create_project(
 @router.get("/{project_id}", response_model=Project)
 async def get_project(
     project_id: str,
+    if_none_match: Optional[str] = Header(None),
     current_user: dict = Depends(get_current_user),
     db_service: DynamoDBService = Depends(get_dynamodb_service)
 ):
     """Get project by ID"""
     try:
+        # Answer revalidations from cached version metadata without touching DynamoDB
+        cached = etag_cache.get(project_id) if if_none_match else None
+        if (
+            cached
+            and _has_access(cached.user_id, cached.team_members, current_user)
+            and etag_matches(if_none_match, cached.etag)
+        ):
+            return not_modified(cached.etag)
+        
         project = await db_service.get_project(project_id)
         
         if not project:
+            etag_cache.invalidate(project_id)
             raise HTTPException(status_code=404, detail="Project not found")
         
         # Check if user has access to this project
-        if project['user_id'] != current_user['user_id'] and current_user['user_id'] not in project.get('team_members', []):
+        if not _has_access(project['user_id'], project.get('team_members', []), current_user):
             raise HTTPException(status_code=403, detail="Access denied")
         
-        return Project(**project)
+        etag_cache.set(project)
+        etag = project_etag(project)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        
+        return FastJSONResponse(Project.from_db(project), headers=etag_headers(etag))
         
     except HTTPException:
         raise
@@ -104,7 +133,8 @@ async def update_project(
             user_id=current_user['user_id']
         )
         
-        return Project(**updated_project)
+        etag_cache.set(updated_project)
+        return FastJSONResponse(Project.from_db(updated_project), headers=etag_headers(project_etag(updated_project)))
         
     except HTTPException:
         raise
@@ -133,6 +163,8 @@ async def delete_project(
         # Delete project
         success = await db_service.delete_project(project_id)
         
+        etag_cache.invalidate(project_id)
+        
         if not success:
             raise HTTPException(status_code=404, detail="Project not found")
         
@@ -154,6 +186,7 @@ async def list_projects(
     status: Optional[ProjectStatus] = Query(None, description="Filter by project status"),
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(20, ge=1, le=100, description="Items per page"),
+    if_none_match: Optional[str] = Header(None),
     current_user: dict = Depends(get_current_user),
     db_service: DynamoDBService = Depends(get_dynamodb_service)
 ):
@@ -170,12 +203,17 @@ async def list_projects(
             limit=limit
         )
         
-        projects = [Project(**item) for item in result['items']]
-        
         # Simple pagination calculation
         total = result['count']
         has_next = result.get('last_evaluated_key') is not None
         
+        # An unchanged page is answered before any serialization work
+        etag = list_etag(result['items'], status, total, page, page_size, has_next)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        
+        projects = [Project.from_db(item) for item in result['items']]
+        
         logger.info(
             "Projects listed",
             user_id=current_user['user_id'],
@@ -183,14 +221,16 @@ async def list_projects(
             status=status
         )
         
-        return ProjectListResponse(
-            projects=projects,
-            total=total,
-            page=page,
-            page_size=page_size,
-            has_next=has_next
-        )
+        return FastJSONResponse({
+            "projects": projects,
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "has_next": has_next
+        }, headers=etag_headers(etag))
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error("Failed to list projects", error=str(e))
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -209,6 +249,8 @@ async def get_project_stats(
         
         return ProjectStatsResponse(**stats)
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error("Failed to get project stats", error=str(e))
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -246,7 +288,8 @@ async def start_project(
             user_id=current_user['user_id']
         )
         
-        return Project(**updated_project)
+        etag_cache.set(updated_project)
+        return FastJSONResponse(Project.from_db(updated_project), headers=etag_headers(project_etag(updated_project)))
         
     except HTTPException:
         raise
@@ -288,7 +331,8 @@ async def complete_project(
             user_id=current_user['user_id']
         )
         
-        return Project(**updated_project)
+        etag_cache.set(updated_project)
+        return FastJSONResponse(Project.from_db(updated_project), headers=etag_headers(project_etag(updated_project)))
         
     except HTTPException:
         raise
@@ -0,0 +1,120 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from typing import Any, Dict, Set
+import asyncio
+import orjson
+import structlog
+import uuid
+
+from app.api.v1.messages import _check_channel_access
+from app.services.bedrock import BedrockAgentService, get_bedrock_service, user_session_id
+from app.services.connections import Connection, ConnectionManager, get_connection_manager
+from app.services.dynamodb import DynamoDBService, get_dynamodb_service
+from app.utils.auth import verify_token
+
+
+router = APIRouter()
+logger = structlog.get_logger()
+
+
+async def _relay_agent(
+    manager: ConnectionManager,
+    connection: Connection,
+    bedrock: BedrockAgentService,
+    frame: Dict[str, Any]
+):
+    """Send an agent's answer to one connection chunk by chunk"""
+    request_id = frame.get("request_id")
+    agent_id = bedrock.agent_id_for(frame.get("agent_type", ""))
+    if agent_id is None or not isinstance(frame.get("message"), str):
+        manager.send(connection, {"type": "agent_error", "request_id": request_id, "detail": "Agent not found"})
+        return
+    
+    session_id = frame.get("session_id") or str(uuid.uuid4())
+    chunks = bedrock.stream_agent(agent_id, user_session_id(connection.user_id, session_id), frame["message"])
+    try:
+        async for text in chunks:
+            manager.send(connection, {"type": "agent_chunk", "request_id": request_id, "text": text})
+        manager.send(connection, {"type": "agent_done", "request_id": request_id, "session_id": session_id})
+    except Exception as e:
+        logger.error("Agent stream failed", connection_id=connection.connection_id, error=str(e))
+        manager.send(connection, {"type": "agent_error", "request_id": request_id, "detail": "Agent response failed"})
+    finally:
+        await chunks.aclose()
+
+
+@router.websocket("/ws")
+async def websocket_endpoint(
+    websocket: WebSocket,
+    token: str = Query(...),
+    manager: ConnectionManager = Depends(get_connection_manager),
+    bedrock: BedrockAgentService = Depends(get_bedrock_service),
+    db_service: DynamoDBService = Depends(get_dynamodb_service)
+):
+    """Push channel messages and agent answers to the client.
+
+    Browsers cannot set headers on a WebSocket, so the access token is passed
+    as the ``token`` query parameter. Client frames are JSON actions:
+    ``{"action": "subscribe" | "unsubscribe", "channel_id": ...}`` and
+    ``{"action": "ping"}``. Subscribing needs access to the channel's
+    project, as for the message routes. Messages sent to a subscribed channel arrive as
+    ``{"type": "message", "data": {...}}``; events that queue up while the
+    client is busy reading arrive together as ``{"type": "batch", "events": [...]}``.
+
+    ``{"action": "invoke_agent", "agent_type": ..., "message": ..., "request_id": ...}``
+    streams the agent's answer back as ``agent_chunk`` frames followed by
+    ``agent_done`` (or ``agent_error``), tagged with the request ID.
+    """
+    try:
+        user_id = verify_token(token).get("sub")
+    except HTTPException:
+        user_id = None
+    if user_id is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    connection = await manager.connect(websocket, user_id)
+    agent_streams: Set[asyncio.Task] = set()
+    try:
+        while True:
+            try:
+                frame = orjson.loads(await websocket.receive_text())
+                action = frame.get("action")
+                channel_id = frame.get("channel_id")
+            except (orjson.JSONDecodeError, AttributeError):
+                manager.send(connection, {"type": "error", "detail": "Invalid frame"})
+                continue
+
+            if action == "ping":
+                manager.send(connection, {"type": "pong"})
+            elif action == "invoke_agent":
+                # Keep reading frames while the answer streams
+                task = asyncio.create_task(_relay_agent(manager, connection, bedrock, frame))
+                agent_streams.add(task)
+                task.add_done_callback(agent_streams.discard)
+            elif action == "unsubscribe" and isinstance(channel_id, str):
+                manager.unsubscribe(connection, channel_id)
+                manager.send(connection, {"type": "unsubscribed", "channel_id": channel_id})
+            elif action == "subscribe" and isinstance(channel_id, str):
+                try:
+                    await _check_channel_access(db_service, channel_id, {"user_id": user_id})
+                except HTTPException as e:
+                    manager.send(connection, {"type": "error", "channel_id": channel_id, "detail": e.detail})
+                    continue
+                except Exception as e:
+                    logger.error("Channel access check failed", channel_id=channel_id, error=str(e))
+                    manager.send(connection, {"type": "error", "channel_id": channel_id, "detail": "Subscription failed"})
+                    continue
+                if manager.subscribe(connection, channel_id):
+                    manager.send(connection, {"type": "subscribed", "channel_id": channel_id})
+                else:
+                    manager.send(connection, {"type": "error", "detail": "Too many channels"})
+            else:
+                manager.send(connection, {"type": "error", "detail": "Unknown action"})
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error("WebSocket connection failed", connection_id=connection.connection_id, error=str(e))
+    finally:
+        for task in agent_streams:
+            task.cancel()
+        await manager.disconnect(connection)
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, Optional
 import os
 
 
@@ -27,6 +27,37 @@ class Settings(BaseSettings):
     channels_table: str = f"agentdev-dev-channels"
     artifacts_table: str = f"agentdev-dev-artifacts"
     ws_connections_table: str = f"agentdev-dev-ws-connections"
+    channel_members_table: str = f"agentdev-dev-channel-members"
+    dynamodb_max_pool_connections: int = 10
+    dynamodb_warm_connections: int = 4  # Connections opened at startup
+    dynamodb_connect_timeout_seconds: float = 1
+    dynamodb_read_timeout_seconds: float = 3
+    dynamodb_max_attempts: int = 3  # botocore attempts, including the first
+    dynamodb_call_timeout_seconds: float = 5  # Per operation, further capped by the request deadline
+    dynamodb_retry_budget_seconds: float = 1  # Below this much time left, calls get a single attempt
+    message_write_behind: bool = True  # Coalesce concurrent message inserts into BatchWriteItem calls
+    message_batch_max_delay_ms: float = 5  # Longest wait for more messages before a batch is written
+    message_batch_max_retries: int = 5  # For items BatchWriteItem leaves unprocessed
+    message_cache_size: int = 100  # Newest messages kept per active channel (0 disables the cache)
+    message_cache_channels: int = 1000
+    message_cache_ttl_seconds: float = 300  # Rings are reloaded from DynamoDB after this
+    message_archive_enabled: bool = False  # Read old history from S3 segments written by the archive job
+    message_archive_after_days: float = 90  # The archive job moves messages older than this
+    message_archive_prefix: str = "message-archive"  # Key prefix in the backup bucket (get_bucket_name('backup'))
+    message_archive_segment_size: int = 5000  # Most messages per segment file
+    search_index_enabled: bool = True  # Keep an in-memory full-text index of channel messages
+    # Index existing messages in the background (scans the table). Off, a node only finds
+    # messages sent since it started: history disappears from search after each deploy or restart
+    search_backfill_on_startup: bool = False
+    
+    # Request deadlines; route_timeouts maps path prefixes to seconds (0 disables)
+    request_timeout_seconds: float = 15
+    route_timeouts: Dict[str, float] = {}
+    
+    # Circuit breakers around DynamoDB and Bedrock
+    circuit_failure_threshold: int = 5  # Consecutive failures that open the circuit
+    circuit_recovery_timeout_seconds: float = 30  # Open time before a trial call is let through
+    circuit_stale_max_age_seconds: float = 300  # Oldest cached item served while open
     
     # S3 buckets
     artifacts_bucket: str = f"agentdev-dev-artifacts"
@@ -38,6 +69,10 @@ class Settings(BaseSettings):
     user_pool_id: Optional[str] = None
     user_pool_client_id: Optional[str] = None
     user_pool_region: str = "us-east-1"
+    jwks_url: Optional[str] = None  # Overrides the pool's JWKS endpoint (e.g. local stand-ins)
+    jwks_refresh_interval_seconds: int = 3600
+    jwks_min_refresh_interval_seconds: int = 30
+    jwks_fetch_timeout_seconds: float = 5.0
     
     # JWT settings
     secret_key: str = "your-secret-key-change-in-production"
@@ -50,6 +85,11 @@ class Settings(BaseSettings):
     
     # WebSocket settings
     websocket_url: Optional[str] = None
+    ws_send_queue_size: int = 100  # Pending pushes per connection before it is closed as too slow
+    ws_send_timeout_seconds: float = 5
+    ws_max_batch_size: int = 50  # Queued frames combined into one batch frame
+    ws_max_channels_per_connection: int = 50
+    ws_connection_ttl_seconds: int = 86400  # Registry rows left behind by a crashed worker expire after this
     
     # Redis settings (for caching)
     redis_url: Optional[str] = None
@@ -57,6 +97,15 @@ class Settings(BaseSettings):
     redis_port: int = 6379
     redis_db: int = 0
     
+    # Response compression
+    enable_compression: bool = True
+    compression_minimum_size: int = 1024  # Bytes; smaller bodies are sent uncompressed
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+    
+    # HTTP caching
+    etag_cache_ttl_seconds: float = 10  # Bounds staleness of 304s answered without DynamoDB
+    
     # Rate limiting
     rate_limit_per_minute: int = 100
     
@@ -77,16 +126,53 @@ class Settings(BaseSettings):
     pm_agent_id: Optional[str] = None
     architect_agent_id: Optional[str] = None
     security_agent_id: Optional[str] = None
+    bedrock_agent_alias_id: str = "TSTALIASID"
+    bedrock_connect_timeout_seconds: float = 2
+    bedrock_read_timeout_seconds: float = 30  # Longest gap between streamed chunks
+    bedrock_max_attempts: int = 3
+    bedrock_max_streams: int = 16  # Concurrent agent streams per worker; more are rejected with 503
     
     # Monitoring settings
     enable_metrics: bool = True
     enable_tracing: bool = True
+    trace_exporter: str = "none"  # none | console | memory | otlp
+    trace_head_sample_rate: float = 1.0
+    trace_tail_sampling: bool = True
+    trace_tail_slow_threshold_ms: float = 500  # Slower traces are always kept
+    trace_tail_baseline_rate: float = 0.05  # Share of fast, successful traces kept
+    enable_server_timing: bool = True  # Send the per-phase Server-Timing header to clients
+    health_check_interval_seconds: float = 15  # Background dependency probe interval
+    health_check_timeout_seconds: float = 5
+    health_check_bedrock: bool = False  # Probe Bedrock (GetFoundationModel) as a non-critical dependency
+    enable_loop_monitor: bool = True
+    loop_monitor_interval_ms: float = 100
+    loop_block_threshold_ms: float = 100  # In debug mode, longer stalls log the blocking stack
     log_level: str = "INFO"
+    # On-demand request profiling; the middleware is not installed unless enabled
+    enable_profiling: bool = False
+    profile_token: Optional[str] = None  # Requests sending it in X-Profile-Token are profiled
+    profile_sample_rate: float = 0.0
+    profile_interval_ms: float = 5
+    profile_max_seconds: float = 30
+    profile_storage: str = "local"  # local | s3 (profiles/ in the logs bucket, get_bucket_name('logs'))
+    profile_output_dir: str = "/tmp/profiles"
+    log_queue_size: int = 10000  # Records beyond this are dropped instead of blocking
+    # Share of events kept per event name, e.g. {"HTTP request": 0.01};
+    # warnings, errors and 4xx/5xx request logs are always kept
+    log_sample_rates: Dict[str, float] = {}
     
     def get_table_name(self, table_type: str) -> str:
         """Get full table name with environment prefix"""
         return f"{self.project_name}-{self.environment}-{table_type}"
     
+    def get_cognito_issuer(self) -> str:
+        """Get the token issuer URL of the Cognito user pool"""
+        return f"https://cognito-idp.{self.user_pool_region}.amazonaws.com/{self.user_pool_id}"
+    
+    def get_jwks_url(self) -> str:
+        """Get the JWKS endpoint used to verify Cognito tokens"""
+        return self.jwks_url or f"{self.get_cognito_issuer()}/.well-known/jwks.json"
+    
     def get_bucket_name(self, bucket_type: str) -> str:
         """Get full bucket name with environment prefix"""
         account_id = os.environ.get('AWS_ACCOUNT_ID', '123456789012')
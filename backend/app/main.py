@@ -1,16 +1,29 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.responses import JSONResponse
+import asyncio
 import structlog
-import uvicorn
 from contextlib import asynccontextmanager
+from starlette.concurrency import run_in_threadpool
 
 from app.config import settings
-from app.api.v1 import projects, agents, messages, artifacts, auth
+from app.api.v1 import projects, agents, messages, artifacts, auth, websocket
+from app.utils.jwks import get_jwks_cache
 from app.utils.logger import configure_logging
-from app.utils.middleware import PrometheusMiddleware, RateLimitMiddleware
-from app.services.dynamodb import DynamoDBService
+from app.utils.loop_monitor import create_loop_monitor
+from app.utils.metrics import metrics_response
+from app.utils.tracing import configure_tracing
+from app.utils.middleware import (
+    CompressionMiddleware, DeadlineMiddleware, ProfilingMiddleware, PrometheusMiddleware,
+    RateLimitMiddleware, ServerTimingMiddleware
+)
+from app.utils.profiling import create_request_profiler
+from app.services.connections import get_connection_manager
+from app.services.dynamodb import get_dynamodb_service
+from app.services.pubsub import get_pubsub
+from app.services.search import backfill_search_index, get_search_index
+from app.services.health import create_health_monitor
 
 
 # Configure structured logging
@@ -27,17 +40,75 @@ async def lifespan(app: FastAPI):
     # Initialize services
     try:
         # Test DynamoDB connection
-        dynamodb_service = DynamoDBService()
+        dynamodb_service = get_dynamodb_service()
         await dynamodb_service.health_check()
+        await run_in_threadpool(dynamodb_service.warm_up, settings.dynamodb_warm_connections)
         logger.info("DynamoDB connection established")
     except Exception as e:
         logger.error("Failed to connect to DynamoDB", error=str(e))
         raise
     
+    # Probe dependencies in the background; health endpoints serve the cached status
+    health_monitor = create_health_monitor(dynamodb_service)
+    await health_monitor.start()
+    app.state.health_monitor = health_monitor
+    
+    # Load Cognito signing keys before serving, then keep them fresh in the background
+    jwks_cache = get_jwks_cache()
+    if jwks_cache is not None:
+        await run_in_threadpool(jwks_cache.refresh)
+        jwks_cache.start()
+    
+    # Relay channel events published by any node to this worker's WebSocket clients
+    # and keep its recent-message cache and search index current
+    connection_manager = get_connection_manager()
+    search_index = get_search_index()
+    
+    def on_channel_event(channel_id: str, payload: dict):
+        if payload.get("type") == "message":
+            dynamodb_service.cache_message(channel_id, payload["data"])
+            if search_index is not None:
+                search_index.add(channel_id, payload["data"])
+        connection_manager.publish(channel_id, payload)
+    
+    search_backfill = None
+    if search_index is not None and settings.search_backfill_on_startup:
+        search_index.begin_backfill()
+        search_backfill = asyncio.create_task(backfill_search_index(search_index, dynamodb_service))
+    
+    pubsub = get_pubsub()
+    await pubsub.start(on_channel_event)
+    
+    # Watch for sync work holding up the event loop
+    loop_monitor = create_loop_monitor() if settings.enable_loop_monitor else None
+    if loop_monitor is not None:
+        loop_monitor.start()
+    
     yield
     
     # Shutdown
     logger.info("Shutting down AgentDev Platform API")
+    
+    if search_backfill is not None:
+        search_backfill.cancel()
+    
+    # Tell WebSocket clients to reconnect elsewhere
+    await pubsub.stop()
+    await connection_manager.close_all()
+    
+    # Write messages still waiting for their batch (they are counted before they are written)
+    await dynamodb_service.channel_message_counts.drain()
+    if dynamodb_service.message_writer is not None:
+        await dynamodb_service.message_writer.drain()
+    await dynamodb_service.sender_read_counts.drain()
+    
+    await health_monitor.stop()
+    
+    if loop_monitor is not None:
+        await loop_monitor.stop()
+    
+    if jwks_cache is not None:
+        jwks_cache.stop()
 
 
 # Create FastAPI application
@@ -50,6 +121,13 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Innermost, so a 504 for a request past its deadline still passes through CORS, compression and logging
+app.add_middleware(
+    DeadlineMiddleware,
+    default_timeout=settings.request_timeout_seconds,
+    route_timeouts=settings.route_timeouts
+)
+
 # Add security middleware
 app.add_middleware(
     TrustedHostMiddleware,
@@ -65,12 +143,31 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Add response compression
+if settings.enable_compression:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_minimum_size,
+        gzip_level=settings.compression_gzip_level,
+        brotli_quality=settings.compression_brotli_quality
+    )
+
 # Add custom middleware
 if settings.enable_metrics:
     app.add_middleware(PrometheusMiddleware)
 
 app.add_middleware(RateLimitMiddleware, calls=settings.rate_limit_per_minute, period=60)
 
+# Wraps the other middleware so every layer below can record timings for the header and request log
+app.add_middleware(ServerTimingMiddleware, expose_header=settings.enable_server_timing)
+
+# Profile selected requests through the whole middleware stack
+if settings.enable_profiling:
+    app.add_middleware(ProfilingMiddleware, profiler=create_request_profiler())
+
+# Trace requests outermost (DynamoDB operations are traced in DynamoDBService)
+configure_tracing(app)
+
 # Include API routers
 app.include_router(
     auth.router,
@@ -102,6 +199,12 @@ app.include_router(
     tags=["artifacts"]
 )
 
+app.include_router(
+    websocket.router,
+    prefix=settings.api_v1_prefix,
+    tags=["websocket"]
+)
+
 
 @app.get("/")
 async def root():
@@ -115,24 +218,37 @@ async def root():
 
 
 @app.get("/health")
-async def health_check():
-    """Health check endpoint"""
-    try:
-        # Check DynamoDB connection
-        dynamodb_service = DynamoDBService()
-        await dynamodb_service.health_check()
-        
-        return {
-            "status": "healthy",
-            "timestamp": "2024-01-01T00:00:00Z",
-            "services": {
-                "dynamodb": "healthy",
-                "api": "healthy"
-            }
-        }
-    except Exception as e:
-        logger.error("Health check failed", error=str(e))
+async def health_check(request: Request):
+    """Health check endpoint, served from the last background probe"""
+    health_monitor = getattr(request.app.state, "health_monitor", None)
+    if health_monitor is None:
         raise HTTPException(status_code=503, detail="Service unavailable")
+    
+    report = health_monitor.status()
+    status_code = 503 if report["status"] == "unhealthy" else 200
+    return JSONResponse(status_code=status_code, content=report)
+
+
+@app.get("/health/live")
+async def liveness_check():
+    """Liveness probe: the process is up and the event loop is serving requests"""
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def readiness_check(request: Request):
+    """Readiness probe: critical dependencies were healthy at the last probe"""
+    health_monitor = getattr(request.app.state, "health_monitor", None)
+    if health_monitor is None or not health_monitor.is_ready():
+        raise HTTPException(status_code=503, detail="Service not ready")
+    return {"status": "ready"}
+
+
+if settings.enable_metrics:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Prometheus metrics endpoint"""
+        return metrics_response()
 
 
 @app.exception_handler(Exception)
@@ -155,6 +271,8 @@ async def global_exception_handler(request, exc):
 
 
 if __name__ == "__main__":
+    import uvicorn
+    
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
@@ -93,6 +93,16 @@ class Project(BaseModel):
         }
         use_enum_values = True
 
+    @classmethod
+    def from_db(cls, item: Dict[str, Any]) -> "Project":
+        """Build a Project from a stored item without re-validating it.
+
+        Only for items written through DynamoDBService: defaults are filled in,
+        but nested requirements/metadata stay plain dicts, so the result is
+        meant for FastJSONResponse rather than further model logic.
+        """
+        return cls.model_construct(**item)
+
 
 class CreateProjectRequest(BaseModel):
     name: str = Field(..., min_length=1, max_length=100, description="Project name")
@@ -0,0 +1,238 @@
+import argparse
+import asyncio
+import gzip
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import boto3
+import orjson
+import structlog
+from botocore.exceptions import ClientError
+
+from app.config import settings
+from app.utils.ids import ulid_at, ulid_timestamp
+from app.utils.responses import dumps
+
+
+logger = structlog.get_logger()
+
+Item = Dict[str, Any]
+
+
+class MessageArchive:
+    """Old channel messages, moved out of DynamoDB into S3 segment files.
+
+    Each channel's archived messages are gzipped NDJSON segments under
+    ``{prefix}/{channel_id}/{yyyy}/{mm}/``, each holding a run of
+    consecutive messages (items exactly as they were stored) from one
+    month. ``{prefix}/{channel_id}/index.json`` lists the segments with
+    their first and last message IDs, so a page of history downloads only
+    the segments it overlaps. Indexes are cached for ``index_ttl`` seconds
+    and recently read segments are kept decoded.
+    """
+
+    def __init__(
+        self,
+        s3: Any = None,
+        bucket: Optional[str] = None,
+        prefix: str = settings.message_archive_prefix,
+        index_ttl: float = 60,
+        segment_cache_size: int = 32
+    ):
+        self.s3 = s3 or boto3.client('s3', region_name=settings.aws_region)
+        # The backup bucket as CloudFormation names it, which the task role can access
+        self.bucket = bucket or settings.get_bucket_name('backup')
+        self.prefix = prefix
+        self.index_ttl = index_ttl
+        self.segment_cache_size = segment_cache_size
+        self._indexes: Dict[str, Tuple[float, List[Dict[str, Any]]]] = {}
+        self._segments: "OrderedDict[str, List[Item]]" = OrderedDict()
+
+    def _index_key(self, channel_id: str) -> str:
+        return f"{self.prefix}/{channel_id}/index.json"
+
+    async def _get_object(self, key: str) -> Optional[bytes]:
+        try:
+            response = await asyncio.to_thread(self.s3.get_object, Bucket=self.bucket, Key=key)
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'NoSuchKey':
+                return None
+            raise
+        return await asyncio.to_thread(response['Body'].read)
+
+    async def get_index(self, channel_id: str, fresh: bool = False) -> List[Dict[str, Any]]:
+        """A channel's segments, oldest first; empty when nothing is archived"""
+        cached = self._indexes.get(channel_id)
+        if cached is not None and not fresh and time.monotonic() - cached[0] < self.index_ttl:
+            return cached[1]
+
+        body = await self._get_object(self._index_key(channel_id))
+        segments = orjson.loads(body)['segments'] if body else []
+        self._indexes[channel_id] = (time.monotonic(), segments)
+        return segments
+
+    async def _segment(self, key: str) -> List[Item]:
+        items = self._segments.get(key)
+        if items is None:
+            body = await self._get_object(key)
+            if body is None:
+                raise RuntimeError(f"Archive segment {key} is listed in its index but missing")
+            items = [orjson.loads(line) for line in gzip.decompress(body).splitlines() if line]
+            self._segments[key] = items
+            if len(self._segments) > self.segment_cache_size:
+                self._segments.popitem(last=False)
+        self._segments.move_to_end(key)
+        return items
+
+    async def write_segments(self, channel_id: str, items: List[Item]):
+        """Archive consecutive stored messages of a channel, oldest first.
+
+        Messages are split by month into segments named after their first
+        message. A run overlapping segments already in the index (a rerun
+        after an interrupted archival, which resumes from a later first
+        message) is merged with them into one segment that replaces them,
+        so every message is archived once. The index is written last;
+        replaced segment files are deleted after it.
+        """
+        runs: List[Tuple[str, List[Item]]] = []
+        for item in items:
+            month = ulid_timestamp(item['message_id'][len('msg_'):]).strftime('%Y/%m')
+            if runs and runs[-1][0] == month:
+                runs[-1][1].append(item)
+            else:
+                runs.append((month, [item]))
+
+        index = await self.get_index(channel_id, fresh=True)
+        replaced = set()
+        entries = []
+        for month, run in runs:
+            overlapping = [
+                entry for entry in index
+                if entry['first_message_id'] <= run[-1]['message_id'] and entry['last_message_id'] >= run[0]['message_id']
+            ]
+            if overlapping:
+                merged = {item['message_id']: item for entry in overlapping for item in await self._segment(entry['key'])}
+                merged.update((item['message_id'], item) for item in run)
+                run = [merged[message_id] for message_id in sorted(merged)]
+                replaced.update(entry['key'] for entry in overlapping)
+
+            key = f"{self.prefix}/{channel_id}/{month}/{run[0]['message_id']}.ndjson.gz"
+            body = gzip.compress(b"".join(dumps(item) + b"\n" for item in run), mtime=0)
+            await asyncio.to_thread(
+                self.s3.put_object, Bucket=self.bucket, Key=key, Body=body, ContentType='application/x-ndjson'
+            )
+            self._segments.pop(key, None)
+            entries.append({
+                'key': key,
+                'first_message_id': run[0]['message_id'],
+                'last_message_id': run[-1]['message_id'],
+                'count': len(run)
+            })
+
+        replaced -= {entry['key'] for entry in entries}
+        segments = {entry['key']: entry for entry in index if entry['key'] not in replaced}
+        segments.update((entry['key'], entry) for entry in entries)
+        index = sorted(segments.values(), key=lambda entry: entry['first_message_id'])
+        await asyncio.to_thread(
+            self.s3.put_object,
+            Bucket=self.bucket,
+            Key=self._index_key(channel_id),
+            Body=orjson.dumps({'segments': index}),
+            ContentType='application/json'
+        )
+        self._indexes[channel_id] = (time.monotonic(), index)
+
+        for key in replaced:
+            self._segments.pop(key, None)
+            # No longer listed; a file left behind by a failed delete is never read
+            await asyncio.to_thread(self.s3.delete_object, Bucket=self.bucket, Key=key)
+
+    async def read_before(self, channel_id: str, before: Optional[str], limit: int) -> Dict[str, Any]:
+        """The newest ``limit`` archived messages older than ``before``, oldest first"""
+        segments = [
+            entry for entry in await self.get_index(channel_id)
+            if not before or entry['first_message_id'] < before
+        ]
+        pages: List[List[Item]] = []
+        needed = limit
+        for entry in reversed(segments):
+            if needed == 0:
+                return {'items': [item for page in pages for item in page], 'has_more': True}
+            items = [item for item in await self._segment(entry['key']) if not before or item['message_id'] < before]
+            page = items[-needed:]
+            pages.insert(0, page)
+            needed -= len(page)
+            if len(items) > len(page):
+                return {'items': [item for page in pages for item in page], 'has_more': True}
+        return {'items': [item for page in pages for item in page], 'has_more': False}
+
+    async def read_after(self, channel_id: str, after: str, limit: int) -> Dict[str, Any]:
+        """The oldest ``limit`` archived messages newer than ``after``"""
+        segments = [entry for entry in await self.get_index(channel_id) if entry['last_message_id'] > after]
+        collected: List[Item] = []
+        for entry in segments:
+            if len(collected) == limit:
+                return {'items': collected, 'has_more': True}
+            items = [item for item in await self._segment(entry['key']) if item['message_id'] > after]
+            page = items[:limit - len(collected)]
+            collected.extend(page)
+            if len(items) > len(page):
+                return {'items': collected, 'has_more': True}
+        return {'items': collected, 'has_more': False}
+
+    async def get_message(self, channel_id: str, message_id: str) -> Optional[Item]:
+        for entry in await self.get_index(channel_id):
+            if entry['first_message_id'] <= message_id <= entry['last_message_id']:
+                for item in await self._segment(entry['key']):
+                    if item['message_id'] == message_id:
+                        return item
+        return None
+
+
+async def archive_channel(db_service, archive: MessageArchive, channel_id: str, cutoff_id: str, segment_size: int) -> int:
+    """Move a channel's messages older than ``cutoff_id`` to the archive; returns how many moved"""
+    moved = 0
+    while True:
+        items = await db_service.get_oldest_messages(channel_id, before=cutoff_id, limit=segment_size)
+        if not items:
+            return moved
+        # Delete only once the segments and index are in S3; a rerun merges into the same segments
+        await archive.write_segments(channel_id, items)
+        await db_service.delete_messages(channel_id, [item['message_id'] for item in items])
+        moved += len(items)
+
+
+async def archive_old_messages(
+    db_service,
+    archive: MessageArchive,
+    cutoff: datetime,
+    segment_size: int = settings.message_archive_segment_size
+) -> int:
+    """Move every message sent before ``cutoff`` (timezone-aware) from DynamoDB to the archive"""
+    cutoff_id = f"msg_{ulid_at(cutoff)}"
+    moved = 0
+    for channel_id in await db_service.list_channel_ids():
+        count = await archive_channel(db_service, archive, channel_id, cutoff_id, segment_size)
+        if count:
+            logger.info("Archived channel messages", channel_id=channel_id, messages=count)
+        moved += count
+    logger.info("Message archival finished", messages=moved, cutoff=cutoff.isoformat())
+    return moved
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move old channel messages from DynamoDB to S3")
+    parser.add_argument("--older-than-days", type=float, default=settings.message_archive_after_days)
+    parser.add_argument("--segment-size", type=int, default=settings.message_archive_segment_size)
+    args = parser.parse_args()
+
+    from app.services.dynamodb import DynamoDBService
+
+    cutoff = datetime.now(timezone.utc) - timedelta(days=args.older_than_days)
+    asyncio.run(archive_old_messages(DynamoDBService(), MessageArchive(), cutoff, args.segment_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+import asyncio
+import contextvars
+import random
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+import structlog
+
+from app.utils.metrics import BATCH_WRITE_RETRIES, BATCH_WRITE_SIZE
+
+
+logger = structlog.get_logger()
+
+Item = Dict[str, Any]
+
+
+class UnprocessedItemsError(Exception):
+    """Items were still unprocessed after the last retry"""
+
+
+class BatchWriter:
+    """Coalesce concurrent single-item writes into batch calls (write-behind).
+
+    ``put`` queues an item and returns once the batch holding it has been
+    written, so callers keep the durability of a single put while a burst
+    of writes shares one request. A batch is flushed as soon as
+    ``max_batch`` items are waiting, or ``max_delay`` seconds after the first
+    of them arrived. Items the batch call reports as unprocessed are retried
+    with exponential backoff.
+
+    ``write_batch`` takes a list of items and returns the unprocessed ones;
+    ``key`` identifies an item within a batch.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        write_batch: Callable[[List[Item]], Awaitable[List[Item]]],
+        key: Callable[[Item], Hashable],
+        max_batch: int = 25,
+        max_delay: float = 0.005,
+        max_retries: int = 5,
+        retry_delay: float = 0.05
+    ):
+        self.name = name
+        self.write_batch = write_batch
+        self.key = key
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+
+        self._pending: List[Tuple[Item, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushes: Set[asyncio.Task] = set()
+        self._closed = False
+
+    async def put(self, item: Item):
+        """Queue an item and wait until it has been written"""
+        if self._closed:
+            raise RuntimeError(f"{self.name} batch writer is closed")
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch:
+            self.flush()
+        elif self._timer is None:
+            # Batches serve many requests, so they run outside any one request's context
+            self._timer = loop.call_later(self.max_delay, self.flush, context=contextvars.Context())
+        await future
+
+    def flush(self):
+        """Start writing everything queued so far"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._pending:
+            batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+            task = asyncio.create_task(self._write(batch), context=contextvars.Context())
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def drain(self):
+        """Write everything queued and wait for batches in flight; later puts are rejected"""
+        self._closed = True
+        self.flush()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+        logger.info("Batch writer drained", writer=self.name)
+
+    async def _write(self, batch: List[Tuple[Item, asyncio.Future]]):
+        waiting = {self.key(item): (item, future) for item, future in batch}
+        BATCH_WRITE_SIZE.labels(self.name).observe(len(waiting))
+        try:
+            for attempt in range(self.max_retries + 1):
+                if attempt:
+                    BATCH_WRITE_RETRIES.labels(self.name).inc()
+                    await asyncio.sleep(self.retry_delay * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
+
+                unprocessed = await self.write_batch([item for item, _ in waiting.values()])
+                unprocessed_keys = {self.key(item) for item in unprocessed}
+                for key in list(waiting):
+                    if key not in unprocessed_keys:
+                        _, future = waiting.pop(key)
+                        if not future.done():
+                            future.set_result(None)
+                if not waiting:
+                    return
+
+            raise UnprocessedItemsError(f"{len(waiting)} items unprocessed after {self.max_retries} retries")
+        except Exception as e:
+            logger.error("Batch write failed", writer=self.name, items=len(waiting), error=str(e))
+            for _, future in waiting.values():
+                if not future.done():
+                    future.set_exception(e)
+
+
+class CounterBatcher:
+    """Coalesce concurrent increments of the same counter into one update.
+
+    ``add(key)`` waits for ``max_delay`` seconds of further increments to the
+    same key, applies them together as a single ``apply(key, n)`` call, and
+    returns this increment's position: the counter's value right after it,
+    assuming increments are applied in the order they arrived. ``apply``
+    adds ``n`` to the counter and returns its new value (or None when the
+    counter was not updated). ``add_nowait`` counts an increment without
+    waiting for it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        apply: Callable[[Hashable, int], Awaitable[Optional[int]]],
+        max_delay: float = 0.005
+    ):
+        self.name = name
+        self.apply = apply
+        self.max_delay = max_delay
+
+        # None stands for an increment nobody waits for
+        self._pending: Dict[Hashable, List[Optional[asyncio.Future]]] = {}
+        self._flushes: Set[asyncio.Task] = set()
+
+    async def add(self, key: Hashable) -> Optional[int]:
+        """Count one increment of ``key`` and wait until it has been applied"""
+        future = asyncio.get_running_loop().create_future()
+        self._queue(key, future)
+        return await future
+
+    def add_nowait(self, key: Hashable):
+        """Count one increment of ``key`` without waiting for it; a failed update is only logged"""
+        self._queue(key, None)
+
+    def _queue(self, key: Hashable, future: Optional[asyncio.Future]):
+        waiting = self._pending.setdefault(key, [])
+        waiting.append(future)
+        if len(waiting) == 1:
+            asyncio.get_running_loop().call_later(self.max_delay, self.flush, key, context=contextvars.Context())
+
+    def flush(self, key: Hashable):
+        futures = self._pending.pop(key, None)
+        if futures:
+            task = asyncio.create_task(self._apply(key, futures), context=contextvars.Context())
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def drain(self):
+        """Apply every pending increment and wait for updates in flight"""
+        for key in list(self._pending):
+            self.flush(key)
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+    async def _apply(self, key: Hashable, futures: List[Optional[asyncio.Future]]):
+        BATCH_WRITE_SIZE.labels(self.name).observe(len(futures))
+        try:
+            total = await self.apply(key, len(futures))
+        except Exception as e:
+            logger.error("Counter update failed", counter=self.name, increments=len(futures), error=str(e))
+            for future in futures:
+                if future is not None and not future.done():
+                    future.set_exception(e)
+            return
+        first = None if total is None else total - len(futures) + 1
+        for i, future in enumerate(futures):
+            if future is not None and not future.done():
+                future.set_result(None if first is None else first + i)
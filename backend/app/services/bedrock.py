@@ -0,0 +1,211 @@
+import asyncio
+import codecs
+import contextvars
+import functools
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Iterator, Optional, Set
+
+import boto3
+import structlog
+from botocore.config import Config
+from fastapi import HTTPException, status
+from opentelemetry import trace
+
+from app.config import settings
+from app.utils.circuit_breaker import CircuitBreaker
+from app.utils.deadline import DeadlineExceeded, remaining
+from app.utils.metrics import BEDROCK_TIME_TO_FIRST_CHUNK
+
+
+logger = structlog.get_logger()
+tracer = trace.get_tracer(__name__)
+
+# Marks the end of a stream on the queue between the reader thread and the event loop
+_END = object()
+
+
+def _create_client():
+    return boto3.client(
+        'bedrock-agent-runtime',
+        region_name=settings.bedrock_region,
+        aws_access_key_id=settings.aws_access_key_id,
+        aws_secret_access_key=settings.aws_secret_access_key,
+        config=Config(
+            connect_timeout=settings.bedrock_connect_timeout_seconds,
+            read_timeout=settings.bedrock_read_timeout_seconds,
+            retries={'total_max_attempts': settings.bedrock_max_attempts, 'mode': 'standard'}
+        )
+    )
+
+
+def user_session_id(user_id: str, session_id: str) -> str:
+    """Bedrock session for a client's session ID, private to the user.
+
+    Session IDs come from clients; hashing in the user keeps one user from
+    continuing (and reading the memory of) another user's session.
+    """
+    return hashlib.sha256(f"{user_id}:{session_id}".encode()).hexdigest()
+
+
+class AgentStreamsBusy(HTTPException):
+    """Raised instead of starting a stream when every reader thread is taken"""
+
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many agent responses in progress",
+            headers={"Retry-After": "1"}
+        )
+
+
+class BedrockAgentService:
+    """Invoke Bedrock agents and relay their answers as they are generated"""
+
+    def __init__(self, client: Any = None, max_streams: int = settings.bedrock_max_streams):
+        self.client = client or _create_client()
+        # A stream holds its reader thread for the whole answer, so readers get their
+        # own pool instead of starving DynamoDB calls in the default executor
+        self._executor = ThreadPoolExecutor(max_workers=max_streams, thread_name_prefix="bedrock-stream")
+        self._stream_slots = threading.BoundedSemaphore(max_streams)
+        self.breaker = CircuitBreaker(
+            "bedrock",
+            failure_threshold=settings.circuit_failure_threshold,
+            recovery_timeout=settings.circuit_recovery_timeout_seconds
+        )
+        self.agent_ids = {
+            'pm': settings.pm_agent_id,
+            'architect': settings.architect_agent_id,
+            'security': settings.security_agent_id,
+        }
+        self._readers: Set[asyncio.Future] = set()
+
+    def agent_id_for(self, agent_type: str) -> Optional[str]:
+        """Bedrock agent ID configured for an agent type, if any"""
+        return self.agent_ids.get(agent_type)
+
+    async def stream_agent(self, agent_id: str, session_id: str, input_text: str) -> AsyncIterator[str]:
+        """Yield the agent's answer text chunk by chunk as Bedrock streams it.
+
+        The blocking boto3 event stream is read in a thread of the service's
+        own pool that hands chunks to the event loop; when every thread is
+        busy, ``AgentStreamsBusy`` is raised. The first chunk must arrive
+        within the request deadline, if there is one; a started stream is
+        bounded by the Bedrock read timeout between chunks. Closing the
+        iterator early (e.g. the client went away) stops the reader and
+        closes the Bedrock stream.
+        """
+        left = remaining()
+        if left is not None and left <= 0:
+            raise DeadlineExceeded()
+        if not self._stream_slots.acquire(blocking=False):
+            raise AgentStreamsBusy()
+
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        stopped = threading.Event()
+
+        def put(item: Any):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+            except RuntimeError:
+                # The event loop is gone (shutdown); nobody is reading any more
+                stopped.set()
+
+        def read():
+            try:
+                for text in self._read_stream(agent_id, session_id, input_text, stopped):
+                    put(text)
+                put(_END)
+            except Exception as e:
+                put(e)
+            finally:
+                self._stream_slots.release()
+
+        # Like asyncio.to_thread: the reader sees the request's context (trace span)
+        context = contextvars.copy_context()
+        try:
+            reader = loop.run_in_executor(self._executor, functools.partial(context.run, read))
+        except BaseException:
+            self._stream_slots.release()
+            raise
+        self._readers.add(reader)
+        reader.add_done_callback(self._readers.discard)
+        first_chunk_timeout = left
+        try:
+            while True:
+                try:
+                    item = await asyncio.wait_for(queue.get(), first_chunk_timeout)
+                except asyncio.TimeoutError:
+                    raise DeadlineExceeded("Agent did not start answering before the request deadline")
+                first_chunk_timeout = None
+                if item is _END:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # The reader notices within one stream event; do not wait for it here
+            stopped.set()
+
+    def _read_stream(self, agent_id: str, session_id: str, input_text: str, stopped: threading.Event) -> Iterator[str]:
+        with tracer.start_as_current_span("Bedrock.InvokeAgent", kind=trace.SpanKind.CLIENT) as span:
+            span.set_attribute("gen_ai.system", "aws.bedrock")
+            span.set_attribute("aws.bedrock.agent_id", agent_id)
+            span.set_attribute("aws.bedrock.session_id", session_id)
+
+            started = time.perf_counter()
+            self.breaker.before_call()
+            try:
+                response = self.client.invoke_agent(
+                    agentId=agent_id,
+                    agentAliasId=settings.bedrock_agent_alias_id,
+                    sessionId=session_id,
+                    inputText=input_text
+                )
+
+                # A multi-byte character may be split across chunks
+                decoder = codecs.getincrementaldecoder('utf-8')()
+                chunk_count = 0
+                stream = response['completion']
+                try:
+                    for event in stream:
+                        if stopped.is_set():
+                            break
+                        chunk = event.get('chunk')
+                        if not chunk or 'bytes' not in chunk:
+                            continue
+                        if chunk_count == 0:
+                            BEDROCK_TIME_TO_FIRST_CHUNK.observe(time.perf_counter() - started)
+                            span.add_event("first_chunk")
+                        chunk_count += 1
+                        text = decoder.decode(chunk['bytes'])
+                        if text:
+                            yield text
+                    else:
+                        text = decoder.decode(b'', final=True)
+                        if text:
+                            yield text
+                finally:
+                    stream.close()
+            except Exception as e:
+                self.breaker.record_failure(e)
+                logger.error("Bedrock agent stream failed", agent_id=agent_id, error=str(e))
+                raise
+
+            self.breaker.record_success()
+            span.set_attribute("aws.bedrock.chunk_count", chunk_count)
+
+
+_bedrock_service: Optional[BedrockAgentService] = None
+
+
+def get_bedrock_service() -> BedrockAgentService:
+    """Get the shared Bedrock agent service"""
+    global _bedrock_service
+
+    if _bedrock_service is None:
+        _bedrock_service = BedrockAgentService()
+    return _bedrock_service
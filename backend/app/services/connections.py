@@ -0,0 +1,232 @@
+import asyncio
+import os
+import socket
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Optional, Set
+
+import structlog
+from fastapi import WebSocket, status
+from starlette.websockets import WebSocketState
+
+from app.config import settings
+from app.services.dynamodb import DynamoDBService, get_dynamodb_service
+from app.utils.metrics import WEBSOCKET_CONNECTIONS, WEBSOCKET_MESSAGES_SENT, WEBSOCKET_SLOW_DISCONNECTS
+from app.utils.responses import dumps
+
+
+logger = structlog.get_logger()
+
+# Identifies this worker in the connection registry
+SERVER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+def encode_frame(payload: Dict[str, Any]) -> str:
+    return dumps(payload).decode()
+
+
+class Connection:
+    """One client WebSocket with a bounded queue of frames waiting to be sent.
+
+    Only the connection's sender task writes to the socket, so frames are
+    sent in the order they were queued and a slow client never blocks the
+    code that queued them.
+    """
+
+    def __init__(self, websocket: WebSocket, user_id: str, queue_size: int):
+        self.websocket = websocket
+        self.user_id = user_id
+        self.connection_id = uuid.uuid4().hex
+        self.channels: Set[str] = set()
+        self.queue: "asyncio.Queue[str]" = asyncio.Queue(maxsize=queue_size)
+        self.sender: Optional[asyncio.Task] = None
+        self.dropped = False
+
+    def enqueue(self, frame: str) -> bool:
+        """Queue a frame without waiting; False when the client has fallen too far behind"""
+        try:
+            self.queue.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+
+class ConnectionManager:
+    """Open WebSocket connections of this worker and the channels they follow.
+
+    Connections are recorded in the ws-connections table so other processes
+    can tell who is online; pushes go out from the worker holding the socket.
+    """
+
+    def __init__(
+        self,
+        db_service: DynamoDBService,
+        queue_size: int = 100,
+        send_timeout: float = 5,
+        max_channels: int = 50,
+        connection_ttl: int = 86400,
+        max_batch: int = 50
+    ):
+        self.db_service = db_service
+        self.queue_size = queue_size
+        self.send_timeout = send_timeout
+        self.max_channels = max_channels
+        self.connection_ttl = connection_ttl
+        self.max_batch = max_batch
+
+        self._connections: Dict[str, Connection] = {}
+        self._channels: Dict[str, Set[Connection]] = {}
+        self._closing: Set[asyncio.Task] = set()
+
+    @property
+    def connection_count(self) -> int:
+        return len(self._connections)
+
+    def subscribers(self, channel_id: str) -> int:
+        return len(self._channels.get(channel_id, ()))
+
+    async def connect(self, websocket: WebSocket, user_id: str) -> Connection:
+        """Accept a WebSocket, start its sender and register it"""
+        await websocket.accept()
+        connection = Connection(websocket, user_id, self.queue_size)
+        connection.sender = asyncio.create_task(self._send_loop(connection))
+        self._connections[connection.connection_id] = connection
+        WEBSOCKET_CONNECTIONS.inc()
+
+        try:
+            await self.db_service.put_connection({
+                'connection_id': connection.connection_id,
+                'user_id': user_id,
+                'server_id': SERVER_ID,
+                'connected_at': datetime.utcnow(),
+                'ttl': int(time.time()) + self.connection_ttl
+            })
+        except Exception as e:
+            # Pushes from this worker do not depend on the registry
+            logger.warning("Failed to register WebSocket connection", connection_id=connection.connection_id, error=str(e))
+
+        logger.info("WebSocket connected", connection_id=connection.connection_id, user_id=user_id)
+        return connection
+
+    async def disconnect(self, connection: Connection, code: int = status.WS_1000_NORMAL_CLOSURE):
+        """Close and forget a connection; safe to call more than once"""
+        if self._connections.pop(connection.connection_id, None) is None:
+            return
+        WEBSOCKET_CONNECTIONS.dec()
+
+        for channel_id in connection.channels:
+            self._unsubscribe(connection, channel_id)
+
+        if connection.sender is not asyncio.current_task():
+            connection.sender.cancel()
+
+        if connection.websocket.application_state != WebSocketState.DISCONNECTED:
+            try:
+                await asyncio.wait_for(connection.websocket.close(code=code), self.send_timeout)
+            except Exception:
+                pass
+
+        try:
+            await self.db_service.delete_connection(connection.connection_id)
+        except Exception as e:
+            logger.warning("Failed to delete WebSocket connection", connection_id=connection.connection_id, error=str(e))
+
+        logger.info("WebSocket disconnected", connection_id=connection.connection_id, code=code)
+
+    def subscribe(self, connection: Connection, channel_id: str) -> bool:
+        """Follow a channel; False when the connection already follows too many"""
+        if channel_id not in connection.channels and len(connection.channels) >= self.max_channels:
+            return False
+        connection.channels.add(channel_id)
+        self._channels.setdefault(channel_id, set()).add(connection)
+        return True
+
+    def unsubscribe(self, connection: Connection, channel_id: str):
+        connection.channels.discard(channel_id)
+        self._unsubscribe(connection, channel_id)
+
+    def _unsubscribe(self, connection: Connection, channel_id: str):
+        subscribers = self._channels.get(channel_id)
+        if subscribers is None:
+            return
+        subscribers.discard(connection)
+        if not subscribers:
+            del self._channels[channel_id]
+
+    def send(self, connection: Connection, payload: Dict[str, Any]):
+        """Queue a frame for one connection"""
+        if not connection.enqueue(encode_frame(payload)):
+            self._drop_slow(connection)
+
+    def publish(self, channel_id: str, payload: Dict[str, Any]) -> int:
+        """Queue a frame for every subscriber of a channel without waiting on any of them.
+
+        The payload is encoded once. Subscribers whose queue is full are
+        disconnected; they reconnect and reload history instead of holding
+        back memory for everyone else. Returns the number of connections
+        the frame was queued for.
+        """
+        subscribers = self._channels.get(channel_id)
+        if not subscribers:
+            return 0
+
+        frame = encode_frame(payload)
+        queued = 0
+        for connection in list(subscribers):
+            if connection.enqueue(frame):
+                queued += 1
+            else:
+                self._drop_slow(connection)
+        return queued
+
+    def _drop_slow(self, connection: Connection):
+        if connection.dropped or connection.connection_id not in self._connections:
+            return
+        connection.dropped = True
+        WEBSOCKET_SLOW_DISCONNECTS.inc()
+        logger.warning("Closing slow WebSocket consumer", connection_id=connection.connection_id)
+        task = asyncio.create_task(self.disconnect(connection, code=status.WS_1013_TRY_AGAIN_LATER))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def _send_loop(self, connection: Connection):
+        while True:
+            frames = [await connection.queue.get()]
+            # Frames that piled up while the last send was in flight go out together
+            while len(frames) < self.max_batch and not connection.queue.empty():
+                frames.append(connection.queue.get_nowait())
+            
+            data = frames[0] if len(frames) == 1 else '{"type":"batch","events":[' + ",".join(frames) + "]}"
+            try:
+                await asyncio.wait_for(connection.websocket.send_text(data), self.send_timeout)
+            except Exception as e:
+                logger.info("WebSocket send failed", connection_id=connection.connection_id, error=str(e))
+                await self.disconnect(connection, code=status.WS_1011_INTERNAL_ERROR)
+                return
+            WEBSOCKET_MESSAGES_SENT.inc(len(frames))
+
+    async def close_all(self):
+        """Close every connection, e.g. on shutdown"""
+        await asyncio.gather(
+            *(self.disconnect(connection, code=status.WS_1001_GOING_AWAY) for connection in list(self._connections.values()))
+        )
+
+
+_connection_manager: Optional[ConnectionManager] = None
+
+
+def get_connection_manager() -> ConnectionManager:
+    """Get this worker's WebSocket connection manager"""
+    global _connection_manager
+
+    if _connection_manager is None:
+        _connection_manager = ConnectionManager(
+            get_dynamodb_service(),
+            queue_size=settings.ws_send_queue_size,
+            send_timeout=settings.ws_send_timeout_seconds,
+            max_channels=settings.ws_max_channels_per_connection,
+            connection_ttl=settings.ws_connection_ttl_seconds,
+            max_batch=settings.ws_max_batch_size
+        )
+    return _connection_manager
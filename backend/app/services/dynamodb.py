@@ -1,26 +1,54 @@
+import asyncio
 import boto3
 from boto3.dynamodb.conditions import Key, Attr
+from botocore.config import Config
 from botocore.exceptions import ClientError
-from typing import Optional, Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor
+from opentelemetry import trace
+from typing import Optional, Dict, Any, AsyncIterator, List, Tuple
 import structlog
 from datetime import datetime
 import uuid
 import json
 
 from app.config import settings
+from app.services.archive import MessageArchive
+from app.services.batch_writer import BatchWriter, CounterBatcher
+from app.utils.capacity import record_consumed_capacity
+from app.utils.circuit_breaker import CallOutcome, CircuitBreaker, CircuitOpenError, StaleCache
+from app.utils.deadline import DeadlineExceeded, call_timeout, remaining
+from app.utils.ids import new_message_id, ulid_timestamp
+from app.utils.message_cache import MessageCache
+from app.utils.timing import timed
 
 
 logger = structlog.get_logger()
+tracer = trace.get_tracer(__name__)
+
+
+def _json_default(value: Any) -> str:
+    """Encode nested values the same way top-level attributes are stored"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _client_config(max_attempts: int) -> Config:
+    return Config(
+        max_pool_connections=settings.dynamodb_max_pool_connections,
+        tcp_keepalive=True,
+        connect_timeout=settings.dynamodb_connect_timeout_seconds,
+        read_timeout=settings.dynamodb_read_timeout_seconds,
+        retries={'total_max_attempts': max_attempts, 'mode': 'standard'}
+    )
 
 
 class DynamoDBService:
     def __init__(self):
-        self.dynamodb = boto3.resource(
-            'dynamodb',
-            region_name=settings.aws_region,
-            aws_access_key_id=settings.aws_access_key_id,
-            aws_secret_access_key=settings.aws_secret_access_key
-        )
+        self.dynamodb = self._create_resource(settings.dynamodb_max_attempts)
+        # Same tables without retries, for calls made close to the request deadline
+        self.last_attempt_dynamodb = self._create_resource(1)
+        self._last_attempt_tables: Dict[str, Any] = {}
         
         # Table references
         self.projects_table = self.dynamodb.Table(settings.projects_table)
@@ -30,6 +58,51 @@ class DynamoDBService:
         self.channels_table = self.dynamodb.Table(settings.channels_table)
         self.artifacts_table = self.dynamodb.Table(settings.artifacts_table)
         self.ws_connections_table = self.dynamodb.Table(settings.ws_connections_table)
+        self.channel_members_table = self.dynamodb.Table(settings.channel_members_table)
+        
+        # Fail fast while DynamoDB is throttling or down; reads fall back to stale items
+        self.breaker = CircuitBreaker(
+            "dynamodb",
+            failure_threshold=settings.circuit_failure_threshold,
+            recovery_timeout=settings.circuit_recovery_timeout_seconds
+        )
+        self.stale_projects = StaleCache("dynamodb", max_age=settings.circuit_stale_max_age_seconds)
+        
+        # Bursts of agent messages share BatchWriteItem calls
+        self.message_writer = BatchWriter(
+            "messages",
+            self.batch_write_messages,
+            key=lambda item: item['message_id'],
+            max_delay=settings.message_batch_max_delay_ms / 1000,
+            max_retries=settings.message_batch_max_retries
+        ) if settings.message_write_behind else None
+        # Message counters of a busy channel (and its senders' cursors) take one update per burst
+        self.channel_message_counts = CounterBatcher(
+            "channel-message-counts",
+            self._add_channel_messages,
+            max_delay=settings.message_batch_max_delay_ms / 1000
+        )
+        self.sender_read_counts = CounterBatcher(
+            "sender-read-counts",
+            self._add_sender_reads,
+            max_delay=settings.message_batch_max_delay_ms / 1000
+        )
+        self.message_cache = MessageCache(
+            size=settings.message_cache_size,
+            max_channels=settings.message_cache_channels,
+            ttl=settings.message_cache_ttl_seconds
+        ) if settings.message_cache_size > 0 else None
+        # History older than the archive job's cutoff is read from S3
+        self.archive = MessageArchive() if settings.message_archive_enabled else None
+
+    def _create_resource(self, max_attempts: int):
+        return boto3.resource(
+            'dynamodb',
+            region_name=settings.aws_region,
+            aws_access_key_id=settings.aws_access_key_id,
+            aws_secret_access_key=settings.aws_secret_access_key,
+            config=_client_config(max_attempts)
+        )
 
     async def health_check(self) -> bool:
         """Check if DynamoDB is accessible"""
@@ -40,6 +113,85 @@ class DynamoDBService:
             logger.error("DynamoDB health check failed", error=str(e))
             raise
 
+    def warm_up(self, connections: int = 1):
+        """Open pooled connections before the first request needs them.
+
+        Each concurrent GetItem for a missing key resolves the endpoint,
+        completes a TLS handshake and leaves its connection in the pool.
+        """
+        def touch(_):
+            self.projects_table.get_item(Key={'project_id': '__warmup__'})
+        
+        with ThreadPoolExecutor(max_workers=connections) as executor:
+            list(executor.map(touch, range(connections)))
+
+    def _table_for_deadline(self, table):
+        """Drop retries when the request has no time left for them"""
+        left = remaining()
+        if left is None or left >= settings.dynamodb_retry_budget_seconds:
+            return table
+        if table is self.dynamodb:
+            return self.last_attempt_dynamodb
+        if table is self.dynamodb.meta.client:
+            return self.last_attempt_dynamodb.meta.client
+        if table.name not in self._last_attempt_tables:
+            self._last_attempt_tables[table.name] = self.last_attempt_dynamodb.Table(table.name)
+        return self._last_attempt_tables[table.name]
+
+    async def _call(self, table, operation: str, **kwargs) -> Dict[str, Any]:
+        """Run a single DynamoDB operation in a worker thread, bounded by the request deadline.
+
+        ``table`` is a Table, or the service resource (or its client) for
+        multi-table operations such as BatchWriteItem and TransactWriteItems.
+        """
+        kwargs.setdefault('ReturnConsumedCapacity', 'TOTAL')
+        timeout = call_timeout(settings.dynamodb_call_timeout_seconds)
+        method = getattr(self._table_for_deadline(table), operation)
+        outcome = CallOutcome(self.breaker)
+        with tracer.start_as_current_span(f"DynamoDB.{operation}", kind=trace.SpanKind.CLIENT) as span:
+            with timed("db"):
+                try:
+                    response = await asyncio.wait_for(
+                        asyncio.to_thread(self.breaker.call_once, outcome, method, **kwargs),
+                        timeout
+                    )
+                except asyncio.TimeoutError:
+                    # The thread finishes on its own, bounded by the botocore read timeout;
+                    # its late result is not recorded again
+                    outcome.failure(TimeoutError())
+                    raise DeadlineExceeded(f"DynamoDB {operation} timed out after {timeout:.2f}s")
+            
+            record_consumed_capacity(operation, response.get('ConsumedCapacity'))
+            if span.is_recording():
+                self._annotate_span(span, table, operation, kwargs, response)
+            return response
+
+    def _annotate_span(self, span, table, operation: str, request: Dict[str, Any], response: Dict[str, Any]):
+        """Record table, operation, capacity and item counts on a DynamoDB span"""
+        span.set_attribute("db.system", "dynamodb")
+        span.set_attribute("db.operation", operation)
+        if 'RequestItems' in request:
+            table_names = list(request['RequestItems'])
+        elif 'TransactItems' in request:
+            table_names = sorted({next(iter(action.values()))['TableName'] for action in request['TransactItems']})
+        else:
+            table_names = [table.name]
+        span.set_attribute("aws.dynamodb.table_names", table_names)
+        if 'IndexName' in request:
+            span.set_attribute("aws.dynamodb.index_name", request['IndexName'])
+        if 'Count' in response:
+            span.set_attribute("aws.dynamodb.count", int(response['Count']))
+        if 'ScannedCount' in response:
+            span.set_attribute("aws.dynamodb.scanned_count", int(response['ScannedCount']))
+        
+        consumed = response.get('ConsumedCapacity')
+        if consumed:
+            entries = consumed if isinstance(consumed, list) else [consumed]
+            span.set_attribute(
+                "aws.dynamodb.consumed_capacity",
+                [json.dumps(entry, default=str) for entry in entries]
+            )
+
     def _serialize_item(self, item: Dict[str, Any]) -> Dict[str, Any]:
         """Serialize item for DynamoDB storage"""
         serialized = {}
@@ -47,7 +199,7 @@ class DynamoDBService:
             if isinstance(value, datetime):
                 serialized[key] = value.isoformat()
             elif isinstance(value, (dict, list)):
-                serialized[key] = json.dumps(value, default=str)
+                serialized[key] = json.dumps(value, default=_json_default)
             else:
                 serialized[key] = value
         return serialized
@@ -57,14 +209,18 @@ class DynamoDBService:
         if not item:
             return item
             
+        with timed("deserialize"):
+            return self._deserialize_attributes(item)
+
+    def _deserialize_attributes(self, item: Dict[str, Any]) -> Dict[str, Any]:
         deserialized = {}
         for key, value in item.items():
-            if isinstance(value, str) and key in ['created_at', 'updated_at', 'started_at', 'completed_at', 'deadline']:
+            if isinstance(value, str) and key in ['created_at', 'updated_at', 'started_at', 'completed_at', 'deadline', 'timestamp', 'last_reply_at', 'last_read_at']:
                 try:
                     deserialized[key] = datetime.fromisoformat(value)
                 except ValueError:
                     deserialized[key] = value
-            elif isinstance(value, str) and key in ['requirements', 'metadata', 'settings', 'assigned_agents', 'team_members', 'channels']:
+            elif isinstance(value, str) and key in ['requirements', 'metadata', 'settings', 'assigned_agents', 'active_agents', 'team_members', 'channels', 'attachments']:
                 try:
                     deserialized[key] = json.loads(value)
                 except json.JSONDecodeError:
@@ -90,7 +246,8 @@ class DynamoDBService:
             serialized_data = self._serialize_item(project_data)
             
             # Store in DynamoDB
-            response = self.projects_table.put_item(
+            response = await self._call(
+                self.projects_table, 'put_item',
                 Item=serialized_data,
                 ConditionExpression='attribute_not_exists(project_id)'
             )
@@ -107,13 +264,23 @@ class DynamoDBService:
     async def get_project(self, project_id: str) -> Optional[Dict[str, Any]]:
         """Get project by ID"""
         try:
-            response = self.projects_table.get_item(
-                Key={'project_id': project_id}
-            )
+            try:
+                response = await self._call(
+                    self.projects_table, 'get_item',
+                    Key={'project_id': project_id}
+                )
+            except (CircuitOpenError, DeadlineExceeded):
+                stale = self.stale_projects.get(project_id)
+                if stale is None:
+                    raise
+                logger.warning("Serving stale project", project_id=project_id)
+                return self._deserialize_item(stale)
             
             if 'Item' not in response:
+                self.stale_projects.invalidate(project_id)
                 return None
-                
+            
+            self.stale_projects.set(project_id, response['Item'])
             return self._deserialize_item(response['Item'])
             
         except ClientError as e:
@@ -141,14 +308,15 @@ class DynamoDBService:
                 if isinstance(value, datetime):
                     expression_attribute_values[value_key] = value.isoformat()
                 elif isinstance(value, (dict, list)):
-                    expression_attribute_values[value_key] = json.dumps(value, default=str)
+                    expression_attribute_values[value_key] = json.dumps(value, default=_json_default)
                 else:
                     expression_attribute_values[value_key] = value
             
             # Remove trailing comma and space
             update_expression = update_expression.rstrip(", ")
             
-            response = self.projects_table.update_item(
+            response = await self._call(
+                self.projects_table, 'update_item',
                 Key={'project_id': project_id},
                 UpdateExpression=update_expression,
                 ExpressionAttributeNames=expression_attribute_names,
@@ -157,6 +325,7 @@ class DynamoDBService:
             )
             
             logger.info("Project updated", project_id=project_id)
+            self.stale_projects.set(project_id, response['Attributes'])
             return self._deserialize_item(response['Attributes'])
             
         except ClientError as e:
@@ -166,12 +335,14 @@ class DynamoDBService:
     async def delete_project(self, project_id: str) -> bool:
         """Delete project"""
         try:
-            self.projects_table.delete_item(
+            await self._call(
+                self.projects_table, 'delete_item',
                 Key={'project_id': project_id},
                 ConditionExpression='attribute_exists(project_id)'
             )
             
             logger.info("Project deleted", project_id=project_id)
+            self.stale_projects.invalidate(project_id)
             return True
             
         except ClientError as e:
@@ -205,13 +376,13 @@ class DynamoDBService:
                 if status:
                     query_kwargs['FilterExpression'] = Attr('status').eq(status)
                 
-                response = self.projects_table.query(**query_kwargs)
+                response = await self._call(self.projects_table, 'query', **query_kwargs)
             else:
                 # Scan all projects
                 if status:
                     query_kwargs['FilterExpression'] = Attr('status').eq(status)
                 
-                response = self.projects_table.scan(**query_kwargs)
+                response = await self._call(self.projects_table, 'scan', **query_kwargs)
             
             items = [self._deserialize_item(item) for item in response.get('Items', [])]
             
@@ -233,9 +404,9 @@ class DynamoDBService:
             if user_id:
                 query_kwargs['IndexName'] = 'user-projects-index'
                 query_kwargs['KeyConditionExpression'] = Key('user_id').eq(user_id)
-                response = self.projects_table.query(**query_kwargs)
+                response = await self._call(self.projects_table, 'query', **query_kwargs)
             else:
-                response = self.projects_table.scan(**query_kwargs)
+                response = await self._call(self.projects_table, 'scan', **query_kwargs)
             
             projects = [self._deserialize_item(item) for item in response.get('Items', [])]
             
@@ -258,4 +429,561 @@ class DynamoDBService:
             
         except ClientError as e:
             logger.error("Failed to get project stats", error=str(e))
-            raise
\ No newline at end of file
+            raise
+
+
+    # Message operations
+    async def create_message(self, message_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a message; its ID sorts by creation time within the channel.
+
+        With write-behind enabled the insert shares a BatchWriteItem call with
+        concurrent ones; it returns once that batch has been written. A reply
+        (``parent_message_id`` set) is written together with its parent's
+        reply count instead; see _create_reply.
+        """
+        try:
+            message_id = new_message_id()
+            message_data['message_id'] = message_id
+            message_data['timestamp'] = ulid_timestamp(message_id[len('msg_'):]).replace(tzinfo=None)
+            if message_data.get('parent_message_id'):
+                message_data['thread_id'] = message_data['parent_message_id']
+            else:
+                # Thread replies do not make the channel unread
+                seq = await self._count_message(message_data['channel_id'])
+                if seq is not None:
+                    message_data['seq'] = seq
+            
+            serialized_data = self._serialize_item(message_data)
+            
+            if message_data.get('parent_message_id'):
+                await self._create_reply(serialized_data)
+            elif self.message_writer is not None:
+                # BatchWriteItem takes no condition; a fresh ULID cannot overwrite an existing message
+                await self.message_writer.put(serialized_data)
+            else:
+                await self._call(
+                    self.messages_table, 'put_item',
+                    Item=serialized_data,
+                    ConditionExpression='attribute_not_exists(message_id)'
+                )
+            
+            if not message_data.get('parent_message_id'):
+                self._advance_sender(message_data['channel_id'], message_data['sender_id'])
+            
+            logger.info("Message created", message_id=message_id, channel_id=message_data['channel_id'])
+            message = self._deserialize_item(serialized_data)
+            self.cache_message(message['channel_id'], message)
+            return message
+            
+        except ClientError as e:
+            logger.error("Failed to create message", error=str(e))
+            raise
+
+    async def _create_reply(self, item: Dict[str, Any]):
+        """Put a reply and count it on its parent in one transaction.
+
+        The parent gets ``thread_id`` set to its own ID, so the sparse
+        thread-index holds the root next to its replies, and ``reply_count``
+        is incremented in place; counts are never recomputed by reading the
+        thread. Replies to replies are rejected, and so are replies to
+        archived messages: the parent is no longer in the table to count them.
+        """
+        parent_id = item['parent_message_id']
+        try:
+            await self._call(
+                self.dynamodb.meta.client, 'transact_write_items',
+                TransactItems=[
+                    {'Put': {
+                        'TableName': settings.messages_table,
+                        'Item': item,
+                        'ConditionExpression': 'attribute_not_exists(message_id)'
+                    }},
+                    {'Update': {
+                        'TableName': settings.messages_table,
+                        'Key': {'channel_id': item['channel_id'], 'message_id': parent_id},
+                        'UpdateExpression': 'SET thread_id = :thread_id, last_reply_at = :timestamp ADD reply_count :one',
+                        'ConditionExpression': 'attribute_exists(message_id) AND attribute_not_exists(parent_message_id)',
+                        'ExpressionAttributeValues': {
+                            ':thread_id': parent_id,
+                            ':timestamp': item['timestamp'],
+                            ':one': 1
+                        }
+                    }}
+                ]
+            )
+        except ClientError as e:
+            reasons = e.response.get('CancellationReasons', [])
+            if len(reasons) > 1 and reasons[1].get('Code') == 'ConditionalCheckFailed':
+                if self.archive is not None and await self.archive.get_message(item['channel_id'], parent_id):
+                    raise ValueError("Parent message is archived and can no longer be replied to")
+                raise ValueError("Parent message not found in this channel, or is itself a reply")
+            raise
+
+    async def get_message(self, channel_id: str, message_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            response = await self._call(
+                self.messages_table, 'get_item',
+                Key={'channel_id': channel_id, 'message_id': message_id}
+            )
+            item = response.get('Item')
+            if item is None and self.archive is not None:
+                item = await self.archive.get_message(channel_id, message_id)
+            return self._deserialize_item(item)
+            
+        except ClientError as e:
+            logger.error("Failed to get message", message_id=message_id, error=str(e))
+            raise
+
+    async def get_thread(self, message_id: str, limit: int = 50, after: Optional[str] = None) -> Dict[str, Any]:
+        """Get a thread root (with its reply count) and its oldest ``limit`` replies newer than ``after``.
+
+        One query on the sparse thread-index. ``root`` is None when the
+        message has no replies yet, or on pages after the first.
+        """
+        try:
+            key_condition = Key('thread_id').eq(message_id)
+            if after:
+                key_condition = key_condition & Key('message_id').gt(after)
+            
+            response = await self._call(
+                self.messages_table, 'query',
+                IndexName='thread-index',
+                KeyConditionExpression=key_condition,
+                # The root sorts first (its ULID is older than every reply)
+                Limit=limit if after else limit + 1
+            )
+            
+            items = [self._deserialize_item(item) for item in response.get('Items', [])]
+            root = items.pop(0) if items and items[0]['message_id'] == message_id else None
+            return {
+                'root': root,
+                'replies': items,
+                'has_more': 'LastEvaluatedKey' in response
+            }
+            
+        except ClientError as e:
+            logger.error("Failed to get thread", message_id=message_id, error=str(e))
+            raise
+
+    async def batch_write_messages(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Put up to 25 serialized messages in one BatchWriteItem; returns the unprocessed ones"""
+        response = await self._call(
+            self.dynamodb, 'batch_write_item',
+            RequestItems={settings.messages_table: [{'PutRequest': {'Item': item}} for item in items]}
+        )
+        unprocessed = response.get('UnprocessedItems', {}).get(settings.messages_table, [])
+        return [request['PutRequest']['Item'] for request in unprocessed]
+
+    async def get_messages(
+        self,
+        channel_id: str,
+        limit: int = 50,
+        before: Optional[str] = None,
+        after: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Get the newest ``limit`` messages of a channel older than ``before``,
+        or with ``after``, the oldest ``limit`` messages newer than it.
+
+        Active channels are answered from the recent-message cache. Otherwise
+        this is one key-range query, so the cost depends on the page size
+        only, never on how many messages the channel holds. Items come back
+        oldest first.
+        """
+        if self.message_cache is not None:
+            if after:
+                cached = self.message_cache.since(channel_id, after, limit)
+            else:
+                cached = self.message_cache.latest(channel_id, limit, before)
+            if cached is not None:
+                return cached
+        
+        try:
+            archived = None
+            if after and self.archive is not None:
+                # Messages just after an old ``after`` may have been archived
+                archived = await self.archive.read_after(channel_id, after, limit)
+                if archived['items']:
+                    after = archived['items'][-1]['message_id']
+            
+            key_condition = Key('channel_id').eq(channel_id)
+            if after:
+                key_condition = key_condition & Key('message_id').gt(after)
+            elif before:
+                key_condition = key_condition & Key('message_id').lt(before)
+            
+            # A channel's first read fetches a whole cache ring so later opens hit it
+            warm_cache = self.message_cache is not None and not before and not after
+            if warm_cache:
+                query_limit = max(limit, self.message_cache.size)
+                # Hold back messages published while the query runs; load() merges them
+                self.message_cache.begin_load(channel_id)
+            elif archived is not None:
+                # With a full archived page, one item tells whether more follow
+                query_limit = max(limit - len(archived['items']), 1)
+            else:
+                query_limit = limit
+            
+            try:
+                response = await self._call(
+                    self.messages_table, 'query',
+                    KeyConditionExpression=key_condition,
+                    ScanIndexForward=bool(after),
+                    Limit=query_limit
+                )
+                
+                items = [self._deserialize_item(item) for item in response.get('Items', [])]
+                if not after:
+                    items.reverse()
+                # More messages exist if the query stopped at the limit
+                has_more = 'LastEvaluatedKey' in response
+                
+                if archived is not None:
+                    wanted = limit - len(archived['items'])
+                    has_more = has_more or archived['has_more'] or len(items) > wanted
+                    items = [self._deserialize_item(item) for item in archived['items']] + items[:wanted]
+                elif not after and not has_more and self.archive is not None:
+                    # The table ran out; older history is in the archive
+                    older = await self.archive.read_before(
+                        channel_id, items[0]['message_id'] if items else before, max(limit - len(items), 0)
+                    )
+                    items = [self._deserialize_item(item) for item in older['items']] + items
+                    has_more = older['has_more']
+            except BaseException:
+                if warm_cache:
+                    self.message_cache.abort_load(channel_id)
+                raise
+            
+            if warm_cache:
+                self.message_cache.load(channel_id, items, complete=not has_more)
+                has_more = has_more or len(items) > limit
+                items = items[-limit:]
+            
+            return {'items': items, 'has_more': has_more}
+            
+        except ClientError as e:
+            logger.error("Failed to get messages", channel_id=channel_id, error=str(e))
+            raise
+
+    async def _batch_get(self, table_name: str, keys: List[Dict[str, Any]], **kwargs) -> List[Dict[str, Any]]:
+        """Get items by key with BatchGetItem, 100 keys per call; unprocessed keys are requested again"""
+        items = []
+        for start in range(0, len(keys), 100):
+            request = {'Keys': keys[start:start + 100], **kwargs}
+            for _ in range(settings.message_batch_max_retries + 1):
+                response = await self._call(self.dynamodb, 'batch_get_item', RequestItems={table_name: request})
+                items.extend(response.get('Responses', {}).get(table_name, []))
+                unprocessed = response.get('UnprocessedKeys', {}).get(table_name)
+                if not unprocessed:
+                    break
+                request = unprocessed
+        return items
+
+    async def batch_get_messages(self, keys: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        """Get messages by (channel_id, message_id) key, in the order of ``keys``; missing ones are left out.
+
+        Messages no longer in the table are looked up in the archive, when enabled.
+        """
+        try:
+            items = await self._batch_get(
+                settings.messages_table,
+                [{'channel_id': key['channel_id'], 'message_id': key['message_id']} for key in keys]
+            )
+            found = {(item['channel_id'], item['message_id']): item for item in items}
+            if self.archive is not None:
+                for key in keys:
+                    if (key['channel_id'], key['message_id']) not in found:
+                        item = await self.archive.get_message(key['channel_id'], key['message_id'])
+                        if item is not None:
+                            found[(key['channel_id'], key['message_id'])] = item
+            return [
+                self._deserialize_item(found[(key['channel_id'], key['message_id'])])
+                for key in keys
+                if (key['channel_id'], key['message_id']) in found
+            ]
+            
+        except ClientError as e:
+            logger.error("Failed to get messages by key", count=len(keys), error=str(e))
+            raise
+
+    async def scan_messages(self, page_size: int = 1000) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield every stored message, a page at a time, in no particular order"""
+        scan_kwargs: Dict[str, Any] = {
+            'Limit': page_size,
+            'ProjectionExpression': 'channel_id, message_id, content'
+        }
+        while True:
+            try:
+                response = await self._call(self.messages_table, 'scan', **scan_kwargs)
+            except ClientError as e:
+                logger.error("Failed to scan messages", error=str(e))
+                raise
+            yield response.get('Items', [])
+            if 'LastEvaluatedKey' not in response:
+                return
+            scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    async def get_oldest_messages(self, channel_id: str, before: str, limit: int) -> List[Dict[str, Any]]:
+        """Up to ``limit`` of a channel's oldest messages older than ``before``, as stored, oldest first"""
+        try:
+            items: List[Dict[str, Any]] = []
+            query_kwargs: Dict[str, Any] = {
+                'KeyConditionExpression': Key('channel_id').eq(channel_id) & Key('message_id').lt(before)
+            }
+            while len(items) < limit:
+                response = await self._call(self.messages_table, 'query', Limit=limit - len(items), **query_kwargs)
+                items.extend(response.get('Items', []))
+                if 'LastEvaluatedKey' not in response:
+                    break
+                query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+            return items
+            
+        except ClientError as e:
+            logger.error("Failed to get oldest messages", channel_id=channel_id, error=str(e))
+            raise
+
+    async def delete_messages(self, channel_id: str, message_ids: List[str]):
+        """Delete messages with BatchWriteItem, 25 per call; unprocessed deletes are sent again"""
+        try:
+            for start in range(0, len(message_ids), 25):
+                requests = [
+                    {'DeleteRequest': {'Key': {'channel_id': channel_id, 'message_id': message_id}}}
+                    for message_id in message_ids[start:start + 25]
+                ]
+                for _ in range(settings.message_batch_max_retries + 1):
+                    response = await self._call(
+                        self.dynamodb, 'batch_write_item',
+                        RequestItems={settings.messages_table: requests}
+                    )
+                    requests = response.get('UnprocessedItems', {}).get(settings.messages_table)
+                    if not requests:
+                        break
+                else:
+                    raise RuntimeError(f"{len(requests)} message deletes unprocessed")
+            
+        except ClientError as e:
+            logger.error("Failed to delete messages", channel_id=channel_id, error=str(e))
+            raise
+
+    def cache_message(self, channel_id: str, message: Dict[str, Any]):
+        """Record a message written on any node in this node's recent-message cache"""
+        if self.message_cache is not None:
+            if self.message_cache.add(channel_id, message) and message.get('parent_message_id'):
+                self.message_cache.count_reply(channel_id, message['parent_message_id'], message['timestamp'])
+
+    # Channel operations
+    async def get_channel(self, channel_id: str) -> Optional[Dict[str, Any]]:
+        """Get channel by ID"""
+        try:
+            response = await self._call(
+                self.channels_table, 'get_item',
+                Key={'channel_id': channel_id}
+            )
+            return self._deserialize_item(response['Item']) if 'Item' in response else None
+            
+        except ClientError as e:
+            logger.error("Failed to get channel", channel_id=channel_id, error=str(e))
+            raise
+
+    async def get_project_channel_ids(self, project_id: str) -> List[str]:
+        try:
+            channel_ids = []
+            query_kwargs: Dict[str, Any] = {
+                'IndexName': 'project-channels-index',
+                'KeyConditionExpression': Key('project_id').eq(project_id),
+                'ProjectionExpression': 'channel_id'
+            }
+            while True:
+                response = await self._call(self.channels_table, 'query', **query_kwargs)
+                channel_ids.extend(item['channel_id'] for item in response.get('Items', []))
+                if 'LastEvaluatedKey' not in response:
+                    return channel_ids
+                query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+            
+        except ClientError as e:
+            logger.error("Failed to get project channels", project_id=project_id, error=str(e))
+            raise
+
+    async def list_channel_ids(self) -> List[str]:
+        try:
+            channel_ids = []
+            scan_kwargs: Dict[str, Any] = {'ProjectionExpression': 'channel_id'}
+            while True:
+                response = await self._call(self.channels_table, 'scan', **scan_kwargs)
+                channel_ids.extend(item['channel_id'] for item in response.get('Items', []))
+                if 'LastEvaluatedKey' not in response:
+                    return channel_ids
+                scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+            
+        except ClientError as e:
+            logger.error("Failed to list channels", error=str(e))
+            raise
+
+    # Read cursors
+    async def _count_message(self, channel_id: str) -> Optional[int]:
+        """Count a new message on its channel; returns its ``seq``, the channel's count including it.
+
+        A member's unread count is the channel's ``message_count`` minus the
+        member's ``read_count``, and reading up to a message sets
+        ``read_count`` to that message's ``seq``. A message costs one counter
+        update however many members the channel has, and concurrent messages
+        of a channel share it. Counting is best effort and happens before the
+        message is written, so the message can carry its ``seq``; a failed
+        write leaves an extra unread message until the next read.
+        """
+        try:
+            return await self.channel_message_counts.add(channel_id)
+        except Exception as e:
+            logger.warning("Failed to count message", channel_id=channel_id, error=str(e))
+            return None
+
+    async def _add_channel_messages(self, channel_id: str, count: int) -> int:
+        response = await self._call(
+            self.channels_table, 'update_item',
+            Key={'channel_id': channel_id},
+            UpdateExpression='ADD message_count :count',
+            ExpressionAttributeValues={':count': count},
+            ReturnValues='UPDATED_NEW'
+        )
+        return int(response['Attributes']['message_count'])
+
+    def _advance_sender(self, channel_id: str, sender_id: str):
+        """Keep a sender's own message out of their unread count (best effort, after the response)"""
+        self.sender_read_counts.add_nowait((sender_id, channel_id))
+
+    async def _add_sender_reads(self, key: Tuple[str, str], count: int) -> Optional[int]:
+        sender_id, channel_id = key
+        try:
+            response = await self._call(
+                self.channel_members_table, 'update_item',
+                Key={'user_id': sender_id, 'channel_id': channel_id},
+                UpdateExpression='ADD read_count :count',
+                ConditionExpression='attribute_exists(user_id)',
+                ExpressionAttributeValues={':count': count},
+                ReturnValues='UPDATED_NEW'
+            )
+        except ClientError as e:
+            # Senders who never opened the channel have no cursor to advance
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
+            return None
+        return int(response['Attributes']['read_count'])
+
+    async def _message_seq(self, channel_id: str, message_id: str) -> Optional[int]:
+        response = await self._call(
+            self.messages_table, 'get_item',
+            Key={'channel_id': channel_id, 'message_id': message_id},
+            ProjectionExpression='seq'
+        )
+        item = response.get('Item')
+        if item is None and self.archive is not None:
+            item = await self.archive.get_message(channel_id, message_id)
+        seq = (item or {}).get('seq')
+        return None if seq is None else int(seq)
+
+    async def mark_channel_read(self, user_id: str, channel_id: str, message_id: str) -> bool:
+        """Move a user's read cursor to ``message_id``, clearing the channel's unread count.
+
+        ``read_count`` becomes the message's ``seq``, so messages counted
+        after it stay unread. Messages without one (sent before sequence
+        numbers existed, or whose counting failed) and unknown IDs fall back
+        to the channel's current count. Creates the cursor on first read.
+        Returns False when the cursor is already past ``message_id`` (e.g. a
+        stale tab), leaving it unchanged.
+        """
+        try:
+            read_count = await self._message_seq(channel_id, message_id)
+            if read_count is None:
+                response = await self._call(
+                    self.channels_table, 'get_item',
+                    Key={'channel_id': channel_id},
+                    ProjectionExpression='message_count',
+                    ConsistentRead=True
+                )
+                read_count = response.get('Item', {}).get('message_count', 0)
+            
+            await self._call(
+                self.channel_members_table, 'update_item',
+                Key={'user_id': user_id, 'channel_id': channel_id},
+                UpdateExpression=(
+                    'SET read_count = :count, last_read_message_id = :message_id, '
+                    'last_read_at = :now, joined_at = if_not_exists(joined_at, :now)'
+                ),
+                ConditionExpression='attribute_not_exists(last_read_message_id) OR last_read_message_id < :message_id',
+                ExpressionAttributeValues={
+                    ':count': read_count,
+                    ':message_id': message_id,
+                    ':now': datetime.utcnow().isoformat()
+                }
+            )
+            return True
+            
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                return False
+            logger.error("Failed to mark channel read", user_id=user_id, channel_id=channel_id, error=str(e))
+            raise
+
+    async def get_unread_counts(self, user_id: str) -> List[Dict[str, Any]]:
+        """Read cursors and unread counts for every channel the user has opened.
+
+        One query for the user's cursors and one BatchGetItem per 100
+        channels for their message counts, however many messages there are.
+        """
+        try:
+            cursors = []
+            query_kwargs: Dict[str, Any] = {'KeyConditionExpression': Key('user_id').eq(user_id)}
+            while True:
+                response = await self._call(self.channel_members_table, 'query', **query_kwargs)
+                cursors.extend(response.get('Items', []))
+                if 'LastEvaluatedKey' not in response:
+                    break
+                query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+            
+            channels = await self._batch_get(
+                settings.channels_table,
+                [{'channel_id': cursor['channel_id']} for cursor in cursors],
+                ProjectionExpression='channel_id, message_count'
+            ) if cursors else []
+            message_counts = {channel['channel_id']: channel.get('message_count', 0) for channel in channels}
+            
+            return [
+                {
+                    'channel_id': cursor['channel_id'],
+                    'unread_count': max(int(message_counts.get(cursor['channel_id'], 0) - cursor.get('read_count', 0)), 0),
+                    'last_read_message_id': cursor.get('last_read_message_id'),
+                    'last_read_at': self._deserialize_item(cursor).get('last_read_at')
+                }
+                for cursor in cursors
+            ]
+            
+        except ClientError as e:
+            logger.error("Failed to get unread counts", user_id=user_id, error=str(e))
+            raise
+
+    # WebSocket connection operations
+    async def put_connection(self, connection_data: Dict[str, Any]):
+        """Register an open WebSocket connection; ``ttl`` removes it if never deleted"""
+        try:
+            await self._call(self.ws_connections_table, 'put_item', Item=self._serialize_item(connection_data))
+        except ClientError as e:
+            logger.error("Failed to register connection", connection_id=connection_data['connection_id'], error=str(e))
+            raise
+
+    async def delete_connection(self, connection_id: str):
+        try:
+            await self._call(self.ws_connections_table, 'delete_item', Key={'connection_id': connection_id})
+        except ClientError as e:
+            logger.error("Failed to delete connection", connection_id=connection_id, error=str(e))
+            raise
+
+
+_dynamodb_service: Optional[DynamoDBService] = None
+
+
+def get_dynamodb_service() -> DynamoDBService:
+    """Get the shared DynamoDB service; its connection pool is reused across requests"""
+    global _dynamodb_service
+
+    if _dynamodb_service is None:
+        _dynamodb_service = DynamoDBService()
+    return _dynamodb_service
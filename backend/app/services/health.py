@@ -0,0 +1,196 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+import structlog
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.services.dynamodb import DynamoDBService
+
+
+logger = structlog.get_logger()
+
+
+@dataclass
+class Probe:
+    name: str
+    check: Callable[[], Any]  # Sync callable; raises when the dependency is unhealthy
+    critical: bool = True  # Critical dependencies gate readiness
+
+
+@dataclass
+class ProbeResult:
+    status: str = "unknown"  # unknown | healthy | unhealthy
+    latency_ms: Optional[float] = None
+    checked_at: Optional[datetime] = None
+    error: Optional[str] = None
+    critical: bool = True
+    checked_monotonic: float = field(default=0.0, repr=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "latency_ms": self.latency_ms,
+            "checked_at": self.checked_at.isoformat() if self.checked_at else None,
+            "error": self.error,
+            "critical": self.critical,
+        }
+
+
+class HealthMonitor:
+    """Probe dependencies in the background and serve their last known status.
+
+    Health endpoints read the cached results only, so load balancer checks
+    never reach DynamoDB, Redis or Bedrock. Results older than
+    ``stale_after`` intervals count as unhealthy, which catches a stuck
+    probe loop.
+    """
+
+    def __init__(
+        self,
+        probes: List[Probe],
+        interval: float = 15,
+        timeout: float = 5,
+        stale_after: int = 3
+    ):
+        self.probes = probes
+        self.interval = interval
+        self.timeout = timeout
+        self.stale_after = stale_after
+        self.results: Dict[str, ProbeResult] = {
+            probe.name: ProbeResult(critical=probe.critical) for probe in probes
+        }
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Run a first round of probes, then keep probing in the background"""
+        await self.check()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.check()
+            except Exception as e:
+                logger.error("Health probe round failed", error=str(e))
+
+    async def check(self):
+        """Probe every dependency concurrently and cache the results"""
+        await asyncio.gather(*(self._probe(probe) for probe in self.probes))
+
+    async def _probe(self, probe: Probe):
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(run_in_threadpool(probe.check), timeout=self.timeout)
+            status, error = "healthy", None
+        except asyncio.TimeoutError:
+            status, error = "unhealthy", f"Timed out after {self.timeout}s"
+        except Exception as e:
+            status, error = "unhealthy", str(e)
+
+        previous = self.results[probe.name].status
+        self.results[probe.name] = ProbeResult(
+            status=status,
+            latency_ms=round((time.perf_counter() - start) * 1000, 1),
+            checked_at=datetime.now(timezone.utc),
+            error=error,
+            critical=probe.critical,
+            checked_monotonic=time.monotonic()
+        )
+        if status != previous:
+            log = logger.info if status == "healthy" else logger.warning
+            log("Dependency health changed", dependency=probe.name, status=status, error=error)
+
+    def _current(self, result: ProbeResult) -> str:
+        if result.status == "unknown":
+            return "unknown"
+        if time.monotonic() - result.checked_monotonic > self.interval * self.stale_after:
+            return "unhealthy"
+        return result.status
+
+    def is_ready(self) -> bool:
+        """All critical dependencies were healthy at the last probe"""
+        return all(
+            self._current(result) == "healthy"
+            for result in self.results.values() if result.critical
+        )
+
+    def status(self) -> Dict[str, Any]:
+        """Cached health report; never calls out to dependencies"""
+        services = {}
+        for name, result in self.results.items():
+            report = result.to_dict()
+            report["status"] = self._current(result)
+            services[name] = report
+
+        if not self.is_ready():
+            overall = "unhealthy"
+        elif any(report["status"] != "healthy" for report in services.values()):
+            overall = "degraded"
+        else:
+            overall = "healthy"
+
+        return {
+            "status": overall,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "services": services,
+        }
+
+
+def _check_dynamodb(service: DynamoDBService) -> Callable[[], Any]:
+    table = service.projects_table
+
+    def check():
+        # A DescribeTable call on every probe; Table.table_status is loaded once and then cached
+        return table.meta.client.describe_table(TableName=table.name)['Table']['TableStatus']
+    return check
+
+
+def _check_redis() -> Any:
+    import redis
+
+    client = redis.Redis.from_url(
+        settings.redis_url,
+        socket_timeout=settings.health_check_timeout_seconds,
+        socket_connect_timeout=settings.health_check_timeout_seconds
+    )
+    try:
+        client.ping()
+    finally:
+        client.close()
+
+
+def _check_bedrock() -> Any:
+    import boto3
+
+    client = boto3.client('bedrock', region_name=settings.bedrock_region)
+    client.get_foundation_model(modelIdentifier=settings.bedrock_model_id)
+
+
+def create_health_monitor(dynamodb_service: DynamoDBService) -> HealthMonitor:
+    """Build the health monitor for the dependencies configured in settings"""
+    probes = [Probe("dynamodb", _check_dynamodb(dynamodb_service))]
+    # Redis and Bedrock degrade features but do not take the API out of rotation
+    if settings.redis_url:
+        probes.append(Probe("redis", _check_redis, critical=False))
+    if settings.health_check_bedrock:
+        probes.append(Probe("bedrock", _check_bedrock, critical=False))
+
+    return HealthMonitor(
+        probes,
+        interval=settings.health_check_interval_seconds,
+        timeout=settings.health_check_timeout_seconds
+    )
@@ -0,0 +1,99 @@
+import asyncio
+from typing import Any, Callable, Dict, Optional
+
+import orjson
+import structlog
+
+from app.config import settings
+from app.utils.responses import dumps
+
+
+logger = structlog.get_logger()
+
+# Receives (channel_id, payload) for every event published by any node
+EventHandler = Callable[[str, Dict[str, Any]], Any]
+
+
+class InProcessPubSub:
+    """Channel event bus for a single process; events reach the handler directly"""
+
+    def __init__(self):
+        self._handler: Optional[EventHandler] = None
+
+    async def start(self, handler: EventHandler):
+        self._handler = handler
+
+    async def stop(self):
+        self._handler = None
+
+    async def publish(self, channel_id: str, payload: Dict[str, Any]):
+        if self._handler is not None:
+            self._handler(channel_id, payload)
+
+
+class RedisPubSub:
+    """Channel event bus shared by all API nodes through one Redis pub/sub topic.
+
+    Every node receives every event and hands it to its local handler, which
+    ignores channels nobody on that node follows. Events published while a
+    node is disconnected from Redis are not replayed; clients reload history
+    when their WebSocket reconnects.
+    """
+
+    def __init__(self, url: str, topic: str, reconnect_delay: float = 1.0):
+        import redis.asyncio as redis
+
+        self.topic = topic
+        self.reconnect_delay = reconnect_delay
+        self._redis = redis.Redis.from_url(url)
+        self._listener: Optional[asyncio.Task] = None
+
+    async def start(self, handler: EventHandler):
+        self._listener = asyncio.create_task(self._listen(handler))
+
+    async def stop(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        await self._redis.aclose()
+
+    async def publish(self, channel_id: str, payload: Dict[str, Any]):
+        await self._redis.publish(self.topic, dumps([channel_id, payload]))
+
+    async def _listen(self, handler: EventHandler):
+        while True:
+            pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.topic)
+                async for message in pubsub.listen():
+                    try:
+                        channel_id, payload = orjson.loads(message["data"])
+                        handler(channel_id, payload)
+                    except Exception as e:
+                        logger.error("Failed to deliver channel event", error=str(e))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Redis pub/sub connection lost", topic=self.topic, error=str(e))
+                await asyncio.sleep(self.reconnect_delay)
+            finally:
+                await pubsub.aclose()
+
+
+_pubsub = None
+
+
+def get_pubsub():
+    """Get the channel event bus: Redis when configured, otherwise in-process"""
+    global _pubsub
+
+    if _pubsub is None:
+        if settings.redis_url:
+            _pubsub = RedisPubSub(settings.redis_url, f"{settings.project_name}:{settings.environment}:channel-events")
+        else:
+            _pubsub = InProcessPubSub()
+    return _pubsub
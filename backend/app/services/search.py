@@ -0,0 +1,46 @@
+import asyncio
+from typing import Optional
+
+import structlog
+
+from app.config import settings
+from app.services.dynamodb import DynamoDBService
+from app.utils.search_index import SearchIndex
+
+
+logger = structlog.get_logger()
+
+
+async def backfill_search_index(index: SearchIndex, db_service: DynamoDBService):
+    """Index the messages already stored when this node started.
+
+    Call ``index.begin_backfill()`` before new messages start arriving, so
+    messages seen both live and by the scan are indexed once.
+    """
+    indexed = 0
+    try:
+        async for page in db_service.scan_messages():
+            for item in page:
+                index.add_existing(item['channel_id'], item)
+            indexed += len(page)
+            # Let requests run between pages
+            await asyncio.sleep(0)
+        logger.info("Search index backfilled", messages=indexed)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.error("Search index backfill failed", messages=indexed, error=str(e))
+    finally:
+        index.end_backfill()
+
+
+_search_index: Optional[SearchIndex] = None
+
+
+def get_search_index() -> Optional[SearchIndex]:
+    """Get this node's message search index; None when search is disabled"""
+    global _search_index
+
+    if _search_index is None and settings.search_index_enabled:
+        _search_index = SearchIndex()
+    return _search_index
@@ -5,6 +5,8 @@ from typing import Optional, Dict, Any
 import structlog
 
 from app.config import settings
+from app.utils.jwks import JWKSCache, get_jwks_cache
+from app.utils.timing import timed
 
 
 logger = structlog.get_logger()
@@ -14,12 +16,17 @@ security = HTTPBearer()
 def verify_token(token: str) -> Dict[str, Any]:
     """Verify JWT token and return payload"""
     try:
-        payload = jwt.decode(
-            token,
-            settings.secret_key,
-            algorithms=[settings.algorithm]
-        )
-        return payload
+        with timed("auth"):
+            jwks_cache = get_jwks_cache()
+            if jwks_cache is not None:
+                return verify_cognito_token(token, jwks_cache)
+
+            payload = jwt.decode(
+                token,
+                settings.secret_key,
+                algorithms=[settings.algorithm]
+            )
+            return payload
     except JWTError as e:
         logger.error("Token verification failed", error=str(e))
         raise HTTPException(
@@ -29,6 +36,34 @@ def verify_token(token: str) -> Dict[str, Any]:
         )
 
 
+def verify_cognito_token(token: str, jwks_cache: JWKSCache) -> Dict[str, Any]:
+    """Verify an RS256 Cognito token against the cached user pool keys"""
+    header = jwt.get_unverified_header(token)
+    key = jwks_cache.get_key(header.get("kid"))
+    if key is None:
+        raise JWTError("Unknown signing key")
+
+    payload = jwt.decode(
+        token,
+        key,
+        algorithms=["RS256"],
+        issuer=settings.get_cognito_issuer(),
+        options={"verify_aud": False}
+    )
+
+    # ID tokens carry the app client in `aud`, access tokens in `client_id`
+    token_use = payload.get("token_use")
+    if token_use not in ("id", "access"):
+        raise JWTError("Invalid token use")
+
+    if settings.user_pool_client_id:
+        client_id = payload.get("aud") if token_use == "id" else payload.get("client_id")
+        if client_id != settings.user_pool_client_id:
+            raise JWTError("Invalid token audience")
+
+    return payload
+
+
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ) -> Dict[str, Any]:
@@ -0,0 +1,58 @@
+from contextvars import ContextVar, Token
+from typing import Any, Dict, List, Optional
+
+from app.utils.metrics import DYNAMODB_CONSUMED_CAPACITY
+
+
+WRITE_OPERATIONS = {'put_item', 'update_item', 'delete_item', 'batch_write_item', 'transact_write_items'}
+
+# Per-request {table: [read_units, write_units]}; shared with child tasks like the timings
+_request_capacity: ContextVar[Optional[Dict[str, List[float]]]] = ContextVar("request_capacity", default=None)
+
+
+def start_request_capacity() -> Token:
+    """Begin accumulating consumed capacity for the current request"""
+    return _request_capacity.set({})
+
+
+def stop_request_capacity(token: Token):
+    _request_capacity.reset(token)
+
+
+def get_request_capacity() -> Dict[str, Dict[str, float]]:
+    """Read and write units consumed per table so far in the current request"""
+    capacity = _request_capacity.get() or {}
+    return {
+        table: {"rcu": round(read, 2), "wcu": round(write, 2)}
+        for table, (read, write) in capacity.items()
+    }
+
+
+def record_consumed_capacity(operation: str, consumed: Any):
+    """Account the ConsumedCapacity of one DynamoDB response"""
+    if not consumed:
+        return
+    entries = consumed if isinstance(consumed, list) else [consumed]
+    capacity = _request_capacity.get()
+
+    for entry in entries:
+        table = entry.get('TableName', 'unknown')
+        total = float(entry.get('CapacityUnits', 0))
+        # TOTAL only splits read/write for some operations; otherwise go by operation type
+        if 'ReadCapacityUnits' in entry or 'WriteCapacityUnits' in entry:
+            read = float(entry.get('ReadCapacityUnits', 0))
+            write = float(entry.get('WriteCapacityUnits', 0))
+        elif operation in WRITE_OPERATIONS:
+            read, write = 0.0, total
+        else:
+            read, write = total, 0.0
+
+        if read:
+            DYNAMODB_CONSUMED_CAPACITY.labels(table, operation, "read").inc(read)
+        if write:
+            DYNAMODB_CONSUMED_CAPACITY.labels(table, operation, "write").inc(write)
+
+        if capacity is not None:
+            units = capacity.setdefault(table, [0.0, 0.0])
+            units[0] += read
+            units[1] += write
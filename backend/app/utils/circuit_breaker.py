@@ -0,0 +1,204 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+import structlog
+from botocore.exceptions import ClientError, ConnectionError as BotoConnectionError, HTTPClientError
+from fastapi import HTTPException, status
+
+from app.utils.metrics import CIRCUIT_BREAKER_REJECTIONS, CIRCUIT_BREAKER_STATE, STALE_RESPONSES
+
+
+logger = structlog.get_logger()
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+# AWS error codes that mean the dependency, not the request, is at fault
+DEPENDENCY_ERROR_CODES = {
+    'ProvisionedThroughputExceededException',
+    'ThrottlingException',
+    'RequestLimitExceeded',
+    'InternalServerError',
+    'ServiceUnavailable',
+    'ServiceUnavailableException',
+    'ModelNotReadyException',
+}
+
+
+def is_dependency_failure(error: BaseException) -> bool:
+    """Throttling, 5xx and connection errors count against the breaker; bad requests do not"""
+    if isinstance(error, ClientError):
+        code = error.response.get('Error', {}).get('Code', '')
+        status_code = error.response.get('ResponseMetadata', {}).get('HTTPStatusCode', 0)
+        return code in DEPENDENCY_ERROR_CODES or status_code >= 500
+    return isinstance(error, (BotoConnectionError, HTTPClientError, TimeoutError))
+
+
+class CircuitOpenError(HTTPException):
+    """Raised instead of calling a dependency whose circuit is open"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"{name} is temporarily unavailable",
+            headers={"Retry-After": str(max(int(retry_after + 0.999), 1))}
+        )
+        self.name = name
+
+
+class CircuitBreaker:
+    """Stop calling a failing dependency, then probe it before trusting it again.
+
+    After ``failure_threshold`` consecutive dependency failures the circuit
+    opens and calls fail fast with ``CircuitOpenError``. Once
+    ``recovery_timeout`` has passed, up to ``half_open_max_calls`` trial
+    calls are let through: a success closes the circuit, a failure opens it
+    again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30,
+        half_open_max_calls: int = 1,
+        is_failure: Callable[[BaseException], bool] = is_dependency_failure
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.is_failure = is_failure
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        CIRCUIT_BREAKER_STATE.labels(name).set(STATE_VALUES[CLOSED])
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._transition(HALF_OPEN)
+        return self._state
+
+    def _transition(self, state: str):
+        if state == self._state:
+            return
+        logger.warning("Circuit breaker state changed", dependency=self.name, state=state, previous=self._state)
+        self._state = state
+        self._half_open_calls = 0
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+        if state == CLOSED:
+            self._failures = 0
+        CIRCUIT_BREAKER_STATE.labels(self.name).set(STATE_VALUES[state])
+
+    def before_call(self):
+        """Reserve a call, or raise CircuitOpenError if the dependency should not be called"""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return
+            if state == HALF_OPEN and self._half_open_calls < self.half_open_max_calls:
+                self._half_open_calls += 1
+                return
+            retry_after = self.recovery_timeout - (time.monotonic() - self._opened_at)
+        CIRCUIT_BREAKER_REJECTIONS.labels(self.name).inc()
+        raise CircuitOpenError(self.name, retry_after)
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            if self._state != CLOSED:
+                self._transition(CLOSED)
+
+    def record_failure(self, error: Optional[BaseException] = None):
+        with self._lock:
+            if error is not None and not self.is_failure(error):
+                # The dependency answered; the request itself was bad
+                if self._state == HALF_OPEN:
+                    self._transition(CLOSED)
+                self._failures = 0
+                return
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._transition(OPEN)
+
+    def call(self, func: Callable, *args, **kwargs):
+        """Run ``func`` through the breaker"""
+        return self.call_once(CallOutcome(self), func, *args, **kwargs)
+
+    def call_once(self, outcome: "CallOutcome", func: Callable, *args, **kwargs):
+        """Run ``func`` through the breaker, recording its result through ``outcome``"""
+        self.before_call()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            outcome.failure(e)
+            raise
+        outcome.success()
+        return result
+
+
+class CallOutcome:
+    """Records a single call's result on a breaker at most once.
+
+    A caller that gives up waiting records the timeout itself; the worker
+    thread's late result is then dropped instead of being counted again.
+    """
+
+    def __init__(self, breaker: CircuitBreaker):
+        self.breaker = breaker
+        self._lock = threading.Lock()
+        self._recorded = False
+
+    def _claim(self) -> bool:
+        with self._lock:
+            if self._recorded:
+                return False
+            self._recorded = True
+            return True
+
+    def success(self):
+        if self._claim():
+            self.breaker.record_success()
+
+    def failure(self, error: Optional[BaseException] = None):
+        if self._claim():
+            self.breaker.record_failure(error)
+
+
+class StaleCache:
+    """Last known values to fall back on while a dependency's circuit is open"""
+
+    def __init__(self, dependency: str, max_entries: int = 1000, max_age: float = 300):
+        self.dependency = dependency
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def set(self, key: str, value: Any):
+        self._entries.pop(key, None)
+        self._entries[key] = (time.monotonic(), value)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[0] > self.max_age:
+            return None
+        STALE_RESPONSES.labels(self.dependency).inc()
+        return entry[1]
+
+    def invalidate(self, key: str):
+        self._entries.pop(key, None)
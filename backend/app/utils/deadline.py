@@ -0,0 +1,69 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Dict, Iterator, Optional
+
+from fastapi import HTTPException, status
+
+
+# Monotonic time by which the current request must be answered
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceeded(HTTPException):
+    """The request ran out of time, or a dependency call timed out"""
+
+    def __init__(self, detail: str = "Request deadline exceeded"):
+        super().__init__(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=detail)
+
+
+def start_deadline(timeout: float) -> Token:
+    """Give the current request ``timeout`` seconds; never extends an outer deadline"""
+    deadline = time.monotonic() + timeout
+    outer = _deadline.get()
+    if outer is not None:
+        deadline = min(deadline, outer)
+    return _deadline.set(deadline)
+
+
+def stop_deadline(token: Token):
+    _deadline.reset(token)
+
+
+@contextmanager
+def deadline_scope(timeout: float) -> Iterator[None]:
+    token = start_deadline(timeout)
+    try:
+        yield
+    finally:
+        stop_deadline(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current deadline, or None outside a deadline"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def call_timeout(default: float) -> float:
+    """Timeout for one dependency call: ``default``, capped by the time left.
+
+    Raises DeadlineExceeded when the deadline has already passed, so no new
+    work is started for a request nobody is waiting for any more.
+    """
+    left = remaining()
+    if left is None:
+        return default
+    if left <= 0:
+        raise DeadlineExceeded()
+    return min(default, left)
+
+
+def route_timeout(path: str, default: float, route_timeouts: Dict[str, float]) -> float:
+    """Timeout for a request path; the longest matching prefix in ``route_timeouts`` wins"""
+    matches = [prefix for prefix in route_timeouts if path.startswith(prefix)]
+    if not matches:
+        return default
+    return route_timeouts[max(matches, key=len)]
@@ -0,0 +1,94 @@
+import hashlib
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+from fastapi import Response
+
+
+def make_etag(*parts: Any) -> str:
+    """Build a strong ETag from the given version-identifying parts"""
+    digest = hashlib.blake2b("|".join(str(part) for part in parts).encode(), digest_size=16)
+    return f'"{digest.hexdigest()}"'
+
+
+def project_etag(project: Dict[str, Any]) -> str:
+    """ETag of a single project; updated_at changes on every write"""
+    return make_etag(project['project_id'], project.get('updated_at'))
+
+
+def list_etag(items: Iterable[Dict[str, Any]], *page_parts: Any) -> str:
+    """ETag of a page of projects, derived from its members and paging state"""
+    versions = [f"{item['project_id']}@{item.get('updated_at')}" for item in items]
+    return make_etag(*versions, *page_parts)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison, RFC 9110)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def etag_headers(etag: str) -> Dict[str, str]:
+    # Clients may keep the representation but must revalidate before reuse
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=etag_headers(etag))
+
+
+@dataclass
+class CachedVersion:
+    etag: str
+    user_id: str
+    team_members: List[str] = field(default_factory=list)
+    expires_at: float = 0.0
+
+
+class ETagCache:
+    """Recently served project versions, used to answer 304s without DynamoDB.
+
+    Entries are refreshed on reads and writes through this process; the TTL
+    bounds how long a write made by another process can go unnoticed.
+    """
+
+    def __init__(self, ttl: float = 10, max_entries: int = 10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[str, CachedVersion] = {}
+
+    def get(self, project_id: str) -> Optional[CachedVersion]:
+        entry = self._entries.get(project_id)
+        if entry is None:
+            return None
+        if entry.expires_at < time.monotonic():
+            self._entries.pop(project_id, None)
+            return None
+        return entry
+
+    def set(self, project: Dict[str, Any]):
+        if self.ttl <= 0:
+            return
+        if len(self._entries) >= self.max_entries:
+            # Drop the oldest insertion; dicts preserve insertion order
+            self._entries.pop(next(iter(self._entries)), None)
+
+        project_id = project['project_id']
+        self._entries.pop(project_id, None)
+        self._entries[project_id] = CachedVersion(
+            etag=project_etag(project),
+            user_id=project.get('user_id', ''),
+            team_members=list(project.get('team_members') or []),
+            expires_at=time.monotonic() + self.ttl
+        )
+
+    def invalidate(self, project_id: str):
+        self._entries.pop(project_id, None)
+
+    def clear(self):
+        self._entries.clear()
@@ -0,0 +1,67 @@
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+
+# Crockford base32: sorts the same as the numbers it encodes
+_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_DECODE = {char: index for index, char in enumerate(_ALPHABET)}
+_RANDOM_BITS = 80
+_RANDOM_MAX = (1 << _RANDOM_BITS) - 1
+
+_lock = threading.Lock()
+_last_ms = -1
+_last_random = 0
+
+
+def _encode(value: int, length: int) -> str:
+    chars = []
+    for _ in range(length):
+        value, index = divmod(value, 32)
+        chars.append(_ALPHABET[index])
+    return "".join(reversed(chars))
+
+
+def new_ulid(timestamp_ms: Optional[int] = None) -> str:
+    """26-character ULID: 48-bit millisecond timestamp then 80 random bits.
+
+    IDs sort lexicographically by creation time. Within one millisecond the
+    random part is incremented, so IDs from this process stay strictly
+    increasing.
+    """
+    global _last_ms, _last_random
+
+    with _lock:
+        if timestamp_ms is None:
+            # Never step backwards when the wall clock does
+            now_ms = max(int(time.time() * 1000), _last_ms)
+        else:
+            now_ms = timestamp_ms
+        if now_ms == _last_ms and _last_random < _RANDOM_MAX:
+            now_ms = _last_ms
+            _last_random += 1
+        else:
+            _last_random = int.from_bytes(os.urandom(10), "big")
+        _last_ms = now_ms
+        value = (now_ms << _RANDOM_BITS) | _last_random
+
+    return _encode(value, 26)
+
+
+def ulid_timestamp(ulid: str) -> datetime:
+    """Creation time encoded in a ULID"""
+    value = 0
+    for char in ulid[:10].upper():
+        value = value * 32 + _DECODE[char]
+    return datetime.fromtimestamp(value / 1000, tz=timezone.utc)
+
+
+def ulid_at(when: datetime) -> str:
+    """Smallest ULID for a (timezone-aware) time; IDs created at or after it sort after it"""
+    return _encode(int(when.timestamp() * 1000) << _RANDOM_BITS, 26)
+
+
+def new_message_id() -> str:
+    return f"msg_{new_ulid()}"
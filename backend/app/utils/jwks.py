@@ -0,0 +1,125 @@
+import threading
+import time
+from typing import Dict, Optional
+
+import httpx
+import structlog
+from jose import jwk
+from jose.backends.base import Key
+from jose.exceptions import JWKError
+
+from app.config import settings
+
+
+logger = structlog.get_logger()
+
+
+class JWKSCache:
+    """In-memory Cognito signing keys, refreshed by a background thread.
+
+    Keys are only ever fetched by the refresher thread: request handlers read
+    the current key map and, on an unknown ``kid``, merely signal the thread to
+    refresh early. Early refreshes are throttled so forged ``kid`` values cannot
+    be used to hammer the JWKS endpoint.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        refresh_interval: float = 3600,
+        min_refresh_interval: float = 30,
+        timeout: float = 5.0
+    ):
+        self.url = url
+        self.refresh_interval = refresh_interval
+        self.min_refresh_interval = min_refresh_interval
+        self.timeout = timeout
+
+        self._keys: Dict[str, Key] = {}
+        self._last_attempt = 0.0
+        self._refresh_requested = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def key_ids(self) -> list[str]:
+        return list(self._keys)
+
+    def get_key(self, kid: Optional[str]) -> Optional[Key]:
+        """Return the key for ``kid`` or schedule a refresh if it is unknown"""
+        key = self._keys.get(kid) if kid else None
+        if key is None:
+            self._refresh_requested.set()
+        return key
+
+    def refresh(self) -> bool:
+        """Fetch the key set and swap it in atomically"""
+        self._last_attempt = time.monotonic()
+        try:
+            response = httpx.get(self.url, timeout=self.timeout)
+            response.raise_for_status()
+
+            keys = {}
+            for key_data in response.json().get("keys", []):
+                if key_data.get("kty") != "RSA" or "kid" not in key_data:
+                    continue
+                keys[key_data["kid"]] = jwk.construct(key_data, key_data.get("alg", "RS256"))
+        except (httpx.HTTPError, ValueError, JWKError) as e:
+            logger.error("JWKS refresh failed", url=self.url, error=str(e))
+            return False
+
+        # Keep the previous keys if the endpoint returned an empty set
+        if keys:
+            self._keys = keys
+        logger.info("JWKS refreshed", key_count=len(keys))
+        return True
+
+    def start(self):
+        """Start the background refresher thread"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="jwks-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background refresher thread"""
+        self._stopped.set()
+        self._refresh_requested.set()
+        if self._thread:
+            self._thread.join(timeout=self.timeout + 1)
+            self._thread = None
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._refresh_requested.wait(timeout=self.refresh_interval)
+            if self._stopped.is_set():
+                break
+            self._refresh_requested.clear()
+
+            wait = self.min_refresh_interval - (time.monotonic() - self._last_attempt)
+            if wait > 0 and self._stopped.wait(wait):
+                break
+
+            self.refresh()
+
+
+_jwks_cache: Optional[JWKSCache] = None
+
+
+def get_jwks_cache() -> Optional[JWKSCache]:
+    """Get the shared JWKS cache, or None when Cognito is not configured"""
+    global _jwks_cache
+
+    if not settings.user_pool_id:
+        return None
+
+    if _jwks_cache is None:
+        _jwks_cache = JWKSCache(
+            url=settings.get_jwks_url(),
+            refresh_interval=settings.jwks_refresh_interval_seconds,
+            min_refresh_interval=settings.jwks_min_refresh_interval_seconds,
+            timeout=settings.jwks_fetch_timeout_seconds
+        )
+    return _jwks_cache
@@ -1,35 +1,152 @@
-import structlog
+import atexit
 import logging
+import os
+import queue
+import random
 import sys
-from typing import Any
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Optional, TextIO
+
+import orjson
+import structlog
+
 from app.config import settings
 
 
-def configure_logging():
-    """Configure structured logging with structlog"""
-    
+_listener: Optional[QueueListener] = None
+_handler: Optional["NonBlockingQueueHandler"] = None
+_stream: Optional[TextIO] = None
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Hand records to the writer thread without formatting them.
+
+    The stdlib QueueHandler formats records on the calling thread; here the
+    structlog event dict travels through the queue as-is and is rendered by
+    the listener. When the queue is full the record is dropped rather than
+    blocking the event loop.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _render_json(obj: Any, **kwargs) -> str:
+    return orjson.dumps(obj, default=str).decode()
+
+
+def sample_events(logger: Any, method_name: str, event_dict: dict) -> dict:
+    """Drop a share of routine events per settings.log_sample_rates.
+
+    Warnings, errors and request logs with a 4xx/5xx status are always kept.
+    """
+    rate = settings.log_sample_rates.get(event_dict.get("event"))
+    if rate is None or rate >= 1:
+        return event_dict
+    if method_name in ("warning", "error", "critical", "exception"):
+        return event_dict
+    if event_dict.get("status_code", 0) >= 400:
+        return event_dict
+
+    if random.random() >= rate:
+        raise structlog.DropEvent
+    event_dict["sample_rate"] = rate
+    return event_dict
+
+
+def configure_logging(stream: Optional[TextIO] = None):
+    """Configure structured logging with structlog
+
+    Events are filtered, sampled and timestamped on the calling thread;
+    JSON rendering and the write to stdout happen on a background thread.
+    """
+    global _listener, _handler, _stream
+
+    shutdown_logging()
+    _stream = stream
+
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.log_queue_size)
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(structlog.stdlib.ProcessorFormatter(
+        processors=[
+            structlog.stdlib.ProcessorFormatter.remove_processors_meta,
+            structlog.processors.UnicodeDecoder(),
+            structlog.processors.JSONRenderer(serializer=_render_json),
+        ],
+        # Records from non-structlog loggers (uvicorn, botocore, ...)
+        foreign_pre_chain=[
+            structlog.stdlib.add_logger_name,
+            structlog.stdlib.add_log_level,
+            structlog.processors.TimeStamper(fmt="iso"),
+        ],
+    ))
+
     # Configure standard library logging
-    logging.basicConfig(
-        level=getattr(logging, settings.log_level),
-        stream=sys.stdout,
-        format="%(message)s"
-    )
-    
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    _handler = NonBlockingQueueHandler(log_queue)
+    root.addHandler(_handler)
+    root.setLevel(getattr(logging, settings.log_level))
+
+    _listener = QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+
     # Configure structlog
     structlog.configure(
         processors=[
             structlog.stdlib.filter_by_level,
+            sample_events,
             structlog.stdlib.add_logger_name,
             structlog.stdlib.add_log_level,
             structlog.stdlib.PositionalArgumentsFormatter(),
             structlog.processors.TimeStamper(fmt="iso"),
+            # Tracebacks must be captured on the thread that raised
             structlog.processors.StackInfoRenderer(),
             structlog.processors.format_exc_info,
-            structlog.processors.UnicodeDecoder(),
-            structlog.processors.JSONRenderer()
+            structlog.stdlib.ProcessorFormatter.wrap_for_formatter,
         ],
         context_class=dict,
         logger_factory=structlog.stdlib.LoggerFactory(),
         wrapper_class=structlog.stdlib.BoundLogger,
         cache_logger_on_first_use=True,
-    )
\ No newline at end of file
+    )
+
+
+def dropped_log_records() -> int:
+    """Number of records dropped because the log queue was full"""
+    return _handler.dropped if _handler is not None else 0
+
+
+def shutdown_logging():
+    """Flush queued log records and stop the writer thread"""
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _restart_after_fork():
+    """Give a forked worker (e.g. gunicorn with preload_app) its own writer thread"""
+    global _listener
+
+    if _listener is None:
+        return
+    # The parent's listener thread does not exist in the child; start over without stopping it
+    _listener = None
+    configure_logging(_stream)
+
+
+atexit.register(shutdown_logging)
+os.register_at_fork(after_in_child=_restart_after_fork)
@@ -0,0 +1,100 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+
+import structlog
+
+from app.config import settings
+from app.utils.metrics import EVENT_LOOP_BLOCKED, EVENT_LOOP_LAG
+
+
+logger = structlog.get_logger()
+
+
+class LoopMonitor:
+    """Measure event loop lag and, optionally, report what blocks the loop.
+
+    A task sleeps for ``interval`` seconds at a time and records how late it
+    wakes up. With ``watchdog`` enabled, a separate thread notices when that
+    task has not run for longer than ``block_threshold`` and logs the loop
+    thread's current stack - the code that is holding the loop.
+    """
+
+    def __init__(self, interval: float = 0.1, block_threshold: float = 0.1, watchdog: bool = False):
+        self.interval = interval
+        self.block_threshold = block_threshold
+        self.watchdog = watchdog
+        self.last_beat = time.monotonic()
+        self._task: Optional[asyncio.Task] = None
+        self._loop_thread_id: Optional[int] = None
+        self._stop = threading.Event()
+        self._watchdog_thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start monitoring the running event loop"""
+        self._loop_thread_id = threading.get_ident()
+        self.last_beat = time.monotonic()
+        self._task = asyncio.get_running_loop().create_task(self._measure())
+
+        if self.watchdog:
+            self._stop.clear()
+            self._watchdog_thread = threading.Thread(
+                target=self._watch, name="loop-watchdog", daemon=True
+            )
+            self._watchdog_thread.start()
+
+    async def stop(self):
+        self._stop.set()
+        if self._watchdog_thread is not None:
+            self._watchdog_thread.join()
+            self._watchdog_thread = None
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _measure(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            scheduled = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(loop.time() - scheduled - self.interval, 0.0)
+            EVENT_LOOP_LAG.observe(lag)
+            if lag >= self.block_threshold and not self.watchdog:
+                EVENT_LOOP_BLOCKED.inc()
+            self.last_beat = time.monotonic()
+
+    def _watch(self):
+        reported_beat = None
+        while not self._stop.wait(self.block_threshold / 2):
+            beat = self.last_beat
+            stalled = time.monotonic() - beat - self.interval
+            # Report each stall once, while it is still happening
+            if stalled < self.block_threshold or beat == reported_beat:
+                continue
+            reported_beat = beat
+
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            EVENT_LOOP_BLOCKED.inc()
+            logger.warning(
+                "Event loop blocked",
+                blocked_ms=round(stalled * 1000, 1),
+                stack="".join(traceback.format_stack(frame))
+            )
+
+
+def create_loop_monitor() -> LoopMonitor:
+    """Build the loop monitor from settings; the watchdog only runs in debug mode"""
+    return LoopMonitor(
+        interval=settings.loop_monitor_interval_ms / 1000,
+        block_threshold=settings.loop_block_threshold_ms / 1000,
+        watchdog=settings.debug
+    )
@@ -0,0 +1,151 @@
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+
+class _Ring:
+    __slots__ = ("ids", "messages", "complete", "loaded_at")
+
+    def __init__(self, messages: List[Dict[str, Any]], complete: bool):
+        self.messages = messages
+        self.ids = [message['message_id'] for message in messages]
+        # True when the ring holds every message the channel has
+        self.complete = complete
+        self.loaded_at = time.monotonic()
+
+
+class MessageCache:
+    """The newest messages of recently active channels, oldest first.
+
+    A channel's ring is loaded from its newest page on the first read and
+    kept current as messages are written here or arrive from other nodes,
+    so opening a channel or catching up after a reconnect is answered
+    without a query. Rings are reloaded after ``ttl`` seconds, which bounds
+    how long a node that missed an event can serve it without that message.
+    Queries reaching past a ring's oldest message return None.
+
+    Messages added between ``begin_load`` and ``load`` are held back and
+    merged into the loaded ring, so a message written while the channel's
+    page was being queried is not lost for the whole TTL.
+    """
+
+    def __init__(self, size: int = 100, max_channels: int = 1000, ttl: float = 300):
+        self.size = size
+        self.max_channels = max_channels
+        self.ttl = ttl
+        self._rings: "OrderedDict[str, _Ring]" = OrderedDict()
+        # channel_id -> [loads in progress, messages added meanwhile]
+        self._loading: Dict[str, List[Any]] = {}
+
+    def begin_load(self, channel_id: str):
+        """Start holding back new messages of a channel whose ring is about to be queried"""
+        self._loading.setdefault(channel_id, [0, []])[0] += 1
+
+    def abort_load(self, channel_id: str):
+        """Give up a load started with ``begin_load`` (the query failed)"""
+        self._end_load(channel_id)
+
+    def _end_load(self, channel_id: str) -> List[Dict[str, Any]]:
+        loading = self._loading.get(channel_id)
+        if loading is None:
+            return []
+        loading[0] -= 1
+        if loading[0] <= 0:
+            del self._loading[channel_id]
+        return loading[1]
+
+    def load(self, channel_id: str, messages: List[Dict[str, Any]], complete: bool):
+        """Replace a channel's ring with its newest messages (oldest first)"""
+        if len(messages) > self.size:
+            messages, complete = messages[-self.size:], False
+        ring = _Ring(list(messages), complete)
+        for message in self._end_load(channel_id):
+            self._insert(ring, message)
+        self._rings[channel_id] = ring
+        self._rings.move_to_end(channel_id)
+        if len(self._rings) > self.max_channels:
+            self._rings.popitem(last=False)
+
+    def add(self, channel_id: str, message: Dict[str, Any]) -> bool:
+        """Record a new message in a loaded channel; False for duplicates and unloaded channels"""
+        loading = self._loading.get(channel_id)
+        if loading is not None:
+            loading[1].append(message)
+        ring = self._rings.get(channel_id)
+        if ring is None:
+            return False
+        return self._insert(ring, message)
+
+    def _insert(self, ring: _Ring, message: Dict[str, Any]) -> bool:
+        message_id = message['message_id']
+        index = bisect_left(ring.ids, message_id)
+        if index < len(ring.ids) and ring.ids[index] == message_id:
+            return False
+        ring.ids.insert(index, message_id)
+        ring.messages.insert(index, message)
+        if len(ring.ids) > self.size:
+            del ring.ids[0]
+            del ring.messages[0]
+            ring.complete = False
+        return True
+
+    def count_reply(self, channel_id: str, parent_id: str, replied_at: Any):
+        """Mirror a new reply on its cached parent, as the write did in the table"""
+        ring = self._rings.get(channel_id)
+        if ring is None:
+            return
+        index = bisect_left(ring.ids, parent_id)
+        if index < len(ring.ids) and ring.ids[index] == parent_id:
+            parent = ring.messages[index]
+            # Replace rather than mutate: the old dict may already be in a response
+            ring.messages[index] = {
+                **parent,
+                'thread_id': parent_id,
+                'reply_count': parent.get('reply_count', 0) + 1,
+                'last_reply_at': replied_at
+            }
+
+    def invalidate(self, channel_id: str):
+        self._rings.pop(channel_id, None)
+
+    def latest(self, channel_id: str, limit: int, before: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """The newest ``limit`` messages older than ``before``, if the ring can tell"""
+        ring = self._ring(channel_id)
+        if ring is None:
+            return None
+        end = bisect_left(ring.ids, before) if before else len(ring.ids)
+        start = max(end - limit, 0)
+        if start == 0 and end - start < limit and not ring.complete:
+            # Older messages may exist beyond the ring
+            return None
+        return {
+            'items': ring.messages[start:end],
+            'has_more': start > 0 or not ring.complete
+        }
+
+    def since(self, channel_id: str, after: str, limit: int) -> Optional[Dict[str, Any]]:
+        """The oldest ``limit`` messages newer than ``after``, if the ring can tell"""
+        ring = self._ring(channel_id)
+        if ring is None or not ring.ids:
+            return None
+        if after < ring.ids[0] and not ring.complete:
+            # Messages between ``after`` and the ring may be missing
+            return None
+        start = bisect_left(ring.ids, after)
+        if start < len(ring.ids) and ring.ids[start] == after:
+            start += 1
+        return {
+            'items': ring.messages[start:start + limit],
+            'has_more': start + limit < len(ring.ids)
+        }
+
+    def _ring(self, channel_id: str) -> Optional[_Ring]:
+        ring = self._rings.get(channel_id)
+        if ring is None:
+            return None
+        if time.monotonic() - ring.loaded_at > self.ttl:
+            del self._rings[channel_id]
+            return None
+        self._rings.move_to_end(channel_id)
+        return ring
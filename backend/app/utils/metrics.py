@@ -0,0 +1,96 @@
+import os
+
+from fastapi import Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+)
+
+
+# Event loop health (see app.utils.loop_monitor)
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "Delay between when a loop callback was due and when it ran",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+)
+EVENT_LOOP_BLOCKED = Counter(
+    "event_loop_blocked_total",
+    "Times the event loop was blocked longer than the configured threshold"
+)
+
+# DynamoDB cost (see app.utils.capacity)
+DYNAMODB_CONSUMED_CAPACITY = Counter(
+    "dynamodb_consumed_capacity_units_total",
+    "DynamoDB capacity units consumed, by table and operation",
+    ["table", "operation", "capacity_type"]
+)
+ROUTE_CONSUMED_CAPACITY = Counter(
+    "http_route_consumed_capacity_units_total",
+    "DynamoDB capacity units consumed while serving each route",
+    ["method", "route", "capacity_type"]
+)
+
+# Write-behind batching (see app.services.batch_writer)
+BATCH_WRITE_SIZE = Histogram(
+    "dynamodb_batch_write_items",
+    "Items per coalesced BatchWriteItem call",
+    ["writer"],
+    buckets=(1, 2, 5, 10, 15, 20, 25)
+)
+BATCH_WRITE_RETRIES = Counter(
+    "dynamodb_batch_write_retries_total",
+    "BatchWriteItem calls repeated for unprocessed items",
+    ["writer"]
+)
+
+# Dependency circuit breakers (see app.utils.circuit_breaker)
+CIRCUIT_BREAKER_STATE = Gauge(
+    "circuit_breaker_state",
+    "Circuit state per dependency: 0 closed, 1 half-open, 2 open",
+    ["dependency"],
+    multiprocess_mode="livemax"
+)
+CIRCUIT_BREAKER_REJECTIONS = Counter(
+    "circuit_breaker_rejections_total",
+    "Calls failed fast because the dependency's circuit was open",
+    ["dependency"]
+)
+STALE_RESPONSES = Counter(
+    "stale_responses_total",
+    "Responses served from stale cache while a dependency was unavailable",
+    ["dependency"]
+)
+
+# WebSocket push (see app.services.connections)
+WEBSOCKET_CONNECTIONS = Gauge(
+    "websocket_connections",
+    "Open WebSocket connections",
+    multiprocess_mode="livesum"
+)
+WEBSOCKET_MESSAGES_SENT = Counter(
+    "websocket_messages_sent_total",
+    "Events pushed to WebSocket clients, counting each event of a batch"
+)
+WEBSOCKET_SLOW_DISCONNECTS = Counter(
+    "websocket_slow_disconnects_total",
+    "WebSocket connections closed because they could not keep up with pushed messages"
+)
+
+# Agent streaming (see app.services.bedrock)
+BEDROCK_TIME_TO_FIRST_CHUNK = Histogram(
+    "bedrock_time_to_first_chunk_seconds",
+    "Time from invoking a Bedrock agent to its first streamed chunk",
+    buckets=(0.1, 0.25, 0.5, 1, 2, 3, 5, 10, 20, 30)
+)
+
+
+def metrics_response() -> Response:
+    """Render all registered metrics in the Prometheus text format.
+
+    Under gunicorn (PROMETHEUS_MULTIPROC_DIR set) the values of all workers
+    are aggregated, whichever worker serves the scrape.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
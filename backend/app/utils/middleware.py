@@ -1,12 +1,31 @@
 from fastapi import Request, Response, HTTPException
+from starlette.datastructures import Headers, MutableHeaders
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import asyncio
+import hmac
+import random
 import time
+import zlib
 import structlog
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from collections import defaultdict
 from datetime import datetime, timedelta
 
+from app.utils.capacity import get_request_capacity, start_request_capacity, stop_request_capacity
+from app.utils.deadline import route_timeout, start_deadline, stop_deadline
+from app.utils.metrics import ROUTE_CONSUMED_CAPACITY
+from app.utils.profiling import RequestProfiler, new_profile_id
+from app.utils.timing import (
+    get_request_timings, server_timing_header, start_request_timings, stop_request_timings
+)
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
 
 logger = structlog.get_logger()
 
@@ -21,9 +40,14 @@ class PrometheusMiddleware(BaseHTTPMiddleware):
         
     async def dispatch(self, request: Request, call_next):
         start_time = time.time()
+        capacity_token = start_request_capacity()
         
         # Process request
-        response = await call_next(request)
+        try:
+            response = await call_next(request)
+            capacity = get_request_capacity()
+        finally:
+            stop_request_capacity(capacity_token)
         
         # Calculate duration
         duration = time.time() - start_time
@@ -37,6 +61,16 @@ class PrometheusMiddleware(BaseHTTPMiddleware):
         self.request_count[metric_key] += 1
         self.request_duration[metric_key].append(duration)
         
+        # Attribute DynamoDB cost to the route template, not the raw path
+        route = request.scope.get("route")
+        route_path = getattr(route, "path", "unmatched")
+        read_units = sum(units["rcu"] for units in capacity.values())
+        write_units = sum(units["wcu"] for units in capacity.values())
+        if read_units:
+            ROUTE_CONSUMED_CAPACITY.labels(method, route_path, "read").inc(read_units)
+        if write_units:
+            ROUTE_CONSUMED_CAPACITY.labels(method, route_path, "write").inc(write_units)
+        
         # Log request
         logger.info(
             "HTTP request",
@@ -44,12 +78,160 @@ class PrometheusMiddleware(BaseHTTPMiddleware):
             path=path,
             status_code=status_code,
             duration=duration,
+            timings=get_request_timings(),
+            consumed_capacity=capacity,
             user_agent=request.headers.get("user-agent", "")
         )
         
         return response
 
 
+class ServerTimingMiddleware:
+    """Collect per-phase request timings and report them in a Server-Timing header.
+
+    Must wrap PrometheusMiddleware so the request log can include the same
+    breakdown. Phases are recorded with ``app.utils.timing.timed``.
+    """
+
+    def __init__(self, app: ASGIApp, expose_header: bool = True):
+        self.app = app
+        self.expose_header = expose_header
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = start_request_timings()
+        start_time = time.perf_counter()
+
+        async def send_with_timings(message: Message):
+            if message["type"] == "http.response.start" and self.expose_header:
+                elapsed = (time.perf_counter() - start_time) * 1000
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", server_timing_header({"app": elapsed}))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timings)
+        finally:
+            stop_request_timings(token)
+
+
+class ProfilingMiddleware:
+    """Capture a sampled call-stack profile of selected requests.
+
+    A request is profiled when it carries ``X-Profile-Token`` matching the
+    configured token, or by random sampling at ``sample_rate``. Only one
+    profile runs at a time; the profile id is returned in ``X-Profile-Id``.
+    The sampler sees the whole event loop thread, so concurrent requests
+    show up in the profile too.
+    """
+
+    def __init__(self, app: ASGIApp, profiler: RequestProfiler):
+        self.app = app
+        self.profiler = profiler
+
+    def should_profile(self, scope: Scope) -> bool:
+        token = self.profiler.token
+        if token:
+            supplied = Headers(scope=scope).get("x-profile-token")
+            if supplied and hmac.compare_digest(supplied.encode(), token.encode()):
+                return True
+        return self.profiler.sample_rate > 0 and random.random() < self.profiler.sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self.should_profile(scope) or not self.profiler.acquire():
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = new_profile_id()
+        sampler = self.profiler.new_sampler()
+        status_code = 500
+
+        async def send_with_profile_id(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append("X-Profile-Id", profile_id)
+            await send(message)
+
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            sampler.stop()
+            self.profiler.release()
+            metadata = {
+                "method": scope["method"],
+                "path": scope["path"],
+                "status_code": str(status_code),
+            }
+            # Writing the profile may hit S3; keep it off the event loop and off the response
+            asyncio.get_running_loop().run_in_executor(
+                None, self.profiler.save, profile_id, sampler, metadata
+            )
+
+
+class DeadlineMiddleware:
+    """Give every request a deadline and answer 504 if it passes first.
+
+    The deadline (``default_timeout``, or the longest matching prefix in
+    ``route_timeouts``) is visible to dependency calls through
+    ``app.utils.deadline``, which shorten their own timeouts and retries to
+    fit. A response that has already started (e.g. a stream) is left to
+    finish. A timeout of 0 disables the deadline for that route.
+    """
+
+    def __init__(self, app: ASGIApp, default_timeout: float = 15, route_timeouts: Optional[Dict[str, float]] = None):
+        self.app = app
+        self.default_timeout = default_timeout
+        self.route_timeouts = route_timeouts or {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timeout = route_timeout(scope["path"], self.default_timeout, self.route_timeouts)
+        if timeout <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_tracking_start(message: Message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        token = start_deadline(timeout)
+        # The task copies the current context, deadline included
+        task = asyncio.ensure_future(self.app(scope, receive, send_tracking_start))
+        try:
+            done, _ = await asyncio.wait({task}, timeout=timeout)
+            if done or response_started:
+                await task
+                return
+
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            if response_started:
+                return
+            logger.warning("Request deadline exceeded", path=scope["path"], timeout=timeout)
+            response = JSONResponse({"detail": "Request deadline exceeded"}, status_code=504)
+            await response(scope, receive, send)
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+        finally:
+            stop_deadline(token)
+
+
 class RateLimitMiddleware(BaseHTTPMiddleware):
     """Simple rate limiting middleware"""
     
@@ -86,4 +268,175 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         # Record this request
         self.clients[client_ip].append(now)
         
-        return await call_next(request)
\ No newline at end of file
+        return await call_next(request)
+
+
+class _GzipEncoder:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _BrotliEncoder:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class CompressionMiddleware:
+    """Brotli/gzip response compression negotiated from Accept-Encoding.
+
+    Bodies below ``minimum_size`` are sent as-is. Streamed responses are
+    compressed chunk by chunk and flushed after every chunk, so clients keep
+    receiving data progressively. Event streams and already-encoded or binary
+    content types are never compressed.
+    """
+
+    SKIPPED_CONTENT_TYPES = ("text/event-stream", "image/", "video/", "audio/", "application/zip", "application/gzip")
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self.select_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+    def select_encoding(self, accept_encoding: str) -> Optional[str]:
+        """Pick the preferred supported encoding, honoring q-values"""
+        weights = {}
+        for part in accept_encoding.lower().split(","):
+            coding, _, params = part.strip().partition(";")
+            quality = 1.0
+            params = params.strip()
+            if params.startswith("q="):
+                try:
+                    quality = float(params[2:])
+                except ValueError:
+                    quality = 0.0
+            if coding:
+                weights[coding.strip()] = quality
+
+        candidates = ["br", "gzip"] if brotli is not None else ["gzip"]
+        best = None
+        for coding in candidates:
+            quality = weights.get(coding, weights.get("*", 0.0))
+            if quality > 0 and (best is None or quality > best[1]):
+                best = (coding, quality)
+        return best[0] if best else None
+
+    def create_encoder(self, encoding: str):
+        if encoding == "br":
+            return _BrotliEncoder(self.brotli_quality)
+        return _GzipEncoder(self.gzip_level)
+
+
+def _weaken_etag(headers: MutableHeaders):
+    # Each encoding is a different byte sequence; only a weak validator may be shared
+    etag = headers.get("etag")
+    if etag and not etag.startswith("W/"):
+        headers["ETag"] = "W/" + etag
+
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.downstream = send
+        self.start_message: Optional[Message] = None
+        self.encoder = None
+        self.passthrough = False
+
+    async def send(self, message: Message):
+        if message["type"] == "http.response.start":
+            # Hold the headers until the first body chunk tells us the size
+            self.start_message = message
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            self.passthrough = (
+                "content-encoding" in headers
+                or message["status"] < 200
+                or message["status"] in (204, 304)
+                or content_type.startswith(self.middleware.SKIPPED_CONTENT_TYPES)
+            )
+            if self.passthrough:
+                if message["status"] == 304:
+                    # The full response this revalidates would have been compressed,
+                    # so it gets the same Vary and weak validator as that response
+                    headers = MutableHeaders(raw=message["headers"])
+                    headers.add_vary_header("Accept-Encoding")
+                    _weaken_etag(headers)
+                await self.downstream(message)
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.downstream(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start_message is not None:
+            start_message, self.start_message = self.start_message, None
+
+            if not more_body and len(body) < self.middleware.minimum_size:
+                self.passthrough = True
+                MutableHeaders(raw=start_message["headers"]).add_vary_header("Accept-Encoding")
+                await self.downstream(start_message)
+                await self.downstream(message)
+                return
+
+            self.encoder = self.middleware.create_encoder(self.encoding)
+            headers = MutableHeaders(raw=start_message["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            _weaken_etag(headers)
+
+            if not more_body:
+                compressed = self.encoder.compress(body) + self.encoder.finish()
+                headers["Content-Length"] = str(len(compressed))
+                await self.downstream(start_message)
+                await self.downstream({"type": "http.response.body", "body": compressed})
+                return
+
+            del headers["Content-Length"]
+            await self.downstream(start_message)
+
+        if more_body:
+            chunk = self.encoder.compress(body) + self.encoder.flush()
+        else:
+            chunk = self.encoder.compress(body) + self.encoder.finish()
+        await self.downstream({"type": "http.response.body", "body": chunk, "more_body": more_body})
@@ -0,0 +1,159 @@
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Optional
+
+import structlog
+
+from app.config import settings
+
+
+logger = structlog.get_logger()
+
+
+def _folded_stack(frame) -> str:
+    """Render a frame chain root-first in the folded format used by flame graph tools"""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class StackSampler:
+    """Sample the call stack of one thread from a background thread.
+
+    Sampling reads ``sys._current_frames()`` and never touches the target
+    thread, so the profiled code runs unmodified. Stops by itself after
+    ``max_duration`` seconds.
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.005, max_duration: float = 30):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.max_duration = max_duration
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        deadline = time.monotonic() + self.max_duration
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                break
+            self.stacks[_folded_stack(frame)] += 1
+            self.samples += 1
+            if time.monotonic() >= deadline:
+                break
+
+    def folded(self) -> str:
+        """Collected stacks as ``frame;frame;frame count`` lines"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class ProfileStore:
+    """Write folded profiles to a local directory or to the logs bucket"""
+
+    def __init__(self, storage: str = "local", output_dir: str = "/tmp/profiles", bucket: Optional[str] = None):
+        self.storage = storage
+        self.output_dir = output_dir
+        self.bucket = bucket
+
+    def save(self, profile_id: str, content: str, metadata: Dict[str, str]) -> str:
+        """Store a profile and return where it was written"""
+        name = f"{datetime.utcnow():%Y/%m/%d}/{profile_id}.folded"
+
+        if self.storage == "s3":
+            import boto3
+
+            key = f"profiles/{name}"
+            boto3.client("s3", region_name=settings.aws_region).put_object(
+                Bucket=self.bucket,
+                Key=key,
+                Body=content.encode(),
+                ContentType="text/plain",
+                Metadata=metadata
+            )
+            return f"s3://{self.bucket}/{key}"
+
+        path = os.path.join(self.output_dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+
+class RequestProfiler:
+    """Decide which requests to profile and run at most one profile at a time"""
+
+    def __init__(
+        self,
+        store: ProfileStore,
+        token: Optional[str] = None,
+        sample_rate: float = 0.0,
+        interval: float = 0.005,
+        max_duration: float = 30
+    ):
+        self.store = store
+        self.token = token
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.max_duration = max_duration
+        self._active = threading.Lock()
+
+    def acquire(self) -> bool:
+        # Non-blocking: a request that cannot profile right away just runs normally
+        return self._active.acquire(blocking=False)
+
+    def release(self):
+        self._active.release()
+
+    def new_sampler(self) -> StackSampler:
+        return StackSampler(threading.get_ident(), self.interval, self.max_duration)
+
+    def save(self, profile_id: str, sampler: StackSampler, metadata: Dict[str, str]):
+        """Store a finished profile; runs off the event loop"""
+        try:
+            location = self.store.save(profile_id, sampler.folded(), metadata)
+            logger.info(
+                "Request profile stored",
+                profile_id=profile_id,
+                location=location,
+                samples=sampler.samples,
+                **metadata
+            )
+        except Exception as e:
+            logger.error("Failed to store request profile", profile_id=profile_id, error=str(e))
+
+
+def new_profile_id() -> str:
+    return uuid.uuid4().hex
+
+
+def create_request_profiler() -> RequestProfiler:
+    """Build the request profiler from settings"""
+    return RequestProfiler(
+        store=ProfileStore(
+            storage=settings.profile_storage,
+            output_dir=settings.profile_output_dir,
+            bucket=settings.get_bucket_name('logs')
+        ),
+        token=settings.profile_token,
+        sample_rate=settings.profile_sample_rate,
+        interval=settings.profile_interval_ms / 1000,
+        max_duration=settings.profile_max_seconds
+    )
@@ -0,0 +1,44 @@
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.utils.timing import timed
+
+
+def _default(obj: Any) -> Any:
+    """Encode types orjson does not handle natively"""
+    if isinstance(obj, BaseModel):
+        # Works for validated models and for model_construct() results alike
+        return obj.__dict__
+    if isinstance(obj, Decimal):
+        # DynamoDB returns every number as Decimal
+        return int(obj) if obj == obj.to_integral_value() else float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize to JSON with orjson, as FastJSONResponse does"""
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def sse_event(event: str, data: Any) -> bytes:
+    """One Server-Sent Events message; orjson output never contains a newline"""
+    return b"event: " + event.encode() + b"\ndata: " + dumps(data) + b"\n\n"
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson.
+
+    Returning this from a route bypasses FastAPI's ``response_model``
+    validation and ``jsonable_encoder`` pass, so only use it for content we
+    already trust (e.g. items we wrote to DynamoDB ourselves).
+    """
+
+    def render(self, content: Any) -> bytes:
+        with timed("serialize"):
+            return dumps(content)
@@ -0,0 +1,262 @@
+import asyncio
+import heapq
+import math
+import re
+import unicodedata
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+# Scripts written without spaces between words are indexed as overlapping character bigrams
+_CJK = '\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af'  # Kana, CJK ideographs, Hangul
+_TOKEN = re.compile(f'([{_CJK}]+)|([^\\W{_CJK}]+)')
+MAX_TERM_LENGTH = 40
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into index terms: lowercased words, and bigrams of CJK runs"""
+    terms = []
+    for cjk, word in _TOKEN.findall(unicodedata.normalize('NFKC', text).lower()):
+        if word:
+            if len(word) <= MAX_TERM_LENGTH:
+                terms.append(word)
+        elif len(cjk) == 1:
+            terms.append(cjk)
+        else:
+            terms.extend(cjk[i:i + 2] for i in range(len(cjk) - 1))
+    return terms
+
+
+def _append_varint(data: bytearray, value: int):
+    while value >= 0x80:
+        data.append(value & 0x7f | 0x80)
+        value >>= 7
+    data.append(value)
+
+
+def _read_varint(data: bytearray, i: int) -> Tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = data[i]
+        i += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, i
+        shift += 7
+
+
+# Posting lists start with the last document number added, so appends need not decode them
+_HEADER = 4
+# Small lists are immutable bytes (less overhead per term); larger ones grow in place
+_SMALL = 64
+
+
+def _append_posting(data: Optional[bytes], doc: int, tf: int) -> bytes:
+    """Posting list ``data`` with a document appended; may be a new object.
+
+    Each entry is ``gap << 1 | (tf > 1)``, followed by the term frequency
+    only when it is above one, all as varints, so most entries take a
+    single byte.
+    """
+    last = int.from_bytes(data[:_HEADER], 'little') if data else 0
+    entry = bytearray()
+    _append_varint(entry, (doc - last) << 1 | (tf > 1))
+    if tf > 1:
+        _append_varint(entry, tf)
+    header = doc.to_bytes(_HEADER, 'little')
+
+    if isinstance(data, bytearray):
+        data[:_HEADER] = header
+        data += entry
+        return data
+    data = header + (data[_HEADER:] if data else b'') + entry
+    return bytearray(data) if len(data) > _SMALL else data
+
+
+def _decode(data: bytes) -> Iterator[Tuple[int, int]]:
+    """(document, term frequency) pairs of a posting list"""
+    doc = 0
+    i = _HEADER
+    end = len(data)
+    while i < end:
+        value = data[i]
+        if value < 0x80:
+            i += 1
+        else:
+            value, i = _read_varint(data, i)
+        doc += value >> 1
+        if value & 1:
+            tf, i = _read_varint(data, i)
+            yield doc, tf
+        else:
+            yield doc, 1
+
+
+class _ChannelIndex:
+    __slots__ = ("message_ids", "lengths", "total_length", "postings", "removed")
+
+    def __init__(self):
+        # Document numbers are positions in these arrays, in the order messages were added
+        self.message_ids: List[str] = []
+        self.lengths = array('I')
+        self.total_length = 0
+        # Term ID -> posting list
+        self.postings: Dict[int, bytes] = {}
+        # Document numbers of removed messages; their postings stay but never match
+        self.removed: Set[int] = set()
+
+
+class SearchIndex:
+    """Ranked full-text search over channel messages, held in memory.
+
+    Messages are added as they are written; nothing is ever rescanned.
+    Each channel has its own inverted index, so a search only reads the
+    posting lists of the channels it covers. Results are ranked with BM25,
+    using each channel's own term statistics.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._channels: Dict[str, _ChannelIndex] = {}
+        # Shared by all channels, so each distinct term is stored once
+        self._term_ids: Dict[str, int] = {}
+        self._posting_count = 0
+        self._backfill_seen: Optional[Set[str]] = None
+
+    def add(self, channel_id: str, message: Dict[str, Any]):
+        """Index a new message"""
+        if self._backfill_seen is not None:
+            self._backfill_seen.add(message['message_id'])
+        self._add(channel_id, message)
+
+    def remove(self, channel_id: str, message_ids: Iterable[str]):
+        """Stop returning messages that no longer exist (deleted, or archived where nothing can read them)"""
+        channel = self._channels.get(channel_id)
+        if channel is None:
+            return
+        wanted = set(message_ids)
+        channel.removed.update(doc for doc, message_id in enumerate(channel.message_ids) if message_id in wanted)
+
+    def begin_backfill(self):
+        """Start indexing existing messages alongside new ones.
+
+        Messages added from now on are remembered until end_backfill, so the
+        backfill skips any it also reads from the table.
+        """
+        self._backfill_seen = set()
+
+    def add_existing(self, channel_id: str, message: Dict[str, Any]):
+        """Index a message read by the backfill, unless it was already added"""
+        if self._backfill_seen is None or message['message_id'] not in self._backfill_seen:
+            self._add(channel_id, message)
+
+    def end_backfill(self):
+        self._backfill_seen = None
+
+    def _add(self, channel_id: str, message: Dict[str, Any]):
+        channel = self._channels.get(channel_id)
+        if channel is None:
+            channel = self._channels[channel_id] = _ChannelIndex()
+
+        terms = tokenize(message.get('content') or '')
+        doc = len(channel.message_ids)
+        channel.message_ids.append(message['message_id'])
+        channel.lengths.append(len(terms))
+        channel.total_length += len(terms)
+
+        frequencies: Dict[str, int] = {}
+        for term in terms:
+            frequencies[term] = frequencies.get(term, 0) + 1
+        term_ids = self._term_ids
+        postings = channel.postings
+        for term, tf in frequencies.items():
+            term_id = term_ids.get(term)
+            if term_id is None:
+                term_id = term_ids[term] = len(term_ids)
+            postings[term_id] = _append_posting(postings.get(term_id), doc, tf)
+        self._posting_count += len(frequencies)
+
+    def search(self, query: str, channel_ids: Iterable[str], offset: int = 0, limit: int = 20) -> Dict[str, Any]:
+        """Messages of the given channels matching any query term, best first.
+
+        Returns the ``total`` number of matches and ``hits`` (channel_id,
+        message_id, score) for the requested page. Equal scores rank newer
+        messages first.
+        """
+        term_ids = self._query_terms(query)
+        total = 0
+        candidates: List[Tuple[float, str, str]] = []
+        for channel_id in set(channel_ids):
+            total += self._score_channel(channel_id, term_ids, candidates)
+        return self._page(total, candidates, offset, limit)
+
+    async def search_async(self, query: str, channel_ids: Iterable[str], offset: int = 0, limit: int = 20) -> Dict[str, Any]:
+        """Like search, but yields to the event loop after each channel.
+
+        The index is only ever touched from the loop, so a channel is scored
+        without messages being added to it meanwhile, while a project with
+        many channels does not hold the loop for the whole search.
+        """
+        term_ids = self._query_terms(query)
+        total = 0
+        candidates: List[Tuple[float, str, str]] = []
+        for channel_id in set(channel_ids):
+            total += self._score_channel(channel_id, term_ids, candidates)
+            await asyncio.sleep(0)
+        return self._page(total, candidates, offset, limit)
+
+    def _query_terms(self, query: str) -> Set[int]:
+        term_ids = {self._term_ids.get(term) for term in tokenize(query)}
+        term_ids.discard(None)
+        return term_ids
+
+    def _score_channel(self, channel_id: str, term_ids: Set[int], candidates: List[Tuple[float, str, str]]) -> int:
+        """Add a channel's matches to ``candidates``; returns how many there were"""
+        channel = self._channels.get(channel_id)
+        if channel is None or not term_ids:
+            return 0
+        k1, b = self.k1, self.b
+        count = len(channel.message_ids)
+        average_length = channel.total_length / count or 1
+        lengths = channel.lengths
+        removed = channel.removed
+
+        scores: Dict[int, float] = {}
+        for term_id in term_ids:
+            data = channel.postings.get(term_id)
+            if data is None:
+                continue
+            entries = list(_decode(data))
+            idf = math.log(1 + (count - len(entries) + 0.5) / (len(entries) + 0.5))
+            for doc, tf in entries:
+                if doc in removed:
+                    continue
+                norm = k1 * (1 - b + b * lengths[doc] / average_length)
+                scores[doc] = scores.get(doc, 0.0) + idf * tf * (k1 + 1) / (tf + norm)
+
+        message_ids = channel.message_ids
+        candidates.extend((score, message_ids[doc], channel_id) for doc, score in scores.items())
+        return len(scores)
+
+    def _page(self, total: int, candidates: List[Tuple[float, str, str]], offset: int, limit: int) -> Dict[str, Any]:
+        top = heapq.nlargest(offset + limit, candidates)
+        return {
+            'total': total,
+            'hits': [
+                {'channel_id': channel_id, 'message_id': message_id, 'score': score}
+                for score, message_id, channel_id in top[offset:]
+            ]
+        }
+
+    def stats(self) -> Dict[str, int]:
+        """Size of the index"""
+        channels = self._channels.values()
+        return {
+            'channels': len(self._channels),
+            'messages': sum(len(channel.message_ids) for channel in channels),
+            'terms': len(self._term_ids),
+            'channel_terms': sum(len(channel.postings) for channel in channels),
+            'postings': self._posting_count,
+            'posting_bytes': sum(len(data) for channel in channels for data in channel.postings.values()),
+        }
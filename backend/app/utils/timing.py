@@ -0,0 +1,61 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Dict, Iterator, List, Optional
+
+
+# Per-request {phase: [total_ms, calls]}; the dict is shared with child tasks
+# and worker threads, which inherit a copy of the context but not a copy of it
+_request_timings: ContextVar[Optional[Dict[str, List[float]]]] = ContextVar("request_timings", default=None)
+
+
+def start_request_timings() -> Token:
+    """Begin collecting phase timings for the current request"""
+    return _request_timings.set({})
+
+
+def stop_request_timings(token: Token):
+    _request_timings.reset(token)
+
+
+def get_request_timings() -> Dict[str, float]:
+    """Milliseconds spent per phase so far in the current request"""
+    timings = _request_timings.get()
+    if not timings:
+        return {}
+    return {name: round(total, 3) for name, (total, _) in timings.items()}
+
+
+@contextmanager
+def timed(name: str) -> Iterator[None]:
+    """Add the duration of the block to the current request's ``name`` phase"""
+    timings = _request_timings.get()
+    if timings is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = (time.perf_counter() - start) * 1000
+        entry = timings.get(name)
+        if entry is None:
+            timings[name] = [elapsed, 1]
+        else:
+            entry[0] += elapsed
+            entry[1] += 1
+
+
+def server_timing_header(extra: Optional[Dict[str, float]] = None) -> str:
+    """Render the current request's timings as a Server-Timing header value"""
+    timings = _request_timings.get() or {}
+    metrics = []
+    for name, (total, calls) in timings.items():
+        metric = f"{name};dur={total:.1f}"
+        if calls > 1:
+            metric += f';desc="{int(calls)} calls"'
+        metrics.append(metric)
+    for name, total in (extra or {}).items():
+        metrics.append(f"{name};dur={total:.1f}")
+    return ", ".join(metrics)
@@ -0,0 +1,174 @@
+import random
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+import structlog
+from fastapi import FastAPI
+from opentelemetry import trace
+from opentelemetry.context import Context
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, Span, SpanProcessor, TracerProvider
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor, ConsoleSpanExporter, SimpleSpanProcessor, SpanExporter
+)
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+from opentelemetry.trace import StatusCode
+
+from app.config import settings
+
+
+logger = structlog.get_logger()
+
+# Spans finished in this process when trace_exporter is "memory"
+memory_exporter: Optional[InMemorySpanExporter] = None
+
+
+class TailSamplingSpanProcessor(SpanProcessor):
+    """Buffer each trace until its local root ends, then keep or drop it whole.
+
+    Traces that contain an error or whose root ran longer than
+    ``slow_threshold_ms`` are always exported; the rest are exported at
+    ``baseline_rate``. Works on top of head sampling, which decides what gets
+    recorded in the first place.
+    """
+
+    def __init__(
+        self,
+        delegate: SpanProcessor,
+        slow_threshold_ms: float = 500,
+        baseline_rate: float = 0.05,
+        max_pending_traces: int = 10000
+    ):
+        self.delegate = delegate
+        self.slow_threshold_ns = slow_threshold_ms * 1_000_000
+        self.baseline_rate = baseline_rate
+        self.max_pending_traces = max_pending_traces
+
+        self._lock = threading.Lock()
+        self._pending: "OrderedDict[int, List[ReadableSpan]]" = OrderedDict()
+        # Decisions for recently finished traces, for spans that end after their root
+        self._decided: "OrderedDict[int, bool]" = OrderedDict()
+
+    def on_start(self, span: Span, parent_context: Optional[Context] = None):
+        self.delegate.on_start(span, parent_context=parent_context)
+
+    def on_end(self, span: ReadableSpan):
+        trace_id = span.context.trace_id
+        is_local_root = span.parent is None or span.parent.is_remote
+
+        with self._lock:
+            decision = self._decided.get(trace_id)
+            if decision is None:
+                spans = self._pending.setdefault(trace_id, [])
+                spans.append(span)
+                if not is_local_root:
+                    if len(self._pending) > self.max_pending_traces:
+                        self._pending.popitem(last=False)
+                    return
+
+                del self._pending[trace_id]
+                decision = self._should_keep(span, spans)
+                self._decided[trace_id] = decision
+                if len(self._decided) > self.max_pending_traces:
+                    self._decided.popitem(last=False)
+            else:
+                spans = [span]
+
+        if decision:
+            for finished in spans:
+                self.delegate.on_end(finished)
+
+    def _should_keep(self, root: ReadableSpan, spans: List[ReadableSpan]) -> bool:
+        if any(s.status.status_code == StatusCode.ERROR for s in spans):
+            return True
+        if (root.attributes or {}).get("http.status_code", 0) >= 500:
+            return True
+        if root.end_time - root.start_time >= self.slow_threshold_ns:
+            return True
+        return random.random() < self.baseline_rate
+
+    def shutdown(self):
+        self.delegate.shutdown()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self.delegate.force_flush(timeout_millis)
+
+
+def create_exporter(name: str) -> Optional[SpanExporter]:
+    """Build the span exporter selected by ``trace_exporter``"""
+    global memory_exporter
+
+    if name == "console":
+        return ConsoleSpanExporter()
+    if name == "memory":
+        memory_exporter = InMemorySpanExporter()
+        return memory_exporter
+    if name == "otlp":
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        except ImportError:
+            logger.warning("OTLP exporter not installed, traces will not be exported")
+            return None
+        return OTLPSpanExporter()
+    return None
+
+
+def create_tracer_provider() -> Optional[TracerProvider]:
+    """Build a tracer provider with head and tail sampling from settings"""
+    exporter = create_exporter(settings.trace_exporter)
+    if exporter is None:
+        return None
+
+    provider = TracerProvider(
+        resource=Resource.create({
+            "service.name": f"{settings.project_name}-api",
+            "service.version": settings.app_version,
+            "deployment.environment": settings.environment,
+        }),
+        sampler=ParentBased(TraceIdRatioBased(settings.trace_head_sample_rate))
+    )
+
+    # In-memory and console exports are for local use; keep them synchronous
+    if settings.trace_exporter in ("memory", "console"):
+        processor: SpanProcessor = SimpleSpanProcessor(exporter)
+    else:
+        processor = BatchSpanProcessor(exporter)
+
+    if settings.trace_tail_sampling:
+        processor = TailSamplingSpanProcessor(
+            processor,
+            slow_threshold_ms=settings.trace_tail_slow_threshold_ms,
+            baseline_rate=settings.trace_tail_baseline_rate
+        )
+    provider.add_span_processor(processor)
+    return provider
+
+
+def configure_tracing(app: FastAPI) -> Optional[TracerProvider]:
+    """Install the global tracer provider and instrument the FastAPI app"""
+    if not settings.enable_tracing:
+        return None
+
+    provider = create_tracer_provider()
+    if provider is None:
+        # Without an exporter the default no-op provider keeps span overhead near zero
+        return None
+
+    # Imported only when tracing is on; the instrumentation pulls in a lot at startup
+    from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+
+    trace.set_tracer_provider(provider)
+    FastAPIInstrumentor.instrument_app(
+        app,
+        tracer_provider=provider,
+        excluded_urls="/health,/metrics"
+    )
+    logger.info(
+        "Tracing configured",
+        exporter=settings.trace_exporter,
+        head_sample_rate=settings.trace_head_sample_rate,
+        tail_sampling=settings.trace_tail_sampling
+    )
+    return provider
@@ -0,0 +1,15 @@
+from uvicorn.workers import UvicornWorker
+
+
+class AppUvicornWorker(UvicornWorker):
+    """Uvicorn worker for gunicorn using uvloop and httptools.
+
+    Also passes gunicorn's graceful_timeout to uvicorn so in-flight requests
+    get that long to finish after SIGTERM before connections are closed.
+    """
+
+    CONFIG_KWARGS = {"loop": "uvloop", "http": "httptools", "lifespan": "on"}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.config.timeout_graceful_shutdown = self.cfg.graceful_timeout
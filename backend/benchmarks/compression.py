@@ -0,0 +1,102 @@
+"""Payload-size benchmark for response compression.
+
+Renders representative project list pages and agent responses, then
+reports the encoded size and CPU time of each encoding the
+CompressionMiddleware can negotiate, at the levels configured in settings.
+
+Run from backend/:  python -m benchmarks.compression
+"""
+import argparse
+import importlib.util
+import os
+import statistics
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from app.config import settings
+from app.models.project import Project
+from app.utils.middleware import CompressionMiddleware
+from app.utils.responses import FastJSONResponse
+from benchmarks.project_list import make_large_project
+
+
+PM_HANDLER = Path(__file__).resolve().parents[2] / "lambda" / "agents" / "pm_handler.py"
+
+
+def project_list_payload(count: int, requirements: int) -> bytes:
+    items = [make_large_project(i, requirements) for i in range(count)]
+    return FastJSONResponse({
+        "projects": [Project.from_db(item) for item in items],
+        "total": count,
+        "page": 1,
+        "page_size": count,
+        "has_next": False,
+    }).body
+
+
+def agent_responses_payload(count: int) -> bytes:
+    """A page of PM agent replies as returned by lambda/agents/pm_handler.py"""
+    # The handler creates its Bedrock client at import time
+    os.environ.setdefault("AWS_DEFAULT_REGION", settings.bedrock_region)
+    spec = importlib.util.spec_from_file_location("pm_handler", PM_HANDLER)
+    pm_handler = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(pm_handler)
+
+    prompts = ["Please plan the schedule", "What are the main risks?", "Hello"]
+    responses = [
+        pm_handler.generate_pm_response({"name": f"Project {i}"}, prompts[i % len(prompts)])
+        for i in range(count)
+    ]
+    return FastJSONResponse({"responses": responses}).body
+
+
+def encoders(middleware: CompressionMiddleware) -> Dict[str, Callable[[bytes], bytes]]:
+    def encode(encoding: str) -> Callable[[bytes], bytes]:
+        def run(body: bytes) -> bytes:
+            encoder = middleware.create_encoder(encoding)
+            return encoder.compress(body) + encoder.finish()
+        return run
+
+    return {"gzip": encode("gzip"), "br": encode("br")}
+
+
+def measure(func: Callable[[bytes], bytes], body: bytes, repeat: int) -> Tuple[int, float]:
+    encoded = func(body)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(body)
+        timings.append((time.perf_counter() - start) * 1000)
+    return len(encoded), statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requirements", type=int, default=10, help="Requirements per project")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    middleware = CompressionMiddleware(
+        app=None,
+        minimum_size=settings.compression_minimum_size,
+        gzip_level=settings.compression_gzip_level,
+        brotli_quality=settings.compression_brotli_quality
+    )
+    payloads: List[Tuple[str, bytes]] = [
+        ("project list, 20 projects", project_list_payload(20, args.requirements)),
+        ("project list, 100 projects", project_list_payload(100, args.requirements)),
+        ("PM agent responses, 20", agent_responses_payload(20)),
+    ]
+
+    print(f"gzip level {settings.compression_gzip_level}, brotli quality {settings.compression_brotli_quality}\n")
+    print(f"{'payload':<28} {'encoding':<9} {'bytes':>10} {'ratio':>7} {'encode ms':>10}")
+    for name, body in payloads:
+        print(f"{name:<28} {'identity':<9} {len(body):>10} {1:>7.3f} {0:>10.2f}")
+        for encoding, func in encoders(middleware).items():
+            size, elapsed = measure(func, body, args.repeat)
+            print(f"{'':<28} {encoding:<9} {size:>10} {size / len(body):>7.3f} {elapsed:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Benchmark serialization of GET /projects with 100 large projects.
+
+Compares FastAPI's response_model pipeline (validate every row into a
+Project, then jsonable_encoder + JSONResponse) with the trusted-data path
+(Project.from_db + FastJSONResponse), and times the full endpoint.
+
+Run from backend/:  python -m benchmarks.project_list
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Any, Callable, Dict, List
+
+import structlog
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.testclient import TestClient
+from unittest.mock import AsyncMock
+
+from app.api.v1 import projects
+from app.models.project import Project, ProjectListResponse
+from app.services.dynamodb import DynamoDBService
+from app.utils.auth import get_current_user
+from app.utils.responses import FastJSONResponse
+
+
+def make_large_project(index: int, requirement_count: int = 40) -> Dict[str, Any]:
+    """Build a project item the way DynamoDBService returns it"""
+    now = datetime(2024, 1, 1) + timedelta(minutes=index)
+    project = Project(
+        project_id=f"proj_{index:012d}",
+        name=f"Benchmark Project {index}",
+        description="Large project used for serialization benchmarks. " * 15,
+        user_id="bench_user",
+        status="active",
+        requirements=[
+            {
+                "id": f"req_{index}_{r}",
+                "title": f"Requirement {r}",
+                "description": "The system shall do something useful and measurable. " * 4,
+                "priority": "high",
+                "acceptance_criteria": [f"Criterion {c}" for c in range(5)],
+                "created_at": now,
+            }
+            for r in range(requirement_count)
+        ],
+        metadata={
+            "tags": [f"tag{t}" for t in range(10)],
+            "tech_stack": ["React", "FastAPI", "DynamoDB", "Bedrock"],
+            "target_audience": "Developers",
+            "business_goals": [f"Goal {g}" for g in range(5)],
+        },
+        created_at=now,
+        updated_at=now,
+        assigned_agents=["agent_pm_001", "agent_arch_001", "agent_sec_001"],
+        team_members=[f"user_{m}" for m in range(10)],
+        settings={"notifications": True, "review_required": True, "max_agents": 5},
+    )
+
+    db_service = DynamoDBService.__new__(DynamoDBService)
+    item = db_service._serialize_item(project.model_dump())
+    item["progress_percentage"] = Decimal("42.5")
+    item["total_tasks"] = Decimal("120")
+    item["completed_tasks"] = Decimal("51")
+    return db_service._deserialize_item(item)
+
+
+def response_model_path(items: List[Dict[str, Any]]) -> bytes:
+    """What the route did before: validate rows, then let FastAPI re-validate and encode"""
+    field = next(
+        route.response_field for route in projects.router.routes
+        if route.path == "/" and "GET" in route.methods
+    )
+    model = ProjectListResponse(
+        projects=[Project(**item) for item in items],
+        total=len(items),
+        page=1,
+        page_size=len(items),
+        has_next=False,
+    )
+    content = asyncio.run(serialize_response(field=field, response_content=model))
+    return JSONResponse(content).body
+
+
+def trusted_path(items: List[Dict[str, Any]]) -> bytes:
+    return FastJSONResponse({
+        "projects": [Project.from_db(item) for item in items],
+        "total": len(items),
+        "page": 1,
+        "page_size": len(items),
+        "has_next": False,
+    }).body
+
+
+def measure(func: Callable[[], Any], repeat: int) -> List[float]:
+    func()  # warm-up
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(name: str, timings: List[float]):
+    print(
+        f"{name:<34} median {statistics.median(timings):8.2f} ms   "
+        f"min {min(timings):8.2f} ms   max {max(timings):8.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--projects", type=int, default=100)
+    parser.add_argument("--requirements", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    # Keep per-request logging out of the measurements
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+    items = [make_large_project(i, args.requirements) for i in range(args.projects)]
+    print(f"{args.projects} projects, payload {len(trusted_path(items)) / 1024:.0f} KiB\n")
+
+    report("response_model + JSONResponse", measure(lambda: response_model_path(items), args.repeat))
+    report("from_db + FastJSONResponse", measure(lambda: trusted_path(items), args.repeat))
+
+    # End to end through the router, without network or middleware
+    db_service = AsyncMock(spec=DynamoDBService)
+    db_service.list_projects.return_value = {"items": items, "last_evaluated_key": None, "count": len(items)}
+    bench_app = FastAPI()
+    bench_app.include_router(projects.router, prefix="/api/v1/projects")
+    bench_app.dependency_overrides[get_current_user] = lambda: {"user_id": "bench_user"}
+    bench_app.dependency_overrides[projects.get_dynamodb_service] = lambda: db_service
+    client = TestClient(bench_app)
+    url = f"/api/v1/projects/?page_size={min(args.projects, 100)}"
+    report("GET /api/v1/projects (end to end)", measure(lambda: client.get(url), args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Benchmark the in-memory message search index at 1M messages.
+
+Indexes synthetic channel messages (English words with a Zipf-like
+frequency spread, plus Japanese text), then reports indexing throughput,
+index size, and query latency for single-channel and whole-project
+searches with rare, common and CJK terms.
+
+Run from backend/:  python -m benchmarks.search
+"""
+import argparse
+import random
+import statistics
+import time
+import tracemalloc
+from typing import Dict, List
+
+from app.utils.search_index import SearchIndex
+
+
+JAPANESE = [
+    "設計レビューを明日実施します", "デプロイが完了しました", "認証の不具合を修正しました",
+    "要件定義の資料を共有します", "テスト環境でエラーが発生しています", "セキュリティ診断の結果です",
+]
+
+
+def make_vocabulary(size: int) -> List[str]:
+    rng = random.Random(1)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return [
+        "".join(rng.choice(letters) for _ in range(rng.randint(3, 10)))
+        for _ in range(size)
+    ]
+
+
+def make_messages(count: int, channels: int, vocabulary: List[str]):
+    """(channel_id, message) pairs in send order"""
+    rng = random.Random(2)
+    # Rank-based weights give a few very common words and a long tail of rare ones
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    words = rng.choices(vocabulary, weights=weights, k=count * 12)
+    position = 0
+    for i in range(count):
+        length = rng.randint(4, 20)
+        content = " ".join(words[position:position + length])
+        position = (position + length) % (len(words) - 20)
+        if i % 10 == 0:
+            content += " " + rng.choice(JAPANESE)
+        yield f"channel_{i % channels:04d}", {"message_id": f"msg_{i:026d}", "content": content}
+
+
+def time_queries(index: SearchIndex, query: str, scopes: List[List[str]], limit: int) -> Dict[str, float]:
+    durations = []
+    total = 0
+    for channel_ids in scopes:
+        started = time.perf_counter()
+        result = index.search(query, channel_ids, limit=limit)
+        durations.append((time.perf_counter() - started) * 1000)
+        total += result["total"]
+    durations.sort()
+    return {
+        "p50": statistics.median(durations),
+        "p95": durations[int(len(durations) * 0.95) - 1] if len(durations) >= 20 else durations[-1],
+        "hits": total / len(scopes),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--channels", type=int, default=500)
+    parser.add_argument("--channels-per-project", type=int, default=10)
+    parser.add_argument("--vocabulary", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=50, help="Scopes timed per query")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--memory", action="store_true", help="Trace allocations while indexing (slow)")
+    args = parser.parse_args()
+
+    vocabulary = make_vocabulary(args.vocabulary)
+    index = SearchIndex()
+
+    if args.memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    for channel_id, message in make_messages(args.messages, args.channels, vocabulary):
+        index.add(channel_id, message)
+    elapsed = time.perf_counter() - started
+    if args.memory:
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    stats = index.stats()
+    print(f"{args.messages:,} messages in {args.channels} channels")
+    print(f"indexing        {elapsed:8.1f} s  ({args.messages / elapsed:,.0f} messages/s)")
+    print(
+        f"index           {stats['terms']:,} terms ({stats['channel_terms']:,} per channel), "
+        f"{stats['postings']:,} postings in {stats['posting_bytes'] / 2**20:.1f} MiB "
+        f"({stats['posting_bytes'] / stats['postings']:.2f} bytes each, headers included)"
+    )
+    if args.memory:
+        print(f"memory          {current / 2**20:.0f} MiB held by the index")
+
+    rng = random.Random(3)
+    channel_ids = [f"channel_{i:04d}" for i in range(args.channels)]
+    projects = [
+        channel_ids[i:i + args.channels_per_project]
+        for i in range(0, args.channels, args.channels_per_project)
+    ]
+    channel_scopes = [[rng.choice(channel_ids)] for _ in range(args.queries)]
+    project_scopes = [rng.choice(projects) for _ in range(args.queries)]
+    queries = {
+        "rare word": vocabulary[-1],
+        "common word": vocabulary[0],
+        "two words": f"{vocabulary[5]} {vocabulary[500]}",
+        "japanese": "デプロイ",
+    }
+
+    print(f"\n{'query':<14}{'scope':<10}{'p50 ms':>9}{'p95 ms':>9}{'hits':>10}")
+    for name, query in queries.items():
+        for scope_name, scopes in (("channel", channel_scopes), ("project", project_scopes)):
+            timing = time_queries(index, query, scopes, args.limit)
+            print(f"{name:<14}{scope_name:<10}{timing['p50']:9.2f}{timing['p95']:9.2f}{timing['hits']:10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Benchmark worker startup: import time, lifespan startup and first request.
+
+Each run starts a fresh interpreter that imports app.main, runs the
+lifespan startup against moto-backed DynamoDB and then issues the same
+authenticated GET /projects/{id} twice, so the first request shows the
+cold-path cost left after startup.
+
+Run from backend/:  python -m benchmarks.startup [--runs 5] [--json out.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+PHASES = ["import_ms", "startup_ms", "first_request_ms", "second_request_ms", "time_to_first_request_ms"]
+
+
+def child():
+    """Measure one cold start; prints a JSON line of phase durations"""
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+    os.environ["LOG_LEVEL"] = "WARNING"
+    os.environ["DEBUG"] = "false"
+
+    # Test scaffolding is loaded before the clock starts
+    import asyncio
+    import boto3
+    import httpx
+    from jose import jwt
+    from moto import mock_dynamodb
+
+    with mock_dynamodb():
+        from app.config import settings
+
+        dynamodb = boto3.resource("dynamodb", region_name=settings.aws_region)
+        dynamodb.create_table(
+            TableName=settings.projects_table,
+            KeySchema=[{"AttributeName": "project_id", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "project_id", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST"
+        )
+        dynamodb.Table(settings.projects_table).put_item(Item={
+            "project_id": "bench",
+            "name": "Startup benchmark",
+            "description": "",
+            "user_id": "bench_user",
+            "status": "active",
+            "requirements": "[]",
+            "metadata": "{}",
+            "created_at": "2024-01-01T00:00:00",
+            "updated_at": "2024-01-01T00:00:00",
+        })
+        token = jwt.encode({"sub": "bench_user"}, settings.secret_key, algorithm=settings.algorithm)
+
+        start = time.perf_counter()
+        from app.main import app
+        imported = time.perf_counter()
+
+        async def run() -> Dict[str, float]:
+            async with app.router.lifespan_context(app):
+                started = time.perf_counter()
+                transport = httpx.ASGITransport(app=app, client=("127.0.0.1", 50000))
+                async with httpx.AsyncClient(transport=transport, base_url="http://localhost") as client:
+                    headers = {"Authorization": f"Bearer {token}"}
+                    response = await client.get(f"{settings.api_v1_prefix}/projects/bench", headers=headers)
+                    response.raise_for_status()
+                    first = time.perf_counter()
+                    await client.get(f"{settings.api_v1_prefix}/projects/bench", headers=headers)
+                    second = time.perf_counter()
+            return {
+                "import_ms": (imported - start) * 1000,
+                "startup_ms": (started - imported) * 1000,
+                "first_request_ms": (first - started) * 1000,
+                "second_request_ms": (second - first) * 1000,
+                "time_to_first_request_ms": (first - start) * 1000,
+            }
+
+        print(json.dumps(asyncio.run(run())))
+
+
+def measure(runs: int) -> List[Dict[str, float]]:
+    results = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.startup", "--child"],
+            check=True,
+            capture_output=True,
+            text=True
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", help="Write median phase durations to this file")
+    parser.add_argument(
+        "--budget-ms", type=float,
+        help="Exit non-zero when median time to first request exceeds this"
+    )
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child()
+        return
+
+    results = measure(args.runs)
+    medians = {phase: round(statistics.median(r[phase] for r in results), 1) for phase in PHASES}
+    for phase in PHASES:
+        print(f"{phase:<26} median {medians[phase]:8.1f} ms  (min {min(r[phase] for r in results):.1f})")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"runs": args.runs, "median": medians}, f, indent=2)
+
+    if args.budget_ms is not None and medians["time_to_first_request_ms"] > args.budget_ms:
+        print(f"Time to first request over budget ({args.budget_ms:.0f} ms)")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Production server configuration.
+
+Run from backend/:  gunicorn -c gunicorn.conf.py app.main:app
+
+More than one worker requires REDIS_URL (see ``workers`` below).
+
+Signals (sent to the master):
+  TERM  graceful shutdown; workers stop accepting and drain in-flight
+        requests for up to graceful_timeout seconds
+  HUP   graceful reload of workers (with preload_app, code changes need a
+        full restart since workers fork from the preloaded master)
+  TTIN/TTOU  add/remove a worker
+"""
+import os
+import shutil
+
+
+def _available_cpus() -> int:
+    # Respects CPU affinity / container cpusets, unlike os.cpu_count()
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+# Prometheus multiprocess mode; must be set before the app (and prometheus_client) is imported
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/prometheus-multiproc")
+os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+from app.config import settings  # noqa: E402  (after PROMETHEUS_MULTIPROC_DIR is set)
+
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+# Async workers: one per core is enough to keep every core busy. Channel events (WebSocket
+# pushes, recent-message caches, the search index) only cross workers through Redis, so
+# without REDIS_URL a single worker is the default and more are refused.
+workers = int(os.environ.get("WEB_CONCURRENCY", _available_cpus() if settings.redis_url else 1))
+if workers > 1 and not settings.redis_url:
+    raise RuntimeError(
+        f"{workers} workers need REDIS_URL: without it each worker only sees channel "
+        "events written by itself (stale message caches, missed pushes, partial search)"
+    )
+worker_class = "app.workers.AppUvicornWorker"
+
+# Import the app once in the master so workers fork with it loaded
+preload_app = os.environ.get("PRELOAD_APP", "true").lower() == "true"
+
+timeout = int(os.environ.get("WORKER_TIMEOUT", 60))
+graceful_timeout = int(os.environ.get("GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.environ.get("KEEPALIVE", 5))
+
+# Recycle workers now and then so slow leaks cannot build up; jitter avoids restarting all at once
+max_requests = int(os.environ.get("MAX_REQUESTS", 10000))
+max_requests_jitter = int(os.environ.get("MAX_REQUESTS_JITTER", 1000))
+
+# Application logs go through app.utils.logger; keep gunicorn's own on stdout
+accesslog = None
+errorlog = "-"
+loglevel = os.environ.get("LOG_LEVEL", "info").lower()
+
+
+def on_starting(server):
+    """Start with an empty metrics directory so workers from a previous run are not counted.
+
+    Runs after the app is preloaded; the master's own metric files are
+    discarded, workers write fresh files keyed by their pid.
+    """
+    metrics_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    """Drop live-only metrics (gauges) of a worker that exited"""
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -1,12 +1,16 @@
 import pytest
 import asyncio
 from fastapi.testclient import TestClient
-from unittest.mock import Mock, patch
+from unittest.mock import Mock, AsyncMock, patch
 import boto3
-from moto import mock_dynamodb
+from fastapi import FastAPI
+from moto import mock_dynamodb as moto_mock_dynamodb
 
 from app.main import app
 from app.config import settings
+from app.api.v1 import messages, projects
+from app.services.dynamodb import DynamoDBService
+from app.utils.auth import get_current_user
 
 
 @pytest.fixture(scope="session")
@@ -41,10 +45,36 @@ def auth_headers(mock_auth_user):
         yield {"Authorization": "Bearer test_token"}
 
 
+@pytest.fixture
+def mock_db_service():
+    """DynamoDBService stand-in whose operations are AsyncMocks."""
+    return AsyncMock(spec=DynamoDBService)
+
+
+@pytest.fixture
+def projects_client(mock_auth_user, mock_db_service):
+    """Client for the projects router with auth and DynamoDB overridden."""
+    projects_app = FastAPI()
+    projects_app.include_router(projects.router, prefix=f"{settings.api_v1_prefix}/projects")
+    projects_app.dependency_overrides[get_current_user] = lambda: mock_auth_user
+    projects_app.dependency_overrides[projects.get_dynamodb_service] = lambda: mock_db_service
+    return TestClient(projects_app)
+
+
+@pytest.fixture
+def messages_client(mock_auth_user, mock_db_service):
+    """Client for the messages router with auth and DynamoDB overridden."""
+    messages_app = FastAPI()
+    messages_app.include_router(messages.router, prefix=f"{settings.api_v1_prefix}/messages")
+    messages_app.dependency_overrides[get_current_user] = lambda: mock_auth_user
+    messages_app.dependency_overrides[messages.get_dynamodb_service] = lambda: mock_db_service
+    return TestClient(messages_app)
+
+
 @pytest.fixture
 def mock_dynamodb():
     """Mock DynamoDB for testing."""
-    with mock_dynamodb():
+    with moto_mock_dynamodb():
         # Create DynamoDB resource
         dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
         
@@ -56,6 +86,7 @@ def mock_dynamodb():
         create_channels_table(dynamodb)
         create_artifacts_table(dynamodb)
         create_ws_connections_table(dynamodb)
+        create_channel_members_table(dynamodb)
         
         yield dynamodb
 
@@ -80,8 +111,7 @@ def create_projects_table(dynamodb):
                     {'AttributeName': 'user_id', 'KeyType': 'HASH'},
                     {'AttributeName': 'created_at', 'KeyType': 'RANGE'}
                 ],
-                'Projection': {'ProjectionType': 'ALL'},
-                'BillingMode': 'PAY_PER_REQUEST'
+                'Projection': {'ProjectionType': 'ALL'}
             },
             {
                 'IndexName': 'status-index',
@@ -89,8 +119,7 @@ def create_projects_table(dynamodb):
                     {'AttributeName': 'status', 'KeyType': 'HASH'},
                     {'AttributeName': 'created_at', 'KeyType': 'RANGE'}
                 ],
-                'Projection': {'ProjectionType': 'ALL'},
-                'BillingMode': 'PAY_PER_REQUEST'
+                'Projection': {'ProjectionType': 'ALL'}
             }
         ],
         BillingMode='PAY_PER_REQUEST'
@@ -109,8 +138,7 @@ def create_agents_table(dynamodb):
         AttributeDefinitions=[
             {'AttributeName': 'agent_id', 'AttributeType': 'S'},
             {'AttributeName': 'project_id', 'AttributeType': 'S'},
-            {'AttributeName': 'agent_type', 'AttributeType': 'S'},
-            {'AttributeName': 'status', 'AttributeType': 'S'}
+            {'AttributeName': 'agent_type', 'AttributeType': 'S'}
         ],
         GlobalSecondaryIndexes=[
             {
@@ -119,8 +147,7 @@ def create_agents_table(dynamodb):
                     {'AttributeName': 'project_id', 'KeyType': 'HASH'},
                     {'AttributeName': 'agent_type', 'KeyType': 'RANGE'}
                 ],
-                'Projection': {'ProjectionType': 'ALL'},
-                'BillingMode': 'PAY_PER_REQUEST'
+                'Projection': {'ProjectionType': 'ALL'}
             }
         ],
         BillingMode='PAY_PER_REQUEST'
@@ -141,7 +168,8 @@ def create_messages_table(dynamodb):
             {'AttributeName': 'channel_id', 'AttributeType': 'S'},
             {'AttributeName': 'message_id', 'AttributeType': 'S'},
             {'AttributeName': 'sender_id', 'AttributeType': 'S'},
-            {'AttributeName': 'timestamp', 'AttributeType': 'S'}
+            {'AttributeName': 'timestamp', 'AttributeType': 'S'},
+            {'AttributeName': 'thread_id', 'AttributeType': 'S'}
         ],
         GlobalSecondaryIndexes=[
             {
@@ -150,8 +178,15 @@ def create_messages_table(dynamodb):
                     {'AttributeName': 'sender_id', 'KeyType': 'HASH'},
                     {'AttributeName': 'timestamp', 'KeyType': 'RANGE'}
                 ],
-                'Projection': {'ProjectionType': 'ALL'},
-                'BillingMode': 'PAY_PER_REQUEST'
+                'Projection': {'ProjectionType': 'ALL'}
+            },
+            {
+                'IndexName': 'thread-index',
+                'KeySchema': [
+                    {'AttributeName': 'thread_id', 'KeyType': 'HASH'},
+                    {'AttributeName': 'message_id', 'KeyType': 'RANGE'}
+                ],
+                'Projection': {'ProjectionType': 'ALL'}
             }
         ],
         BillingMode='PAY_PER_REQUEST'
@@ -179,8 +214,7 @@ def create_tasks_table(dynamodb):
                     {'AttributeName': 'project_id', 'KeyType': 'HASH'},
                     {'AttributeName': 'created_at', 'KeyType': 'RANGE'}
                 ],
-                'Projection': {'ProjectionType': 'ALL'},
-                'BillingMode': 'PAY_PER_REQUEST'
+                'Projection': {'ProjectionType': 'ALL'}
             }
         ],
         BillingMode='PAY_PER_REQUEST'
@@ -197,7 +231,19 @@ def create_channels_table(dynamodb):
             {'AttributeName': 'channel_id', 'KeyType': 'HASH'}
         ],
         AttributeDefinitions=[
-            {'AttributeName': 'channel_id', 'AttributeType': 'S'}
+            {'AttributeName': 'channel_id', 'AttributeType': 'S'},
+            {'AttributeName': 'project_id', 'AttributeType': 'S'},
+            {'AttributeName': 'channel_type', 'AttributeType': 'S'}
+        ],
+        GlobalSecondaryIndexes=[
+            {
+                'IndexName': 'project-channels-index',
+                'KeySchema': [
+                    {'AttributeName': 'project_id', 'KeyType': 'HASH'},
+                    {'AttributeName': 'channel_type', 'KeyType': 'RANGE'}
+                ],
+                'Projection': {'ProjectionType': 'ALL'}
+            }
         ],
         BillingMode='PAY_PER_REQUEST'
     )
@@ -237,6 +283,24 @@ def create_ws_connections_table(dynamodb):
     return table
 
 
+def create_channel_members_table(dynamodb):
+    """Create channel members table for testing."""
+    table = dynamodb.create_table(
+        TableName=settings.channel_members_table,
+        KeySchema=[
+            {'AttributeName': 'user_id', 'KeyType': 'HASH'},
+            {'AttributeName': 'channel_id', 'KeyType': 'RANGE'}
+        ],
+        AttributeDefinitions=[
+            {'AttributeName': 'user_id', 'AttributeType': 'S'},
+            {'AttributeName': 'channel_id', 'AttributeType': 'S'}
+        ],
+        BillingMode='PAY_PER_REQUEST'
+    )
+    table.wait_until_exists()
+    return table
+
+
 @pytest.fixture
 def sample_project_data():
     """Sample project data for testing."""
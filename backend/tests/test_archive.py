@@ -0,0 +1,202 @@
+import gzip
+import time
+from datetime import datetime, timezone
+
+import boto3
+import orjson
+import pytest
+from moto import mock_s3
+from unittest.mock import patch
+
+from app.config import settings
+from app.services.archive import MessageArchive, archive_old_messages
+from app.services.dynamodb import DynamoDBService
+
+
+BUCKET = settings.get_bucket_name("backup")
+
+
+class TestMessageArchive:
+    """Test suite for moving old messages to S3 and reading them back."""
+
+    @pytest.fixture
+    def s3(self):
+        with mock_s3():
+            client = boto3.client("s3", region_name="us-east-1")
+            client.create_bucket(Bucket=BUCKET)
+            yield client
+
+    @pytest.fixture
+    def archive(self, s3):
+        return MessageArchive(s3=s3)
+
+    @pytest.fixture
+    def db_service(self, mock_dynamodb, archive):
+        """DynamoDB service reading old history from the archive; the recent-message cache is off."""
+        service = DynamoDBService()
+        service.archive = archive
+        service.message_cache = None
+        mock_dynamodb.Table(settings.channels_table).put_item(Item={"channel_id": "channel_1"})
+        return service
+
+    async def _send(self, db_service, count, start=0):
+        return [
+            await db_service.create_message({
+                "channel_id": "channel_1", "sender_id": "user_1", "sender_name": "User", "content": f"message {i}"
+            })
+            for i in range(start, start + count)
+        ]
+
+    async def _archive_all(self, db_service, archive, segment_size=3):
+        time.sleep(0.002)
+        moved = await archive_old_messages(db_service, archive, datetime.now(timezone.utc), segment_size=segment_size)
+        time.sleep(0.002)
+        return moved
+
+    def _contents(self, result):
+        return [m["content"] for m in result["items"]]
+
+    @pytest.mark.asyncio
+    async def test_old_messages_move_to_compressed_segments(self, db_service, archive, s3):
+        """Test archived messages leave the table and land in gzipped NDJSON segments with an index."""
+        sent = await self._send(db_service, 7)
+
+        assert await self._archive_all(db_service, archive) == 7
+
+        assert db_service.messages_table.scan()["Count"] == 0
+        index = orjson.loads(s3.get_object(Bucket=BUCKET, Key="message-archive/channel_1/index.json")["Body"].read())
+        segments = index["segments"]
+        assert [segment["count"] for segment in segments] == [3, 3, 1]
+        assert segments[0]["first_message_id"] == sent[0]["message_id"]
+        assert segments[-1]["last_message_id"] == sent[-1]["message_id"]
+        month = sent[0]["timestamp"].strftime("%Y/%m")
+        assert segments[0]["key"] == f"message-archive/channel_1/{month}/{sent[0]['message_id']}.ndjson.gz"
+
+        body = s3.get_object(Bucket=BUCKET, Key=segments[0]["key"])["Body"].read()
+        lines = gzip.decompress(body).splitlines()
+        assert [orjson.loads(line)["content"] for line in lines] == ["message 0", "message 1", "message 2"]
+
+    @pytest.mark.asyncio
+    async def test_history_pages_continue_into_archive(self, db_service, archive):
+        """Test get_messages serves recent messages from the table and older ones from the archive."""
+        await self._send(db_service, 7)
+        await self._archive_all(db_service, archive)
+        await self._send(db_service, 2, start=7)
+
+        newest = await db_service.get_messages("channel_1", limit=5)
+        assert self._contents(newest) == ["message 4", "message 5", "message 6", "message 7", "message 8"]
+        assert newest["has_more"] is True
+        assert isinstance(newest["items"][0]["timestamp"], datetime)
+
+        older = await db_service.get_messages("channel_1", limit=5, before=newest["items"][0]["message_id"])
+        assert self._contents(older) == ["message 0", "message 1", "message 2", "message 3"]
+        assert older["has_more"] is False
+
+    @pytest.mark.asyncio
+    async def test_catch_up_after_reads_archive_then_table(self, db_service, archive):
+        """Test after-paging starts in the archive and continues into the table."""
+        sent = await self._send(db_service, 4)
+        await self._archive_all(db_service, archive)
+        await self._send(db_service, 3, start=4)
+
+        first = await db_service.get_messages("channel_1", limit=2, after=sent[0]["message_id"])
+        assert self._contents(first) == ["message 1", "message 2"]
+        assert first["has_more"] is True
+
+        second = await db_service.get_messages("channel_1", limit=3, after=first["items"][-1]["message_id"])
+        assert self._contents(second) == ["message 3", "message 4", "message 5"]
+        assert second["has_more"] is True
+
+        last = await db_service.get_messages("channel_1", limit=3, after=second["items"][-1]["message_id"])
+        assert self._contents(last) == ["message 6"]
+        assert last["has_more"] is False
+
+    @pytest.mark.asyncio
+    async def test_archived_message_found_by_id(self, db_service, archive):
+        """Test single-message reads fall back to the archive."""
+        sent = await self._send(db_service, 4)
+        await self._archive_all(db_service, archive)
+
+        message = await db_service.get_message("channel_1", sent[2]["message_id"])
+
+        assert message["content"] == "message 2"
+        assert await db_service.get_message("channel_1", "msg_missing") is None
+
+    @pytest.mark.asyncio
+    async def test_archived_messages_found_by_key(self, db_service, archive):
+        """Test batch reads (search results) resolve archived messages from their segments."""
+        sent = await self._send(db_service, 4)
+        await self._archive_all(db_service, archive)
+        recent = await self._send(db_service, 1, start=4)
+
+        keys = [
+            {"channel_id": "channel_1", "message_id": message_id}
+            for message_id in (recent[0]["message_id"], sent[1]["message_id"], "msg_missing")
+        ]
+        messages = await db_service.batch_get_messages(keys)
+
+        assert [m["content"] for m in messages] == ["message 4", "message 1"]
+
+    @pytest.mark.asyncio
+    async def test_reply_to_archived_message_rejected(self, db_service, archive):
+        """Test replying to an archived message says so instead of reporting it missing."""
+        sent = await self._send(db_service, 2)
+        await self._archive_all(db_service, archive)
+
+        with pytest.raises(ValueError, match="archived"):
+            await db_service.create_message({
+                "channel_id": "channel_1", "sender_id": "user_1", "sender_name": "User",
+                "content": "late reply", "parent_message_id": sent[0]["message_id"]
+            })
+
+    @pytest.mark.asyncio
+    async def test_rerun_after_interrupted_archival_does_not_duplicate(self, db_service, archive):
+        """Test segments written before a failed delete are overwritten, not duplicated, on rerun."""
+        await self._send(db_service, 4)
+        with patch.object(db_service, "delete_messages", side_effect=RuntimeError("throttled")):
+            with pytest.raises(RuntimeError):
+                await self._archive_all(db_service, archive, segment_size=10)
+
+        await self._archive_all(db_service, archive, segment_size=10)
+
+        segments = await archive.get_index("channel_1", fresh=True)
+        assert [segment["count"] for segment in segments] == [4]
+        history = await db_service.get_messages("channel_1", limit=10)
+        assert self._contents(history) == ["message 0", "message 1", "message 2", "message 3"]
+
+    @pytest.mark.asyncio
+    async def test_rerun_after_partial_delete_merges_segments(self, db_service, archive, s3):
+        """Test a rerun resuming after some deletes merges into the earlier segment instead of overlapping it."""
+        await self._send(db_service, 6)
+        delete_messages = db_service.delete_messages
+
+        async def delete_some(channel_id, message_ids):
+            await delete_messages(channel_id, message_ids[:2])
+            raise RuntimeError("throttled")
+
+        with patch.object(db_service, "delete_messages", side_effect=delete_some):
+            with pytest.raises(RuntimeError):
+                await self._archive_all(db_service, archive, segment_size=10)
+
+        await self._archive_all(db_service, archive, segment_size=10)
+
+        segments = await archive.get_index("channel_1", fresh=True)
+        assert [segment["count"] for segment in segments] == [6]
+        objects = s3.list_objects_v2(Bucket=BUCKET, Prefix="message-archive/channel_1/")["Contents"]
+        assert sorted(obj["Key"] for obj in objects) == sorted([segments[0]["key"], "message-archive/channel_1/index.json"])
+        history = await db_service.get_messages("channel_1", limit=10)
+        assert self._contents(history) == [f"message {i}" for i in range(6)]
+
+    @pytest.mark.asyncio
+    async def test_recent_history_reads_no_segments(self, db_service, archive):
+        """Test pages that the table can answer do not touch S3 segments."""
+        await self._send(db_service, 3)
+        await self._archive_all(db_service, archive)
+        await self._send(db_service, 3, start=3)
+
+        with patch.object(archive, "_segment", wraps=archive._segment) as mock_segment:
+            result = await db_service.get_messages("channel_1", limit=3)
+
+        mock_segment.assert_not_called()
+        assert self._contents(result) == ["message 3", "message 4", "message 5"]
+        assert result["has_more"] is True
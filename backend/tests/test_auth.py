@@ -0,0 +1,217 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import httpx
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from jose import jwk, jwt
+
+from app.config import settings
+from app.utils.auth import get_current_user, verify_token
+from app.utils.jwks import JWKSCache
+
+
+USER_POOL_ID = "us-east-1_TestPool"
+CLIENT_ID = "test-client-id"
+
+
+def generate_signing_key(kid: str):
+    """Generate an RSA private key (PEM) and its public JWK."""
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption()
+    ).decode()
+    public_pem = private_key.public_key().public_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode()
+
+    public_jwk = jwk.RSAKey(public_pem, "RS256").to_dict()
+    public_jwk.update({"kid": kid, "use": "sig", "alg": "RS256"})
+    return private_pem, public_jwk
+
+
+class JWKSStandIn:
+    """Locally served stand-in for the Cognito JWKS endpoint."""
+
+    def __init__(self):
+        self.keys = []
+        self.request_count = 0
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stand_in.request_count += 1
+                body = json.dumps({"keys": stand_in.keys}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/.well-known/jwks.json"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestCognitoTokenVerification:
+    """Test suite for RS256 verification against a cached JWKS."""
+
+    @pytest.fixture
+    def signing_key(self):
+        return generate_signing_key("key-1")
+
+    @pytest.fixture
+    def jwks_server(self, signing_key):
+        server = JWKSStandIn()
+        server.keys = [signing_key[1]]
+        yield server
+        server.close()
+
+    @pytest.fixture
+    def jwks_cache(self, jwks_server):
+        cache = JWKSCache(url=jwks_server.url, refresh_interval=3600, min_refresh_interval=0, timeout=2)
+        assert cache.refresh()
+        cache.start()
+        with patch("app.utils.auth.get_jwks_cache", return_value=cache), \
+             patch.object(settings, "user_pool_id", USER_POOL_ID), \
+             patch.object(settings, "user_pool_client_id", CLIENT_ID):
+            yield cache
+        cache.stop()
+
+    def make_token(self, private_pem: str, kid: str, **overrides) -> str:
+        claims = {
+            "sub": "user_123",
+            "email": "user@example.com",
+            "token_use": "id",
+            "aud": CLIENT_ID,
+            "iss": f"https://cognito-idp.{settings.user_pool_region}.amazonaws.com/{USER_POOL_ID}",
+            "exp": int(time.time()) + 300,
+        }
+        claims.update(overrides)
+        return jwt.encode(claims, private_pem, algorithm="RS256", headers={"kid": kid})
+
+    def test_valid_token(self, jwks_cache, signing_key):
+        """Test a correctly signed ID token is accepted."""
+        payload = verify_token(self.make_token(signing_key[0], "key-1"))
+
+        assert payload["sub"] == "user_123"
+        assert payload["email"] == "user@example.com"
+
+    def test_access_token_checks_client_id(self, jwks_cache, signing_key):
+        """Test access tokens are matched on the client_id claim."""
+        token = self.make_token(signing_key[0], "key-1", token_use="access", aud=None, client_id=CLIENT_ID)
+        assert verify_token(token)["sub"] == "user_123"
+
+        token = self.make_token(signing_key[0], "key-1", token_use="access", aud=None, client_id="other")
+        with pytest.raises(HTTPException) as exc_info:
+            verify_token(token)
+        assert exc_info.value.status_code == 401
+
+    @pytest.mark.parametrize("overrides", [
+        {"iss": "https://cognito-idp.us-east-1.amazonaws.com/other-pool"},
+        {"aud": "other-client"},
+        {"token_use": "refresh"},
+        {"exp": int(time.time()) - 10},
+    ])
+    def test_invalid_claims_rejected(self, jwks_cache, signing_key, overrides):
+        """Test tokens with the wrong issuer, audience, use or expiry are rejected."""
+        with pytest.raises(HTTPException) as exc_info:
+            verify_token(self.make_token(signing_key[0], "key-1", **overrides))
+        assert exc_info.value.status_code == 401
+
+    def test_wrong_signature_rejected(self, jwks_cache):
+        """Test a token signed by a key outside the pool is rejected."""
+        forged_pem, _ = generate_signing_key("key-1")
+        with pytest.raises(HTTPException):
+            verify_token(self.make_token(forged_pem, "key-1"))
+
+    def test_unknown_kid_refreshes_in_background(self, jwks_cache, jwks_server):
+        """Test key rotation is picked up without fetching on the request path."""
+        rotated_pem, rotated_jwk = generate_signing_key("key-2")
+        jwks_server.keys.append(rotated_jwk)
+        token = self.make_token(rotated_pem, "key-2")
+
+        fetching_threads = []
+        real_get = httpx.get
+
+        def recording_get(*args, **kwargs):
+            fetching_threads.append(threading.current_thread())
+            return real_get(*args, **kwargs)
+
+        with patch("app.utils.jwks.httpx.get", side_effect=recording_get):
+            # The request itself fails fast instead of waiting on the JWKS endpoint
+            with pytest.raises(HTTPException):
+                verify_token(token)
+
+            assert wait_for(lambda: "key-2" in jwks_cache.key_ids)
+            assert verify_token(token)["sub"] == "user_123"
+
+        assert fetching_threads
+        assert threading.main_thread() not in fetching_threads
+
+    def test_unknown_kid_refresh_is_throttled(self, jwks_server, signing_key):
+        """Test repeated unknown kids trigger at most one early refresh per interval."""
+        cache = JWKSCache(url=jwks_server.url, min_refresh_interval=60, timeout=2)
+        cache.refresh()
+        cache.start()
+        try:
+            for _ in range(20):
+                cache.get_key("forged")
+            time.sleep(0.2)
+            assert jwks_server.request_count == 1
+        finally:
+            cache.stop()
+
+    def test_failed_refresh_keeps_existing_keys(self, jwks_cache, jwks_server):
+        """Test an empty or failing JWKS response does not drop cached keys."""
+        jwks_server.keys = []
+        jwks_cache.refresh()
+        assert jwks_cache.key_ids == ["key-1"]
+
+        jwks_server.close()
+        assert jwks_cache.refresh() is False
+        assert jwks_cache.key_ids == ["key-1"]
+
+
+def test_shared_secret_fallback_without_user_pool():
+    """Test HS256 verification is used when no Cognito pool is configured."""
+    token = jwt.encode({"sub": "user_123"}, settings.secret_key, algorithm=settings.algorithm)
+
+    with patch.object(settings, "user_pool_id", None):
+        assert verify_token(token)["sub"] == "user_123"
+
+
+def test_role_ignores_user_writable_attributes():
+    """Test custom attributes, which users can set on themselves, do not grant a role."""
+    token = jwt.encode({"sub": "user_123", "custom:role": "admin"}, settings.secret_key, algorithm=settings.algorithm)
+
+    with patch.object(settings, "user_pool_id", None):
+        user = get_current_user(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token))
+
+    assert user["role"] == "user"
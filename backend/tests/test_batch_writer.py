@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+from app.services.batch_writer import BatchWriter, UnprocessedItemsError
+
+
+class RecordingBackend:
+    """Records batches; items listed in ``unprocessed`` are left over that many times."""
+
+    def __init__(self, unprocessed=None, error=None):
+        self.batches = []
+        self.unprocessed = dict(unprocessed or {})
+        self.error = error
+
+    async def write_batch(self, items):
+        self.batches.append([item["id"] for item in items])
+        if self.error is not None:
+            raise self.error
+        left = []
+        for item in items:
+            if self.unprocessed.get(item["id"], 0) > 0:
+                self.unprocessed[item["id"]] -= 1
+                left.append(item)
+        return left
+
+
+def create_writer(backend, **kwargs):
+    kwargs.setdefault("max_delay", 0.005)
+    kwargs.setdefault("retry_delay", 0.001)
+    return BatchWriter("test", backend.write_batch, key=lambda item: item["id"], **kwargs)
+
+
+class TestBatchWriter:
+    """Test suite for write-behind batching."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_puts_share_one_batch(self):
+        """Test puts arriving within the delay are written in a single call."""
+        backend = RecordingBackend()
+        writer = create_writer(backend)
+
+        await asyncio.gather(*(writer.put({"id": i}) for i in range(5)))
+
+        assert backend.batches == [[0, 1, 2, 3, 4]]
+
+    @pytest.mark.asyncio
+    async def test_full_batch_is_flushed_without_waiting(self):
+        """Test batches are capped at max_batch and a full batch does not wait for the timer."""
+        backend = RecordingBackend()
+        writer = create_writer(backend, max_batch=3, max_delay=10)
+
+        await asyncio.wait_for(asyncio.gather(*(writer.put({"id": i}) for i in range(6))), 1)
+
+        assert backend.batches == [[0, 1, 2], [3, 4, 5]]
+
+    @pytest.mark.asyncio
+    async def test_unprocessed_items_are_retried(self):
+        """Test only the items left unprocessed are sent again."""
+        backend = RecordingBackend(unprocessed={1: 2})
+        writer = create_writer(backend)
+
+        await asyncio.gather(*(writer.put({"id": i}) for i in range(3)))
+
+        assert backend.batches == [[0, 1, 2], [1], [1]]
+
+    @pytest.mark.asyncio
+    async def test_exhausted_retries_fail_only_the_stuck_items(self):
+        """Test items still unprocessed after the last retry fail while the rest succeed."""
+        backend = RecordingBackend(unprocessed={1: 10})
+        writer = create_writer(backend, max_retries=2)
+
+        results = await asyncio.gather(*(writer.put({"id": i}) for i in range(3)), return_exceptions=True)
+
+        assert results[0] is None and results[2] is None
+        assert isinstance(results[1], UnprocessedItemsError)
+        assert len(backend.batches) == 3
+
+    @pytest.mark.asyncio
+    async def test_batch_error_reaches_every_caller(self):
+        """Test a failed batch call raises in each waiting put."""
+        writer = create_writer(RecordingBackend(error=ValueError("boom")))
+
+        results = await asyncio.gather(*(writer.put({"id": i}) for i in range(2)), return_exceptions=True)
+
+        assert all(isinstance(result, ValueError) for result in results)
+
+    @pytest.mark.asyncio
+    async def test_drain_writes_pending_items(self):
+        """Test draining writes queued items at once and rejects later puts."""
+        backend = RecordingBackend()
+        writer = create_writer(backend, max_delay=10)
+
+        puts = [asyncio.create_task(writer.put({"id": i})) for i in range(2)]
+        await asyncio.sleep(0)
+        await asyncio.wait_for(writer.drain(), 1)
+        await asyncio.gather(*puts)
+
+        assert backend.batches == [[0, 1]]
+        with pytest.raises(RuntimeError):
+            await writer.put({"id": 3})
@@ -0,0 +1,234 @@
+import asyncio
+import threading
+
+import pytest
+from botocore.exceptions import ClientError
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from jose import jwt
+from unittest.mock import AsyncMock, Mock
+
+from app.api.v1 import agents, websocket
+from app.config import settings
+from app.services.bedrock import AgentStreamsBusy, BedrockAgentService, user_session_id
+from app.services.connections import ConnectionManager
+from app.utils.auth import get_current_user
+from app.utils.deadline import DeadlineExceeded, deadline_scope
+
+
+class FakeEventStream:
+    """Bedrock completion stream yielding the given chunks."""
+
+    def __init__(self, chunks, error=None):
+        self.chunks = chunks
+        self.error = error
+        self.closed = False
+
+    def __iter__(self):
+        yield {"trace": {}}
+        for chunk in self.chunks:
+            yield {"chunk": {"bytes": chunk}}
+        if self.error is not None:
+            raise self.error
+
+    def close(self):
+        self.closed = True
+
+
+class StalledEventStream(FakeEventStream):
+    """Bedrock completion stream that yields nothing until released."""
+
+    def __init__(self):
+        super().__init__([b"late"])
+        self.release = threading.Event()
+
+    def __iter__(self):
+        self.release.wait(5)
+        return super().__iter__()
+
+
+def throttled():
+    return ClientError({"Error": {"Code": "ThrottlingException"}}, "InvokeAgent")
+
+
+def bedrock_service(stream, max_streams=4):
+    client = Mock()
+    client.invoke_agent.return_value = {"completion": stream}
+    service = BedrockAgentService(client=client, max_streams=max_streams)
+    service.agent_ids = {"pm": "AGENT123"}
+    return service
+
+
+async def collect(chunks):
+    return [text async for text in chunks]
+
+
+class TestBedrockAgentService:
+    """Test suite for streaming agent answers."""
+
+    @pytest.mark.asyncio
+    async def test_stream_yields_chunks_in_order(self):
+        """Test text chunks are relayed as they arrive and the stream is closed."""
+        stream = FakeEventStream([b"Hello", b", ", b"world"])
+        service = bedrock_service(stream)
+
+        assert await collect(service.stream_agent("AGENT123", "session_1", "hi")) == ["Hello", ", ", "world"]
+        assert stream.closed
+        service.client.invoke_agent.assert_called_once_with(
+            agentId="AGENT123", agentAliasId=settings.bedrock_agent_alias_id, sessionId="session_1", inputText="hi"
+        )
+
+    @pytest.mark.asyncio
+    async def test_multibyte_character_split_across_chunks(self):
+        """Test a UTF-8 character split between chunks is decoded intact."""
+        encoded = "計画を作成".encode("utf-8")
+        service = bedrock_service(FakeEventStream([encoded[:4], encoded[4:]]))
+
+        chunks = await collect(service.stream_agent("AGENT123", "session_1", "hi"))
+
+        assert "".join(chunks) == "計画を作成"
+
+    @pytest.mark.asyncio
+    async def test_stream_error_counts_against_breaker(self):
+        """Test a throttled stream raises to the caller and is recorded as a failure."""
+        service = bedrock_service(FakeEventStream([b"partial"], error=throttled()))
+        service.breaker.failure_threshold = 1
+
+        with pytest.raises(ClientError):
+            await collect(service.stream_agent("AGENT123", "session_1", "hi"))
+
+        assert service.breaker.state == "open"
+
+    @pytest.mark.asyncio
+    async def test_closing_early_stops_reading(self):
+        """Test a consumer that goes away stops the reader and closes the Bedrock stream."""
+        stream = FakeEventStream([b"a", b"b", b"c"])
+        service = bedrock_service(stream)
+
+        chunks = service.stream_agent("AGENT123", "session_1", "hi")
+        assert await chunks.__anext__() == "a"
+        await chunks.aclose()
+        await asyncio.sleep(0.05)
+
+        assert stream.closed
+        assert service.breaker.state == "closed"
+
+    @pytest.mark.asyncio
+    async def test_streams_beyond_the_pool_are_rejected(self):
+        """Test streams get their own bounded reader pool and are refused once it is full."""
+        stream = StalledEventStream()
+        service = bedrock_service(stream, max_streams=1)
+
+        first = service.stream_agent("AGENT123", "session_1", "hi")
+        pending = asyncio.ensure_future(first.__anext__())
+        await asyncio.sleep(0.05)
+        with pytest.raises(AgentStreamsBusy):
+            await service.stream_agent("AGENT123", "session_2", "hi").__anext__()
+
+        stream.release.set()
+        assert await pending == "late"
+        await first.aclose()
+        await asyncio.sleep(0.05)
+        assert service._stream_slots.acquire(blocking=False)
+
+    @pytest.mark.asyncio
+    async def test_first_chunk_bounded_by_deadline(self):
+        """Test a stream that does not start before the request deadline raises DeadlineExceeded."""
+        stream = StalledEventStream()
+        service = bedrock_service(stream)
+
+        with deadline_scope(0.05):
+            chunks = service.stream_agent("AGENT123", "session_1", "hi")
+            with pytest.raises(DeadlineExceeded):
+                await chunks.__anext__()
+
+        stream.release.set()
+
+
+class TestAgentStreamingEndpoints:
+    """Test suite for the SSE and WebSocket agent streams."""
+
+    def create_client(self, service):
+        db_service = Mock()
+        db_service.put_connection = AsyncMock()
+        db_service.delete_connection = AsyncMock()
+        manager = ConnectionManager(db_service)
+
+        stream_app = FastAPI()
+        stream_app.include_router(agents.router, prefix="/agents")
+        stream_app.include_router(websocket.router)
+        stream_app.dependency_overrides[get_current_user] = lambda: {"user_id": "user_1"}
+        stream_app.dependency_overrides[agents.get_bedrock_service] = lambda: service
+        stream_app.dependency_overrides[websocket.get_bedrock_service] = lambda: service
+        stream_app.dependency_overrides[websocket.get_connection_manager] = lambda: manager
+        stream_app.dependency_overrides[websocket.get_dynamodb_service] = lambda: db_service
+        return TestClient(stream_app)
+
+    def test_sse_relays_chunks(self):
+        """Test the answer streams as chunk events followed by done."""
+        client = self.create_client(bedrock_service(FakeEventStream([b"Hel", b"lo"])))
+
+        with client.stream("POST", "/agents/pm/stream", json={"message": "hi", "session_id": "s1"}) as response:
+            assert response.status_code == 200
+            assert response.headers["content-type"].startswith("text/event-stream")
+            body = "".join(response.iter_text())
+
+        assert body == (
+            'event: chunk\ndata: {"text":"Hel"}\n\n'
+            'event: chunk\ndata: {"text":"lo"}\n\n'
+            'event: done\ndata: {"session_id":"s1"}\n\n'
+        )
+
+    def test_sessions_are_private_to_the_user(self):
+        """Test a client's session ID maps to a Bedrock session of its own user only."""
+        service = bedrock_service(FakeEventStream([b"hi"]))
+        client = self.create_client(service)
+
+        with client.stream("POST", "/agents/pm/stream", json={"message": "hi", "session_id": "s1"}) as response:
+            response.read()
+
+        session = service.client.invoke_agent.call_args.kwargs["sessionId"]
+        assert session == user_session_id("user_1", "s1")
+        assert session != user_session_id("user_2", "s1")
+
+    def test_sse_unknown_agent(self):
+        """Test agent types without a configured Bedrock agent return 404."""
+        client = self.create_client(bedrock_service(FakeEventStream([])))
+
+        response = client.post("/agents/unknown/stream", json={"message": "hi"})
+
+        assert response.status_code == 404
+
+    def test_sse_failure_before_output_returns_error_status(self):
+        """Test a failure before the first chunk is reported as 502 instead of an empty stream."""
+        client = self.create_client(bedrock_service(FakeEventStream([], error=throttled())))
+
+        response = client.post("/agents/pm/stream", json={"message": "hi"})
+
+        assert response.status_code == 502
+
+    def test_sse_busy_returns_503(self):
+        """Test a stream refused for lack of reader threads is a 503 with Retry-After."""
+        service = bedrock_service(FakeEventStream([b"hi"]), max_streams=1)
+        service._stream_slots.acquire()
+        client = self.create_client(service)
+
+        response = client.post("/agents/pm/stream", json={"message": "hi"})
+
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
+
+    def test_websocket_relays_chunks(self):
+        """Test invoke_agent streams chunk frames tagged with the request ID."""
+        client = self.create_client(bedrock_service(FakeEventStream([b"Hel", b"lo"])))
+        token = jwt.encode({"sub": "user_1"}, settings.secret_key, algorithm=settings.algorithm)
+
+        with client.websocket_connect(f"/ws?token={token}") as ws:
+            ws.send_json({"action": "invoke_agent", "agent_type": "pm", "message": "hi", "request_id": "r1", "session_id": "s1"})
+            frames = []
+            while not frames or frames[-1].get("type") != "agent_done":
+                frame = ws.receive_json()
+                frames.extend(frame["events"] if frame["type"] == "batch" else [frame])
+
+        assert "".join(f["text"] for f in frames if f["type"] == "agent_chunk") == "Hello"
+        assert frames[-1] == {"type": "agent_done", "request_id": "r1", "session_id": "s1"}
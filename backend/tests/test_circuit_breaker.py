@@ -0,0 +1,145 @@
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+from botocore.exceptions import ClientError, EndpointConnectionError
+from prometheus_client import REGISTRY
+
+from app.services.dynamodb import DynamoDBService
+from app.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+def client_error(code: str, status_code: int = 400) -> ClientError:
+    return ClientError(
+        {"Error": {"Code": code, "Message": code}, "ResponseMetadata": {"HTTPStatusCode": status_code}},
+        "GetItem"
+    )
+
+
+THROTTLED = client_error("ProvisionedThroughputExceededException")
+
+
+def fail(error: Exception):
+    raise error
+
+
+class TestCircuitBreaker:
+    """Test suite for the dependency circuit breaker."""
+
+    def test_opens_after_consecutive_failures(self):
+        """Test the circuit opens at the threshold and then fails fast."""
+        breaker = CircuitBreaker("test-open", failure_threshold=2, recovery_timeout=30)
+        call = Mock(side_effect=THROTTLED)
+
+        for _ in range(2):
+            with pytest.raises(ClientError):
+                breaker.call(call)
+        with pytest.raises(CircuitOpenError) as exc_info:
+            breaker.call(call)
+
+        assert breaker.state == "open"
+        assert call.call_count == 2
+        assert exc_info.value.status_code == 503
+        assert exc_info.value.headers["Retry-After"] == "30"
+
+    def test_request_errors_do_not_count(self):
+        """Test client errors like failed conditions leave the circuit closed."""
+        breaker = CircuitBreaker("test-client-errors", failure_threshold=1)
+
+        with pytest.raises(ClientError):
+            breaker.call(fail, client_error("ConditionalCheckFailedException"))
+
+        assert breaker.state == "closed"
+
+    def test_connection_errors_count(self):
+        """Test connection failures count against the dependency."""
+        breaker = CircuitBreaker("test-connection", failure_threshold=1)
+
+        with pytest.raises(EndpointConnectionError):
+            breaker.call(fail, EndpointConnectionError(endpoint_url="https://dynamodb"))
+
+        assert breaker.state == "open"
+
+    def test_half_open_success_closes(self):
+        """Test a successful trial call after the timeout closes the circuit."""
+        breaker = CircuitBreaker("test-recover", failure_threshold=1, recovery_timeout=0.01)
+        with pytest.raises(ClientError):
+            breaker.call(fail, THROTTLED)
+
+        time.sleep(0.02)
+
+        assert breaker.state == "half_open"
+        assert breaker.call(lambda: "ok") == "ok"
+        assert breaker.state == "closed"
+
+    def test_half_open_failure_reopens(self):
+        """Test a failed trial call opens the circuit again."""
+        breaker = CircuitBreaker("test-reopen", failure_threshold=3, recovery_timeout=0.01)
+        for _ in range(3):
+            with pytest.raises(ClientError):
+                breaker.call(fail, THROTTLED)
+        time.sleep(0.02)
+
+        with pytest.raises(ClientError):
+            breaker.call(fail, THROTTLED)
+
+        assert breaker.state == "open"
+
+    def test_half_open_limits_trial_calls(self):
+        """Test only one trial call is let through while half-open."""
+        breaker = CircuitBreaker("test-trial", failure_threshold=1, recovery_timeout=0.01)
+        with pytest.raises(ClientError):
+            breaker.call(fail, THROTTLED)
+        time.sleep(0.02)
+
+        breaker.before_call()
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+    def test_state_exported_as_metric(self):
+        """Test the circuit state is exported per dependency."""
+        breaker = CircuitBreaker("test-metric", failure_threshold=1)
+        with pytest.raises(ClientError):
+            breaker.call(fail, THROTTLED)
+
+        assert REGISTRY.get_sample_value("circuit_breaker_state", {"dependency": "test-metric"}) == 2
+
+
+class TestDynamoDBCircuitBreaker:
+    """Test suite for the circuit breaker around DynamoDB operations."""
+
+    @pytest.fixture
+    def db_service(self):
+        service = DynamoDBService()
+        service.breaker.failure_threshold = 1
+        return service
+
+    @pytest.mark.asyncio
+    async def test_serves_stale_project_while_open(self, db_service):
+        """Test get_project falls back to the last item read while the circuit is open."""
+        item = {"project_id": "p1", "name": "Cached", "created_at": "2024-01-01T12:00:00"}
+        with patch.object(db_service.projects_table, 'get_item') as mock_get:
+            mock_get.return_value = {"Item": item}
+            await db_service.get_project("p1")
+
+            mock_get.side_effect = THROTTLED
+            with pytest.raises(ClientError):
+                await db_service.get_project("p1")
+
+            result = await db_service.get_project("p1")
+
+        assert result["name"] == "Cached"
+        assert mock_get.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_fails_fast_without_stale_copy(self, db_service):
+        """Test operations raise CircuitOpenError without calling DynamoDB while open."""
+        with patch.object(db_service.projects_table, 'get_item') as mock_get:
+            mock_get.side_effect = THROTTLED
+            with pytest.raises(ClientError):
+                await db_service.get_project("p1")
+
+            with pytest.raises(CircuitOpenError):
+                await db_service.get_project("p2")
+
+        assert mock_get.call_count == 1
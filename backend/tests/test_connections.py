@@ -0,0 +1,202 @@
+import asyncio
+import time
+
+import orjson
+import pytest
+from fastapi import FastAPI, status
+from fastapi.testclient import TestClient
+from jose import jwt
+from starlette.websockets import WebSocketDisconnect, WebSocketState
+from unittest.mock import AsyncMock, Mock
+
+from app.api.v1 import messages, websocket
+from app.config import settings
+from app.services.connections import ConnectionManager
+from app.services.pubsub import InProcessPubSub
+from app.utils.auth import get_current_user
+
+
+class FakeWebSocket:
+    """Records frames; sends block while ``blocked`` is set."""
+
+    def __init__(self, blocked: bool = False):
+        self.frames = []
+        self.close_code = None
+        self.application_state = WebSocketState.CONNECTING
+        self.unblocked = asyncio.Event()
+        if not blocked:
+            self.unblocked.set()
+
+    async def accept(self):
+        self.application_state = WebSocketState.CONNECTED
+
+    async def send_text(self, data: str):
+        await self.unblocked.wait()
+        self.frames.append(orjson.loads(data))
+
+    async def close(self, code: int = 1000):
+        self.close_code = code
+        self.application_state = WebSocketState.DISCONNECTED
+
+
+def mock_db_service():
+    db_service = Mock()
+    db_service.put_connection = AsyncMock()
+    db_service.delete_connection = AsyncMock()
+    return db_service
+
+
+class TestConnectionManager:
+    """Test suite for WebSocket fan-out."""
+
+    @pytest.mark.asyncio
+    async def test_connect_registers_and_disconnect_removes(self):
+        """Test connections are recorded with a TTL and deleted on disconnect."""
+        db_service = mock_db_service()
+        manager = ConnectionManager(db_service, connection_ttl=60)
+
+        connection = await manager.connect(FakeWebSocket(), "user_1")
+        item = db_service.put_connection.call_args.args[0]
+        assert item["connection_id"] == connection.connection_id
+        assert item["user_id"] == "user_1"
+        assert time.time() < item["ttl"] <= time.time() + 60
+
+        await manager.disconnect(connection)
+        await manager.disconnect(connection)
+        db_service.delete_connection.assert_awaited_once_with(connection.connection_id)
+        assert manager.connection_count == 0
+
+    @pytest.mark.asyncio
+    async def test_publish_reaches_channel_subscribers_only(self):
+        """Test a published frame goes to every subscriber of the channel and nobody else."""
+        manager = ConnectionManager(mock_db_service())
+        sockets = [FakeWebSocket() for _ in range(3)]
+        connections = [await manager.connect(ws, f"user_{i}") for i, ws in enumerate(sockets)]
+        manager.subscribe(connections[0], "channel_1")
+        manager.subscribe(connections[1], "channel_1")
+        manager.subscribe(connections[2], "channel_2")
+
+        assert manager.publish("channel_1", {"type": "message", "data": {"content": "hi"}}) == 2
+        await asyncio.sleep(0.01)
+
+        assert sockets[0].frames == sockets[1].frames == [{"type": "message", "data": {"content": "hi"}}]
+        assert sockets[2].frames == []
+        await manager.close_all()
+
+    @pytest.mark.asyncio
+    async def test_slow_consumer_is_disconnected(self):
+        """Test a client that stops reading is closed without holding back the others."""
+        manager = ConnectionManager(mock_db_service(), queue_size=2)
+        slow_socket, fast_socket = FakeWebSocket(blocked=True), FakeWebSocket()
+        slow = await manager.connect(slow_socket, "slow")
+        fast = await manager.connect(fast_socket, "fast")
+        manager.subscribe(slow, "channel_1")
+        manager.subscribe(fast, "channel_1")
+
+        for i in range(5):
+            manager.publish("channel_1", {"n": i})
+            await asyncio.sleep(0.01)
+
+        assert slow_socket.close_code == status.WS_1013_TRY_AGAIN_LATER
+        assert manager.subscribers("channel_1") == 1
+        assert [frame["n"] for frame in fast_socket.frames] == [0, 1, 2, 3, 4]
+        await manager.close_all()
+
+    @pytest.mark.asyncio
+    async def test_backlog_is_sent_as_one_batch(self):
+        """Test frames queued during a slow send go out together in order."""
+        manager = ConnectionManager(mock_db_service(), max_batch=10)
+        socket = FakeWebSocket(blocked=True)
+        connection = await manager.connect(socket, "user_1")
+        manager.subscribe(connection, "channel_1")
+
+        for i in range(4):
+            manager.publish("channel_1", {"n": i})
+            await asyncio.sleep(0)
+        socket.unblocked.set()
+        await asyncio.sleep(0.01)
+
+        assert socket.frames == [{"n": 0}, {"type": "batch", "events": [{"n": 1}, {"n": 2}, {"n": 3}]}]
+        await manager.close_all()
+
+    @pytest.mark.asyncio
+    async def test_subscription_limit(self):
+        """Test a connection cannot follow more than the configured channels."""
+        manager = ConnectionManager(mock_db_service(), max_channels=1)
+        connection = await manager.connect(FakeWebSocket(), "user_1")
+
+        assert manager.subscribe(connection, "channel_1") is True
+        assert manager.subscribe(connection, "channel_2") is False
+        await manager.close_all()
+
+
+class TestWebSocketEndpoint:
+    """Test suite for the WebSocket endpoint."""
+
+    @pytest.fixture
+    def db_service(self):
+        db_service = mock_db_service()
+        db_service.create_message = AsyncMock(side_effect=lambda data: {
+            **data, "message_id": "msg_1", "timestamp": "2024-01-01T00:00:00"
+        })
+        db_service.get_channel = AsyncMock(side_effect=lambda channel_id: {"channel_id": channel_id, "project_id": "proj_1"})
+        db_service.get_project = AsyncMock(return_value={"project_id": "proj_1", "user_id": "user_1", "team_members": ["user_2"]})
+        return db_service
+
+    @pytest.fixture
+    def ws_client(self, db_service):
+        """Create a client for the message and WebSocket routes."""
+        manager = ConnectionManager(db_service)
+        pubsub = InProcessPubSub()
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(pubsub.start(manager.publish))
+        loop.close()
+
+        ws_app = FastAPI()
+        ws_app.include_router(websocket.router)
+        ws_app.include_router(messages.router, prefix="/messages")
+        ws_app.dependency_overrides[get_current_user] = lambda: {"user_id": "user_1"}
+        ws_app.dependency_overrides[messages.get_dynamodb_service] = lambda: db_service
+        ws_app.dependency_overrides[websocket.get_connection_manager] = lambda: manager
+        ws_app.dependency_overrides[websocket.get_bedrock_service] = lambda: Mock()
+        ws_app.dependency_overrides[messages.get_pubsub] = lambda: pubsub
+        return TestClient(ws_app)
+
+    def test_sent_message_is_pushed_to_subscribers(self, ws_client):
+        """Test POST /messages pushes the stored message over the WebSocket."""
+        token = jwt.encode({"sub": "user_2"}, settings.secret_key, algorithm=settings.algorithm)
+        with ws_client.websocket_connect(f"/ws?token={token}") as ws:
+            ws.send_json({"action": "subscribe", "channel_id": "channel_1"})
+            assert ws.receive_json() == {"type": "subscribed", "channel_id": "channel_1"}
+
+            response = ws_client.post("/messages/", json={"channel_id": "channel_1", "content": "hello"})
+            assert response.status_code == 201
+
+            frame = ws.receive_json()
+            assert frame["type"] == "message"
+            assert frame["data"]["message_id"] == "msg_1"
+            assert frame["data"]["content"] == "hello"
+
+    def test_subscribe_needs_project_access(self, ws_client, db_service):
+        """Test a user outside the channel's project gets an error frame and no messages."""
+        token = jwt.encode({"sub": "user_3"}, settings.secret_key, algorithm=settings.algorithm)
+        with ws_client.websocket_connect(f"/ws?token={token}") as ws:
+            ws.send_json({"action": "subscribe", "channel_id": "channel_1"})
+            assert ws.receive_json() == {"type": "error", "channel_id": "channel_1", "detail": "Access denied"}
+
+            db_service.get_channel.side_effect = None
+            db_service.get_channel.return_value = None
+            ws.send_json({"action": "subscribe", "channel_id": "channel_9"})
+            assert ws.receive_json() == {"type": "error", "channel_id": "channel_9", "detail": "Channel not found"}
+
+            response = ws_client.post("/messages/", json={"channel_id": "channel_1", "content": "hello"})
+            assert response.status_code == 201
+            ws.send_json({"action": "ping"})
+            assert ws.receive_json() == {"type": "pong"}
+
+    def test_invalid_token_is_rejected(self, ws_client):
+        """Test connections without a valid token are closed with a policy violation."""
+        with pytest.raises(WebSocketDisconnect) as exc_info:
+            with ws_client.websocket_connect("/ws?token=invalid") as ws:
+                ws.receive_json()
+        assert exc_info.value.code == status.WS_1008_POLICY_VIOLATION
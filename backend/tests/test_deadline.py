@@ -0,0 +1,185 @@
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.services.dynamodb import DynamoDBService
+from app.utils.deadline import (
+    DeadlineExceeded, call_timeout, deadline_scope, remaining, route_timeout
+)
+from app.utils.middleware import DeadlineMiddleware
+
+
+class TestDeadlineHelpers:
+    """Test suite for request deadline bookkeeping."""
+
+    def test_no_deadline_outside_requests(self):
+        """Test calls outside a request keep their default timeout."""
+        assert remaining() is None
+        assert call_timeout(5) == 5
+
+    def test_call_timeout_capped_by_deadline(self):
+        """Test per-call timeouts shrink to the time left."""
+        with deadline_scope(0.5):
+            assert call_timeout(5) <= 0.5
+            assert call_timeout(0.1) == 0.1
+
+    def test_expired_deadline_raises(self):
+        """Test no new call is started once the deadline has passed."""
+        with deadline_scope(0):
+            with pytest.raises(DeadlineExceeded):
+                call_timeout(5)
+
+    def test_inner_scope_cannot_extend_deadline(self):
+        """Test nested deadlines only ever get shorter."""
+        with deadline_scope(0.5):
+            with deadline_scope(60):
+                assert remaining() <= 0.5
+
+    def test_route_timeout_longest_prefix(self):
+        """Test the most specific route prefix wins."""
+        timeouts = {"/api/v1": 10, "/api/v1/agents": 60}
+
+        assert route_timeout("/api/v1/agents/chat", 15, timeouts) == 60
+        assert route_timeout("/api/v1/projects", 15, timeouts) == 10
+        assert route_timeout("/health", 15, timeouts) == 15
+
+
+class TestDeadlineMiddleware:
+    """Test suite for ingress deadlines."""
+
+    @pytest.fixture
+    def client(self):
+        test_app = FastAPI()
+        test_app.add_middleware(
+            DeadlineMiddleware,
+            default_timeout=0.1,
+            route_timeouts={"/unbounded": 0}
+        )
+
+        @test_app.get("/fast")
+        async def fast():
+            return {"remaining": remaining()}
+
+        @test_app.get("/slow")
+        async def slow():
+            await asyncio.sleep(1)
+            return {"ok": True}
+
+        @test_app.get("/unbounded")
+        async def unbounded():
+            await asyncio.sleep(0.2)
+            return {"remaining": remaining()}
+
+        @test_app.get("/stream")
+        async def stream():
+            async def chunks():
+                for i in range(3):
+                    await asyncio.sleep(0.06)
+                    yield b"chunk\n"
+            return StreamingResponse(chunks())
+
+        return TestClient(test_app)
+
+    def test_deadline_visible_to_handlers(self, client):
+        """Test handlers see the remaining time."""
+        response = client.get("/fast")
+
+        assert 0 < response.json()["remaining"] <= 0.1
+
+    def test_slow_request_gets_504(self, client):
+        """Test a request still running at its deadline is answered with 504."""
+        start = time.perf_counter()
+        response = client.get("/slow")
+
+        assert response.status_code == 504
+        assert time.perf_counter() - start < 0.5
+
+    def test_route_can_disable_deadline(self, client):
+        """Test a route timeout of 0 runs without a deadline."""
+        response = client.get("/unbounded")
+
+        assert response.status_code == 200
+        assert response.json()["remaining"] is None
+
+    def test_started_stream_not_cut(self, client):
+        """Test a response already streaming is allowed to finish."""
+        response = client.get("/stream")
+
+        assert response.status_code == 200
+        assert response.text == "chunk\n" * 3
+
+
+class TestDynamoDBDeadlines:
+    """Test suite for deadline-bounded DynamoDB calls."""
+
+    @pytest.fixture
+    def db_service(self):
+        return DynamoDBService()
+
+    @pytest.mark.asyncio
+    async def test_slow_call_times_out(self, db_service):
+        """Test a DynamoDB call exceeding the deadline raises DeadlineExceeded."""
+        def hang(**kwargs):
+            time.sleep(0.3)
+            return {}
+
+        with patch.object(db_service.projects_table, 'get_item', side_effect=hang), \
+                patch.object(settings, 'dynamodb_retry_budget_seconds', 0):
+            with deadline_scope(0.05):
+                start = time.perf_counter()
+                with pytest.raises(DeadlineExceeded):
+                    await db_service.get_project("p1")
+
+        assert time.perf_counter() - start < 0.25
+
+    @pytest.mark.asyncio
+    async def test_timed_out_call_recorded_once(self, db_service):
+        """Test a timed-out call counts one breaker failure, and its late success does not close the circuit."""
+        db_service.breaker.failure_threshold = 1
+
+        def slow(**kwargs):
+            time.sleep(0.1)
+            return {}
+
+        with patch.object(db_service.projects_table, 'get_item', side_effect=slow), \
+                patch.object(db_service.breaker, 'record_success') as mock_success, \
+                patch.object(settings, 'dynamodb_call_timeout_seconds', 0.02):
+            with pytest.raises(DeadlineExceeded):
+                await db_service._call(db_service.projects_table, 'get_item', Key={'project_id': 'p1'})
+            await asyncio.sleep(0.2)
+
+        mock_success.assert_not_called()
+        assert db_service.breaker.state == "open"
+
+    @pytest.mark.asyncio
+    async def test_expired_deadline_skips_call(self, db_service):
+        """Test no DynamoDB call is made after the deadline."""
+        with patch.object(db_service.projects_table, 'get_item') as mock_get:
+            with deadline_scope(0):
+                with pytest.raises(DeadlineExceeded):
+                    await db_service.get_project("p1")
+
+        mock_get.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_no_retries_near_deadline(self, db_service):
+        """Test calls close to the deadline go through the single-attempt client."""
+        last_attempt_table = db_service.last_attempt_dynamodb.Table(db_service.projects_table.name)
+        db_service._last_attempt_tables[db_service.projects_table.name] = last_attempt_table
+
+        with patch.object(db_service.projects_table, 'get_item') as mock_get, \
+                patch.object(last_attempt_table, 'get_item') as mock_last_attempt:
+            mock_get.return_value = mock_last_attempt.return_value = {}
+            await db_service.get_project("p1")
+            with deadline_scope(0.5):
+                await db_service.get_project("p1")
+
+        assert mock_get.call_count == 1
+        assert mock_last_attempt.call_count == 1
+        assert db_service.last_attempt_dynamodb.meta.client.meta.config.retries["total_max_attempts"] == 1
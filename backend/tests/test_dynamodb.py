@@ -1,9 +1,15 @@
+import asyncio
 import pytest
 from datetime import datetime
 from unittest.mock import patch, Mock
 from botocore.exceptions import ClientError
 
-from app.services.dynamodb import DynamoDBService
+from app.config import settings
+from app.services.dynamodb import DynamoDBService, get_dynamodb_service
+from app.services.search import backfill_search_index
+from app.utils.capacity import get_request_capacity, start_request_capacity, stop_request_capacity
+from app.utils.search_index import SearchIndex
+from app.utils.timing import get_request_timings, start_request_timings, stop_request_timings
 
 
 class TestDynamoDBService:
@@ -109,7 +115,10 @@ class TestDynamoDBService:
             assert result["project_id"] == project_id
             assert result["name"] == "Test Project"
             assert isinstance(result["created_at"], datetime)
-            mock_get.assert_called_once_with(Key={'project_id': project_id})
+            mock_get.assert_called_once_with(
+                Key={'project_id': project_id},
+                ReturnConsumedCapacity='TOTAL'
+            )
 
     @pytest.mark.asyncio
     async def test_get_project_not_found(self, db_service):
@@ -161,7 +170,8 @@ class TestDynamoDBService:
             assert result is True
             mock_delete.assert_called_once_with(
                 Key={'project_id': project_id},
-                ConditionExpression=mock_delete.call_args[1]['ConditionExpression']
+                ConditionExpression=mock_delete.call_args[1]['ConditionExpression'],
+                ReturnConsumedCapacity='TOTAL'
             )
 
     @pytest.mark.asyncio
@@ -278,4 +288,434 @@ class TestDynamoDBService:
         """Test health check failure."""
         with patch.object(db_service.projects_table, 'table_status', side_effect=Exception("Connection failed")):
             with pytest.raises(Exception):
-                await db_service.health_check()
\ No newline at end of file
+                await db_service.health_check()
+    @pytest.mark.asyncio
+    async def test_operations_record_request_timings(self, db_service):
+        """Test DynamoDB calls and deserialization are timed per request."""
+        token = start_request_timings()
+        try:
+            with patch.object(db_service.projects_table, 'get_item') as mock_get:
+                mock_get.return_value = {"Item": {"project_id": "p1", "created_at": "2024-01-01T12:00:00"}}
+                await db_service.get_project("p1")
+
+            assert set(get_request_timings()) == {"db", "deserialize"}
+        finally:
+            stop_request_timings(token)
+
+    @pytest.mark.asyncio
+    async def test_operations_record_consumed_capacity(self, db_service):
+        """Test consumed read and write units are accumulated per request and table."""
+        token = start_request_capacity()
+        try:
+            with patch.object(db_service.projects_table, 'get_item') as mock_get, \
+                    patch.object(db_service.projects_table, 'delete_item') as mock_delete:
+                mock_get.return_value = {
+                    "Item": {"project_id": "p1"},
+                    "ConsumedCapacity": {"TableName": "projects", "CapacityUnits": 0.5}
+                }
+                mock_delete.return_value = {
+                    "ConsumedCapacity": {"TableName": "projects", "CapacityUnits": 1.0}
+                }
+                await db_service.get_project("p1")
+                await db_service.get_project("p1")
+                await db_service.delete_project("p1")
+
+            assert get_request_capacity() == {"projects": {"rcu": 1.0, "wcu": 1.0}}
+        finally:
+            stop_request_capacity(token)
+
+    def test_warm_up_opens_concurrent_connections(self, db_service):
+        """Test warm-up issues one lookup per connection to fill the pool."""
+        with patch.object(db_service.projects_table, 'get_item') as mock_get:
+            mock_get.return_value = {}
+            db_service.warm_up(connections=3)
+
+            assert mock_get.call_count == 3
+            mock_get.assert_called_with(Key={'project_id': '__warmup__'})
+
+    def test_service_is_shared(self):
+        """Test requests share one service and its connection pool."""
+        assert get_dynamodb_service() is get_dynamodb_service()
+
+
+class TestMessageStore:
+    """Test suite for channel messages stored in DynamoDB."""
+
+    @pytest.fixture
+    def db_service(self, mock_dynamodb):
+        """Create a DynamoDB service backed by mocked tables."""
+        return DynamoDBService()
+
+    async def _send(self, db_service, count, channel_id="channel_1"):
+        return [
+            await db_service.create_message({
+                "channel_id": channel_id,
+                "sender_id": "user_1",
+                "sender_name": "User",
+                "content": f"message {i}"
+            })
+            for i in range(count)
+        ]
+
+    @pytest.mark.asyncio
+    async def test_create_message_assigns_sortable_id(self, db_service):
+        """Test created messages get increasing IDs and a matching timestamp."""
+        sent = await self._send(db_service, 3)
+
+        ids = [message["message_id"] for message in sent]
+        assert ids == sorted(ids)
+        assert len(set(ids)) == 3
+        assert all(message_id.startswith("msg_") for message_id in ids)
+        assert isinstance(sent[0]["timestamp"], datetime)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_messages_are_batched(self, db_service):
+        """Test a burst of messages is stored through shared BatchWriteItem calls."""
+        writer = db_service.message_writer
+        with patch.object(writer, 'write_batch', wraps=writer.write_batch) as mock_batch:
+            sent = await asyncio.gather(*(
+                db_service.create_message({
+                    "channel_id": "channel_1", "sender_id": f"agent_{i}", "sender_name": "Agent", "content": str(i)
+                })
+                for i in range(10)
+            ))
+
+        assert mock_batch.call_count == 1
+        stored = await db_service.get_messages("channel_1")
+        assert {m["message_id"] for m in stored["items"]} == {m["message_id"] for m in sent}
+
+    @pytest.mark.asyncio
+    async def test_get_messages_returns_channel_oldest_first(self, db_service):
+        """Test a channel's messages come back in chronological order."""
+        sent = await self._send(db_service, 3)
+        await self._send(db_service, 2, channel_id="channel_2")
+
+        result = await db_service.get_messages("channel_1")
+
+        assert [m["message_id"] for m in result["items"]] == [m["message_id"] for m in sent]
+        assert result["items"][0]["timestamp"] == sent[0]["timestamp"]
+        assert result["has_more"] is False
+
+    @pytest.mark.asyncio
+    async def test_get_messages_pages_backwards(self, db_service):
+        """Test before returns only messages older than the given ID."""
+        sent = await self._send(db_service, 5)
+
+        older = await db_service.get_messages("channel_1", before=sent[2]["message_id"])
+
+        assert [m["content"] for m in older["items"]] == ["message 0", "message 1"]
+
+    @pytest.mark.asyncio
+    async def test_message_published_during_cache_fill_is_cached(self, db_service):
+        """Test a message arriving while a channel's first page is queried is not lost from the ring."""
+        sent = await self._send(db_service, 2)
+        db_service.message_cache.invalidate("channel_1")
+        queried, release = asyncio.Event(), asyncio.Event()
+        original_call = db_service._call
+
+        async def slow_call(table, operation, **kwargs):
+            response = await original_call(table, operation, **kwargs)
+            if operation == 'query':
+                queried.set()
+                await release.wait()
+            return response
+
+        with patch.object(db_service, '_call', side_effect=slow_call):
+            page = asyncio.ensure_future(db_service.get_messages("channel_1"))
+            await queried.wait()
+            late = {**sent[-1], "message_id": sent[-1]["message_id"] + "Z", "content": "late"}
+            db_service.cache_message("channel_1", late)
+            release.set()
+            await page
+
+        caught_up = db_service.message_cache.since("channel_1", sent[-1]["message_id"], 10)
+        assert [m["content"] for m in caught_up["items"]] == ["late"]
+
+    @pytest.mark.asyncio
+    async def test_get_messages_reads_newest_page_only(self, db_service):
+        """Test one descending query bounded by the limit is issued per page."""
+        db_service.message_cache = None
+        with patch.object(db_service.messages_table, 'query') as mock_query:
+            mock_query.return_value = {
+                "Items": [{"message_id": "msg_2"}, {"message_id": "msg_1"}],
+                "LastEvaluatedKey": {"channel_id": "channel_1", "message_id": "msg_1"}
+            }
+            result = await db_service.get_messages("channel_1", limit=2)
+
+        kwargs = mock_query.call_args.kwargs
+        assert kwargs["ScanIndexForward"] is False
+        assert kwargs["Limit"] == 2
+        assert [m["message_id"] for m in result["items"]] == ["msg_1", "msg_2"]
+        assert result["has_more"] is True
+
+    @pytest.mark.asyncio
+    async def test_active_channel_is_served_from_cache(self, db_service):
+        """Test reopening a channel and catching up after a reconnect need no query."""
+        sent = await self._send(db_service, 3)
+        first = await db_service.get_messages("channel_1", limit=2)
+        newer = await self._send(db_service, 1)
+
+        with patch.object(db_service.messages_table, 'query') as mock_query:
+            reopened = await db_service.get_messages("channel_1", limit=2)
+            caught_up = await db_service.get_messages("channel_1", after=sent[-1]["message_id"])
+            older = await db_service.get_messages("channel_1", before=sent[1]["message_id"])
+
+        mock_query.assert_not_called()
+        assert [m["content"] for m in first["items"]] == ["message 1", "message 2"]
+        assert first["has_more"] is True
+        assert [m["message_id"] for m in reopened["items"]] == [sent[-1]["message_id"], newer[0]["message_id"]]
+        assert [m["message_id"] for m in caught_up["items"]] == [newer[0]["message_id"]]
+        assert [m["content"] for m in older["items"]] == ["message 0"]
+        assert older["has_more"] is False
+
+    @pytest.mark.asyncio
+    async def test_thread_returns_root_with_count_and_replies(self, db_service):
+        """Test replies increment the parent's count and come back with it in one query."""
+        root, other = await self._send(db_service, 2)
+        replies = [
+            await db_service.create_message({
+                "channel_id": "channel_1", "sender_id": "user_2", "sender_name": "User 2",
+                "content": f"reply {i}", "parent_message_id": root["message_id"]
+            })
+            for i in range(3)
+        ]
+
+        with patch.object(db_service.messages_table, 'query', wraps=db_service.messages_table.query) as mock_query:
+            thread = await db_service.get_thread(root["message_id"])
+
+        assert mock_query.call_count == 1
+        assert thread["root"]["message_id"] == root["message_id"]
+        assert thread["root"]["reply_count"] == 3
+        assert thread["root"]["last_reply_at"] == replies[-1]["timestamp"]
+        assert [m["content"] for m in thread["replies"]] == ["reply 0", "reply 1", "reply 2"]
+        assert thread["has_more"] is False
+        assert (await db_service.get_thread(other["message_id"]))["root"] is None
+
+    @pytest.mark.asyncio
+    async def test_thread_pages_forward(self, db_service):
+        """Test after returns the replies following the given reply."""
+        root, = await self._send(db_service, 1)
+        replies = [
+            await db_service.create_message({
+                "channel_id": "channel_1", "sender_id": "user_2", "sender_name": "User 2",
+                "content": f"reply {i}", "parent_message_id": root["message_id"]
+            })
+            for i in range(3)
+        ]
+
+        page = await db_service.get_thread(root["message_id"], after=replies[0]["message_id"])
+
+        assert page["root"] is None
+        assert [m["content"] for m in page["replies"]] == ["reply 1", "reply 2"]
+
+    @pytest.mark.asyncio
+    async def test_reply_requires_top_level_parent_in_channel(self, db_service):
+        """Test replies to missing messages, other channels' messages and replies are rejected."""
+        root, = await self._send(db_service, 1)
+        reply = await db_service.create_message({
+            "channel_id": "channel_1", "sender_id": "user_2", "sender_name": "User 2",
+            "content": "reply", "parent_message_id": root["message_id"]
+        })
+
+        for channel_id, parent_id in [
+            ("channel_1", "msg_missing"),
+            ("channel_2", root["message_id"]),
+            ("channel_1", reply["message_id"]),
+        ]:
+            with pytest.raises(ValueError):
+                await db_service.create_message({
+                    "channel_id": channel_id, "sender_id": "user_2", "sender_name": "User 2",
+                    "content": "nested", "parent_message_id": parent_id
+                })
+
+        thread = await db_service.get_thread(root["message_id"])
+        assert thread["root"]["reply_count"] == 1
+        assert len(thread["replies"]) == 1
+
+    @pytest.mark.asyncio
+    async def test_reply_capacity_is_counted_as_writes(self, db_service):
+        """Test the capacity a reply's transaction consumes is accounted as write units."""
+        root, = await self._send(db_service, 1)
+        client = db_service.dynamodb.meta.client
+        transact = client.transact_write_items
+
+        def with_capacity(**kwargs):
+            response = transact(**kwargs)
+            response['ConsumedCapacity'] = [{'TableName': settings.messages_table, 'CapacityUnits': 4.0}]
+            return response
+
+        token = start_request_capacity()
+        try:
+            with patch.object(client, 'transact_write_items', side_effect=with_capacity):
+                await db_service.create_message({
+                    "channel_id": "channel_1", "sender_id": "user_2", "sender_name": "User 2",
+                    "content": "reply", "parent_message_id": root["message_id"]
+                })
+            capacity = get_request_capacity()
+        finally:
+            stop_request_capacity(token)
+
+        assert capacity[settings.messages_table] == {"rcu": 0.0, "wcu": 4.0}
+
+    @pytest.mark.asyncio
+    async def test_cached_channel_sees_reply_counts(self, db_service):
+        """Test a cached parent reflects new replies without a reload."""
+        root, = await self._send(db_service, 1)
+        await db_service.get_messages("channel_1")
+
+        await db_service.create_message({
+            "channel_id": "channel_1", "sender_id": "user_2", "sender_name": "User 2",
+            "content": "reply", "parent_message_id": root["message_id"]
+        })
+        result = await db_service.get_messages("channel_1")
+
+        assert result["items"][0]["reply_count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_batch_get_messages_keeps_key_order(self, db_service):
+        """Test messages fetched by key come back in the requested order, skipping missing ones."""
+        sent = await self._send(db_service, 3)
+        keys = [{"channel_id": "channel_1", "message_id": m["message_id"]} for m in reversed(sent)]
+        keys.insert(1, {"channel_id": "channel_1", "message_id": "msg_missing"})
+
+        found = await db_service.batch_get_messages(keys)
+
+        assert [m["content"] for m in found] == ["message 2", "message 1", "message 0"]
+        assert isinstance(found[0]["timestamp"], datetime)
+
+    @pytest.mark.asyncio
+    async def test_backfill_indexes_stored_messages(self, db_service):
+        """Test the search backfill pages through the table and indexes every message."""
+        await self._send(db_service, 5)
+        await self._send(db_service, 2, channel_id="channel_2")
+        index = SearchIndex()
+        index.begin_backfill()
+
+        scan_messages = db_service.scan_messages
+        with patch.object(db_service, 'scan_messages', lambda: scan_messages(page_size=2)):
+            await backfill_search_index(index, db_service)
+
+        assert index.search("message", ["channel_1"])["total"] == 5
+        assert index.search("message", ["channel_2"])["total"] == 2
+
+    @pytest.mark.asyncio
+    async def test_get_project_channel_ids(self, db_service, mock_dynamodb):
+        """Test a project's channels are found through the project-channels index."""
+        channels = mock_dynamodb.Table(settings.channels_table)
+        channels.put_item(Item={"channel_id": "channel_1", "project_id": "proj_1", "channel_type": "general"})
+        channels.put_item(Item={"channel_id": "channel_2", "project_id": "proj_1", "channel_type": "agent"})
+        channels.put_item(Item={"channel_id": "channel_3", "project_id": "proj_2", "channel_type": "general"})
+
+        assert sorted(await db_service.get_project_channel_ids("proj_1")) == ["channel_1", "channel_2"]
+
+
+class TestReadCursors:
+    """Test suite for per-user unread counts."""
+
+    @pytest.fixture
+    def db_service(self, mock_dynamodb):
+        """Create a DynamoDB service backed by mocked tables."""
+        return DynamoDBService()
+
+    async def _send(self, db_service, sender_id, channel_id="channel_1", **extra):
+        return await db_service.create_message({
+            "channel_id": channel_id, "sender_id": sender_id, "sender_name": sender_id, "content": "hi", **extra
+        })
+
+    async def _unread(self, db_service, user_id):
+        # Senders' cursors advance in the background after create_message returns
+        await db_service.sender_read_counts.drain()
+        return {c["channel_id"]: c["unread_count"] for c in await db_service.get_unread_counts(user_id)}
+
+    @pytest.mark.asyncio
+    async def test_messages_count_as_unread_until_read(self, db_service):
+        """Test new messages raise the unread count and reading clears it."""
+        first = await self._send(db_service, "agent_pm")
+        assert await db_service.mark_channel_read("user_1", "channel_1", first["message_id"])
+        await db_service.mark_channel_read("user_1", "channel_2", "msg_0")
+
+        await self._send(db_service, "agent_pm")
+        latest = await self._send(db_service, "agent_architect")
+        await self._send(db_service, "agent_pm", channel_id="channel_2")
+        assert await self._unread(db_service, "user_1") == {"channel_1": 2, "channel_2": 1}
+
+        await db_service.mark_channel_read("user_1", "channel_1", latest["message_id"])
+        counts = await db_service.get_unread_counts("user_1")
+        assert {c["channel_id"]: c["unread_count"] for c in counts} == {"channel_1": 0, "channel_2": 1}
+        assert counts[0]["last_read_message_id"] == latest["message_id"]
+        assert isinstance(counts[0]["last_read_at"], datetime)
+
+    @pytest.mark.asyncio
+    async def test_own_messages_and_replies_are_not_unread(self, db_service):
+        """Test senders' own messages and thread replies leave the count unchanged."""
+        root = await self._send(db_service, "agent_pm")
+        await db_service.mark_channel_read("user_1", "channel_1", root["message_id"])
+
+        await self._send(db_service, "user_1")
+        await self._send(db_service, "agent_pm", parent_message_id=root["message_id"])
+
+        assert await self._unread(db_service, "user_1") == {"channel_1": 0}
+
+    @pytest.mark.asyncio
+    async def test_reading_a_message_leaves_later_ones_unread(self, db_service):
+        """Test marking an older message read keeps messages counted after it unread."""
+        first = await self._send(db_service, "agent_pm")
+        await self._send(db_service, "agent_pm")
+        await self._send(db_service, "agent_architect")
+
+        assert await db_service.mark_channel_read("user_1", "channel_1", first["message_id"])
+
+        assert first["seq"] == 1
+        assert await self._unread(db_service, "user_1") == {"channel_1": 2}
+
+    @pytest.mark.asyncio
+    async def test_burst_shares_counter_updates(self, db_service):
+        """Test concurrent messages of a channel take one channel counter update and get distinct seqs."""
+        await db_service.mark_channel_read("user_1", "channel_1", "msg_0")
+        with patch.object(db_service, '_call', wraps=db_service._call) as mock_call:
+            sent = await asyncio.gather(*(self._send(db_service, f"agent_{i % 2}") for i in range(10)))
+
+        counter_updates = [
+            call for call in mock_call.call_args_list
+            if call.args[1] == 'update_item' and call.args[0] is db_service.channels_table
+        ]
+        assert len(counter_updates) == 1
+        assert sorted(m["seq"] for m in sent) == list(range(1, 11))
+        assert await self._unread(db_service, "user_1") == {"channel_1": 10}
+
+    @pytest.mark.asyncio
+    async def test_sender_cursor_does_not_delay_the_send(self, db_service):
+        """Test create_message returns before the sender's own cursor is advanced."""
+        await db_service.mark_channel_read("user_1", "channel_1", "msg_0")
+        counter = db_service.sender_read_counts
+        with patch.object(counter, 'apply', wraps=counter.apply) as add_reads:
+            await self._send(db_service, "user_1")
+            add_reads.assert_not_called()
+
+            assert await self._unread(db_service, "user_1") == {"channel_1": 0}
+        add_reads.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_cursor_never_moves_back(self, db_service):
+        """Test marking an older message read (e.g. from a stale tab) is ignored."""
+        first = await self._send(db_service, "agent_pm")
+        second = await self._send(db_service, "agent_pm")
+        await db_service.mark_channel_read("user_1", "channel_1", second["message_id"])
+
+        assert not await db_service.mark_channel_read("user_1", "channel_1", first["message_id"])
+        assert await self._unread(db_service, "user_1") == {"channel_1": 0}
+
+    @pytest.mark.asyncio
+    async def test_unread_counts_use_one_query_and_batch_get(self, db_service):
+        """Test the sidebar's counts take a fixed number of calls however many messages exist."""
+        for channel in range(3):
+            await db_service.mark_channel_read("user_1", f"channel_{channel}", "msg_0")
+            for _ in range(4):
+                await self._send(db_service, "agent_pm", channel_id=f"channel_{channel}")
+
+        await db_service.sender_read_counts.drain()
+        with patch.object(db_service, '_call', wraps=db_service._call) as mock_call:
+            unread = {c["channel_id"]: c["unread_count"] for c in await db_service.get_unread_counts("user_1")}
+
+        assert unread == {"channel_0": 4, "channel_1": 4, "channel_2": 4}
+        assert [call.args[1] for call in mock_call.call_args_list] == ['query', 'batch_get_item']
@@ -0,0 +1,118 @@
+import asyncio
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from app.config import settings
+from app.services.dynamodb import DynamoDBService
+from app.services.health import HealthMonitor, Probe, _check_dynamodb
+
+
+def failing():
+    raise ConnectionError("Connection refused")
+
+
+def hanging():
+    time.sleep(0.2)
+
+
+class TestHealthMonitor:
+    """Test suite for background dependency probing."""
+
+    @pytest.mark.asyncio
+    async def test_status_served_from_cache(self):
+        """Test status reads cached results without probing again."""
+        check = Mock(return_value="ACTIVE")
+        monitor = HealthMonitor([Probe("dynamodb", check)])
+
+        await monitor.check()
+        report = monitor.status()
+        monitor.status()
+
+        assert check.call_count == 1
+        assert report["status"] == "healthy"
+        assert report["services"]["dynamodb"]["status"] == "healthy"
+        assert report["services"]["dynamodb"]["latency_ms"] is not None
+        assert monitor.is_ready()
+
+    @pytest.mark.asyncio
+    async def test_not_ready_before_first_probe(self):
+        """Test the monitor is not ready until dependencies were probed."""
+        monitor = HealthMonitor([Probe("dynamodb", Mock())])
+
+        assert not monitor.is_ready()
+        assert monitor.status()["status"] == "unhealthy"
+
+    @pytest.mark.asyncio
+    async def test_critical_failure_is_unhealthy(self):
+        """Test a failing critical dependency makes the service unhealthy."""
+        monitor = HealthMonitor([Probe("dynamodb", failing)])
+
+        await monitor.check()
+        report = monitor.status()
+
+        assert report["status"] == "unhealthy"
+        assert report["services"]["dynamodb"]["error"] == "Connection refused"
+        assert not monitor.is_ready()
+
+    @pytest.mark.asyncio
+    async def test_non_critical_failure_is_degraded(self):
+        """Test a failing optional dependency degrades but keeps readiness."""
+        monitor = HealthMonitor([
+            Probe("dynamodb", Mock()),
+            Probe("redis", failing, critical=False),
+        ])
+
+        await monitor.check()
+
+        assert monitor.status()["status"] == "degraded"
+        assert monitor.is_ready()
+
+    @pytest.mark.asyncio
+    async def test_probe_timeout(self):
+        """Test a hanging probe is reported unhealthy after the timeout."""
+        monitor = HealthMonitor([Probe("bedrock", hanging, critical=False)], timeout=0.05)
+
+        await monitor.check()
+
+        assert monitor.results["bedrock"].status == "unhealthy"
+        assert "Timed out" in monitor.results["bedrock"].error
+
+    @pytest.mark.asyncio
+    async def test_stale_results_are_unhealthy(self):
+        """Test results older than the staleness window no longer count as healthy."""
+        monitor = HealthMonitor([Probe("dynamodb", Mock())], interval=0.01, stale_after=2)
+
+        await monitor.check()
+        await asyncio.sleep(0.05)
+
+        assert not monitor.is_ready()
+
+    @pytest.mark.asyncio
+    async def test_background_probing(self):
+        """Test dependencies keep being probed on the interval."""
+        check = Mock()
+        monitor = HealthMonitor([Probe("dynamodb", check)], interval=0.01)
+
+        await monitor.start()
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+        assert check.call_count > 2
+
+    @pytest.mark.asyncio
+    async def test_dynamodb_probe_calls_dynamodb_every_round(self, mock_dynamodb):
+        """Test the DynamoDB probe notices a table that disappears after startup."""
+        service = DynamoDBService()
+        await service.health_check()
+        monitor = HealthMonitor([Probe("dynamodb", _check_dynamodb(service))])
+
+        await monitor.check()
+        assert monitor.is_ready()
+
+        mock_dynamodb.Table(settings.projects_table).delete()
+        await monitor.check()
+
+        assert not monitor.is_ready()
+        assert monitor.status()["services"]["dynamodb"]["status"] == "unhealthy"
@@ -0,0 +1,40 @@
+from datetime import datetime, timezone
+
+from app.utils.ids import new_message_id, new_ulid, ulid_at, ulid_timestamp
+
+
+class TestULID:
+    """Test suite for time-sortable IDs."""
+
+    def test_ulid_format(self):
+        """Test ULIDs are 26 Crockford base32 characters."""
+        ulid = new_ulid()
+        assert len(ulid) == 26
+        assert set(ulid) <= set("0123456789ABCDEFGHJKMNPQRSTVWXYZ")
+
+    def test_ulids_sort_by_creation_time(self):
+        """Test ULIDs from later milliseconds sort after earlier ones."""
+        assert new_ulid(1_700_000_000_000) < new_ulid(1_700_000_000_001) < new_ulid(1_800_000_000_000)
+
+    def test_ulids_are_monotonic_within_a_millisecond(self):
+        """Test many IDs in the same millisecond stay unique and increasing."""
+        ids = [new_ulid(1_900_000_000_000) for _ in range(1000)]
+        assert ids == sorted(ids)
+        assert len(set(ids)) == len(ids)
+
+    def test_timestamp_round_trip(self):
+        """Test the creation time can be read back from the ID."""
+        ulid = new_ulid(1_700_000_000_123)
+        assert ulid_timestamp(ulid) == datetime(2023, 11, 14, 22, 13, 20, 123000, tzinfo=timezone.utc)
+
+    def test_message_id_prefix(self):
+        """Test message IDs carry the msg_ prefix."""
+        assert new_message_id().startswith("msg_")
+
+    def test_ulid_at_bounds_ids_from_that_time(self):
+        """Test the floor ULID sorts before IDs from its millisecond and after earlier ones."""
+        when = datetime(2023, 11, 14, 22, 13, 20, 123000, tzinfo=timezone.utc)
+        floor = ulid_at(when)
+
+        assert new_ulid(1_700_000_000_122) < floor <= new_ulid(1_700_000_000_123)
+        assert ulid_timestamp(floor) == when
@@ -0,0 +1,129 @@
+import io
+import json
+import logging
+import os
+import queue
+from unittest.mock import patch
+
+import pytest
+import structlog
+
+from app.config import settings
+from app.utils import logger as logger_module
+from app.utils.logger import (
+    NonBlockingQueueHandler, configure_logging, sample_events, shutdown_logging
+)
+
+
+class TestLoggingPipeline:
+    """Test suite for the queue-based logging pipeline."""
+
+    @pytest.fixture
+    def stream(self):
+        """Route log output to a buffer for the duration of a test."""
+        buffer = io.StringIO()
+        configure_logging(stream=buffer)
+        yield buffer
+        configure_logging()
+
+    def read_events(self, stream):
+        shutdown_logging()
+        return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+    def test_structlog_events_rendered_as_json(self, stream):
+        """Test structlog events are written as JSON by the listener thread."""
+        structlog.get_logger("test").info("Project created", project_id="p-1")
+
+        events = self.read_events(stream)
+
+        assert events[-1]["event"] == "Project created"
+        assert events[-1]["project_id"] == "p-1"
+        assert events[-1]["level"] == "info"
+        assert "timestamp" in events[-1]
+
+    def test_stdlib_records_rendered_as_json(self, stream):
+        """Test records from plain stdlib loggers go through the same renderer."""
+        logging.getLogger("uvicorn.error").warning("Worker %s restarted", 3)
+
+        events = self.read_events(stream)
+
+        assert events[-1]["event"] == "Worker 3 restarted"
+        assert events[-1]["level"] == "warning"
+        assert events[-1]["logger"] == "uvicorn.error"
+
+    def test_exception_rendered_on_caller_thread(self, stream):
+        """Test tracebacks are captured before the record is queued."""
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            structlog.get_logger("test").exception("Failed")
+
+        events = self.read_events(stream)
+
+        assert "ValueError: boom" in events[-1]["exception"]
+
+    def test_forked_child_gets_writer_thread(self, tmp_path):
+        """Test a forked worker keeps logging after the parent's thread is gone."""
+        path = tmp_path / "fork.log"
+        with open(path, "w") as output:
+            configure_logging(stream=output)
+            try:
+                pid = os.fork()
+                if pid == 0:
+                    structlog.get_logger("child").info("Worker started")
+                    shutdown_logging()
+                    os._exit(0)
+                os.waitpid(pid, 0)
+            finally:
+                configure_logging()
+
+        events = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [e["event"] for e in events] == ["Worker started"]
+
+    def test_full_queue_drops_records(self):
+        """Test a full queue drops records instead of blocking."""
+        handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+        record = logging.LogRecord("test", logging.INFO, __file__, 1, "message", None, None)
+
+        handler.emit(record)
+        handler.emit(record)
+
+        assert handler.queue.qsize() == 1
+        assert handler.dropped == 1
+
+
+class TestSampling:
+    """Test suite for per-event log sampling."""
+
+    @pytest.fixture(autouse=True)
+    def sample_rates(self):
+        with patch.object(settings, "log_sample_rates", {"HTTP request": 0.01}):
+            yield
+
+    def test_unsampled_event_kept(self):
+        """Test events without a configured rate are always kept."""
+        event = {"event": "Project created"}
+
+        assert sample_events(None, "info", event) is event
+
+    def test_sampled_event_dropped(self):
+        """Test events above the sample rate are dropped."""
+        with patch.object(logger_module.random, "random", return_value=0.5):
+            with pytest.raises(structlog.DropEvent):
+                sample_events(None, "info", {"event": "HTTP request", "status_code": 200})
+
+    def test_sampled_event_kept_with_rate(self):
+        """Test kept sampled events record the rate they were sampled at."""
+        with patch.object(logger_module.random, "random", return_value=0.001):
+            event = sample_events(None, "info", {"event": "HTTP request", "status_code": 200})
+
+        assert event["sample_rate"] == 0.01
+
+    def test_errors_always_kept(self):
+        """Test failed requests and warning-level events bypass sampling."""
+        with patch.object(logger_module.random, "random", return_value=0.5):
+            failed = sample_events(None, "info", {"event": "HTTP request", "status_code": 503})
+            warning = sample_events(None, "warning", {"event": "HTTP request", "status_code": 200})
+
+        assert "sample_rate" not in failed
+        assert "sample_rate" not in warning
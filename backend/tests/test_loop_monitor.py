@@ -0,0 +1,76 @@
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.utils.loop_monitor import LoopMonitor
+
+
+def block_loop(seconds: float):
+    time.sleep(seconds)
+
+
+def sample(name: str) -> float:
+    return REGISTRY.get_sample_value(name) or 0.0
+
+
+class TestLoopMonitor:
+    """Test suite for the event loop lag monitor."""
+
+    @pytest.mark.asyncio
+    async def test_records_lag(self):
+        """Test loop lag is observed into the histogram."""
+        before = sample("event_loop_lag_seconds_count")
+        monitor = LoopMonitor(interval=0.01)
+
+        monitor.start()
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+        assert sample("event_loop_lag_seconds_count") > before
+
+    @pytest.mark.asyncio
+    async def test_blocking_call_counted(self):
+        """Test a stall beyond the threshold is counted without the watchdog."""
+        before = sample("event_loop_blocked_total")
+        monitor = LoopMonitor(interval=0.01, block_threshold=0.05)
+
+        monitor.start()
+        await asyncio.sleep(0.02)
+        block_loop(0.1)
+        await asyncio.sleep(0.02)
+        await monitor.stop()
+
+        assert sample("event_loop_blocked_total") > before
+
+    @pytest.mark.asyncio
+    async def test_watchdog_logs_blocking_stack(self):
+        """Test the watchdog logs the stack of the code blocking the loop."""
+        monitor = LoopMonitor(interval=0.01, block_threshold=0.05, watchdog=True)
+
+        with patch("app.utils.loop_monitor.logger") as mock_logger:
+            monitor.start()
+            await asyncio.sleep(0.02)
+            block_loop(0.2)
+            await asyncio.sleep(0.02)
+            await monitor.stop()
+
+        mock_logger.warning.assert_called_once()
+        args, kwargs = mock_logger.warning.call_args
+        assert args == ("Event loop blocked",)
+        assert "block_loop" in kwargs["stack"]
+        assert kwargs["blocked_ms"] >= 50
+
+    @pytest.mark.asyncio
+    async def test_watchdog_quiet_when_loop_idle(self):
+        """Test the watchdog stays quiet while the loop keeps up."""
+        monitor = LoopMonitor(interval=0.01, block_threshold=0.05, watchdog=True)
+
+        with patch("app.utils.loop_monitor.logger") as mock_logger:
+            monitor.start()
+            await asyncio.sleep(0.1)
+            await monitor.stop()
+
+        mock_logger.warning.assert_not_called()
@@ -0,0 +1,134 @@
+from unittest.mock import patch
+
+from app.utils.message_cache import MessageCache
+
+
+def messages(*ids):
+    return [{"message_id": f"msg_{i:02d}"} for i in ids]
+
+
+def ids(result):
+    return [int(m["message_id"][4:]) for m in result["items"]]
+
+
+class TestMessageCache:
+    """Test suite for the per-channel recent-message ring."""
+
+    def test_unknown_channel_misses(self):
+        """Test channels that were never loaded are not answered."""
+        cache = MessageCache()
+        assert cache.latest("channel_1", 10) is None
+        assert cache.since("channel_1", "msg_00", 10) is None
+
+    def test_latest_page_from_complete_channel(self):
+        """Test a channel that fits in the ring answers any page."""
+        cache = MessageCache(size=10)
+        cache.load("channel_1", messages(1, 2, 3), complete=True)
+
+        assert ids(cache.latest("channel_1", 2)) == [2, 3]
+        assert cache.latest("channel_1", 2)["has_more"] is True
+        assert ids(cache.latest("channel_1", 10)) == [1, 2, 3]
+        assert cache.latest("channel_1", 10)["has_more"] is False
+        assert ids(cache.latest("channel_1", 10, before="msg_02")) == [1]
+
+    def test_pages_beyond_partial_ring_miss(self):
+        """Test pages reaching past the oldest cached message fall through to DynamoDB."""
+        cache = MessageCache(size=3)
+        cache.load("channel_1", messages(4, 5, 6, 7), complete=True)
+
+        assert ids(cache.latest("channel_1", 3)) == [5, 6, 7]
+        assert cache.latest("channel_1", 3)["has_more"] is True
+        assert cache.latest("channel_1", 4) is None
+        assert cache.latest("channel_1", 3, before="msg_06") is None
+
+    def test_since_for_reconnect_catch_up(self):
+        """Test messages newer than the last one seen are answered while the gap is cached."""
+        cache = MessageCache(size=3)
+        cache.load("channel_1", messages(4, 5, 6), complete=False)
+
+        assert ids(cache.since("channel_1", "msg_04", 10)) == [5, 6]
+        assert ids(cache.since("channel_1", "msg_04", 1)) == [5]
+        assert cache.since("channel_1", "msg_04", 1)["has_more"] is True
+        assert cache.since("channel_1", "msg_06", 10)["items"] == []
+        assert cache.since("channel_1", "msg_02", 10) is None
+
+    def test_add_keeps_order_and_bounds(self):
+        """Test new messages are inserted in ID order, once, and the oldest are evicted."""
+        cache = MessageCache(size=3)
+        cache.load("channel_1", messages(1, 3), complete=True)
+
+        cache.add("channel_1", messages(2)[0])
+        cache.add("channel_1", messages(2)[0])
+        assert ids(cache.latest("channel_1", 3)) == [1, 2, 3]
+
+        cache.add("channel_1", messages(4)[0])
+        assert ids(cache.latest("channel_1", 3)) == [2, 3, 4]
+        assert cache.latest("channel_1", 3)["has_more"] is True
+
+    def test_add_ignores_channels_not_loaded(self):
+        """Test a write alone does not create a ring that would look complete."""
+        cache = MessageCache()
+        cache.add("channel_1", messages(1)[0])
+        assert cache.latest("channel_1", 1) is None
+
+    def test_rings_expire(self):
+        """Test rings older than the TTL are reloaded."""
+        cache = MessageCache(ttl=60)
+        with patch("app.utils.message_cache.time.monotonic", return_value=1000):
+            cache.load("channel_1", messages(1), complete=True)
+        with patch("app.utils.message_cache.time.monotonic", return_value=1061):
+            assert cache.latest("channel_1", 1) is None
+
+    def test_least_recently_used_channel_is_evicted(self):
+        """Test the channel count is bounded, evicting the least recently read."""
+        cache = MessageCache(max_channels=2)
+        cache.load("channel_1", messages(1), complete=True)
+        cache.load("channel_2", messages(1), complete=True)
+        cache.latest("channel_1", 1)
+        cache.load("channel_3", messages(1), complete=True)
+
+        assert cache.latest("channel_1", 1) is not None
+        assert cache.latest("channel_2", 1) is None
+
+    def test_count_reply_updates_cached_parent(self):
+        """Test a reply bumps its parent's count in place, once per added reply."""
+        cache = MessageCache()
+        cache.load("channel_1", messages(1), complete=True)
+        parent = cache.latest("channel_1", 1)["items"][0]
+
+        cache.count_reply("channel_1", "msg_01", "2024-01-01T00:00:00")
+        cache.count_reply("channel_1", "msg_01", "2024-01-01T00:01:00")
+        cache.count_reply("channel_1", "msg_99", "2024-01-01T00:01:00")
+
+        updated = cache.latest("channel_1", 1)["items"][0]
+        assert updated["reply_count"] == 2
+        assert updated["last_reply_at"] == "2024-01-01T00:01:00"
+        assert "reply_count" not in parent
+
+    def test_messages_added_during_a_load_are_kept(self):
+        """Test a message added while the channel's page is being queried ends up in the ring."""
+        cache = MessageCache(size=10)
+        cache.begin_load("channel_1")
+        cache.add("channel_1", messages(4)[0])
+        cache.load("channel_1", messages(1, 2, 3), complete=True)
+
+        assert ids(cache.latest("channel_1", 10)) == [1, 2, 3, 4]
+        assert ids(cache.since("channel_1", "msg_03", 10)) == [4]
+
+        cache.add("channel_1", messages(5)[0])
+        cache.begin_load("channel_1")
+        cache.abort_load("channel_1")
+        cache.invalidate("channel_1")
+        cache.load("channel_1", messages(1), complete=True)
+        assert ids(cache.latest("channel_1", 10)) == [1]
+
+    def test_overlapping_loads_keep_messages_added_meanwhile(self):
+        """Test every concurrent load of a channel merges messages added before it finished."""
+        cache = MessageCache(size=10)
+        cache.begin_load("channel_1")
+        cache.begin_load("channel_1")
+        cache.add("channel_1", messages(3)[0])
+        cache.load("channel_1", messages(1, 2), complete=True)
+        cache.load("channel_1", messages(1, 2, 3), complete=True)
+
+        assert ids(cache.latest("channel_1", 10)) == [1, 2, 3]
@@ -0,0 +1,19 @@
+from app.config import settings
+from app.utils.circuit_breaker import CircuitOpenError
+from app.utils.deadline import DeadlineExceeded
+
+
+class TestReadCursorRoutes:
+    """Test suite for the unread count and mark-read routes."""
+
+    def test_unread_routes_keep_503_and_504(self, messages_client, mock_db_service):
+        """Test the read-cursor routes pass CircuitOpenError and DeadlineExceeded through."""
+        mock_db_service.get_unread_counts.side_effect = CircuitOpenError("dynamodb", 7)
+        mock_db_service.mark_channel_read.side_effect = DeadlineExceeded()
+
+        unread = messages_client.get(f"{settings.api_v1_prefix}/messages/unread")
+        read = messages_client.put(f"{settings.api_v1_prefix}/messages/channel_1/read", json={"message_id": "msg_1"})
+
+        assert unread.status_code == 503
+        assert unread.headers["retry-after"] == "7"
+        assert read.status_code == 504
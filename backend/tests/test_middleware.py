@@ -0,0 +1,227 @@
+import gzip
+from unittest.mock import patch
+
+import brotli
+import pytest
+from prometheus_client import REGISTRY
+from fastapi import Depends, FastAPI
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.utils.middleware import CompressionMiddleware, PrometheusMiddleware, ServerTimingMiddleware
+from app.utils.responses import FastJSONResponse
+from app.utils.capacity import record_consumed_capacity
+from app.utils.timing import timed
+
+
+LARGE_BODY = b'{"projects": [' + b",".join(b'{"name": "Project %d"}' % i for i in range(500)) + b"]}"
+
+
+@pytest.fixture
+def compression_client():
+    """Client for a small app wrapped in CompressionMiddleware."""
+    test_app = FastAPI()
+    test_app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+    @test_app.get("/large")
+    async def large():
+        return Response(LARGE_BODY, media_type="application/json", headers={"ETag": '"v1"'})
+
+    @test_app.get("/small")
+    async def small():
+        return PlainTextResponse("ok")
+
+    @test_app.get("/stream")
+    async def stream():
+        async def chunks():
+            for i in range(5):
+                yield b"chunk %d\n" % i * 200
+        return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+    @test_app.get("/events")
+    async def events():
+        async def chunks():
+            yield b"data: " + b"x" * 4096 + b"\n\n"
+        return StreamingResponse(chunks(), media_type="text/event-stream")
+
+    @test_app.get("/not-modified")
+    async def not_modified():
+        return Response(status_code=304, headers={"ETag": '"v1"'})
+
+    return TestClient(test_app)
+
+
+class TestCompressionMiddleware:
+    """Test suite for response compression."""
+
+    def test_gzip(self, compression_client):
+        """Test gzip is used when it is the only accepted encoding."""
+        response = compression_client.get("/large", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert int(response.headers["content-length"]) < len(LARGE_BODY)
+        assert "accept-encoding" in response.headers["vary"].lower()
+        assert response.content == LARGE_BODY
+
+    def test_compressed_etag_is_weak(self, compression_client):
+        """Test compressed bodies carry a weak ETag and identity bodies keep the strong one."""
+        compressed = compression_client.get("/large", headers={"Accept-Encoding": "gzip"})
+        identity = compression_client.get("/large", headers={"Accept-Encoding": "identity"})
+
+        assert compressed.headers["etag"] == 'W/"v1"'
+        assert identity.headers["etag"] == '"v1"'
+
+    def test_brotli_preferred(self, compression_client):
+        """Test brotli wins over gzip at equal quality."""
+        response = compression_client.get("/large", headers={"Accept-Encoding": "gzip, deflate, br"})
+
+        assert response.headers["content-encoding"] == "br"
+
+    def test_quality_values_respected(self, compression_client):
+        """Test q-values decide between encodings and q=0 disables one."""
+        response = compression_client.get("/large", headers={"Accept-Encoding": "br;q=0.5, gzip;q=0.9"})
+        assert response.headers["content-encoding"] == "gzip"
+
+        response = compression_client.get("/large", headers={"Accept-Encoding": "br;q=0, gzip;q=0"})
+        assert "content-encoding" not in response.headers
+        assert response.content == LARGE_BODY
+
+    def test_below_threshold_not_compressed(self, compression_client):
+        """Test small bodies are sent uncompressed."""
+        response = compression_client.get("/small", headers={"Accept-Encoding": "gzip, br"})
+
+        assert "content-encoding" not in response.headers
+        assert response.text == "ok"
+
+    def test_streaming_response(self, compression_client):
+        """Test streamed bodies are compressed incrementally without a Content-Length."""
+        with compression_client.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as response:
+            assert response.headers["content-encoding"] == "gzip"
+            assert "content-length" not in response.headers
+            raw = b"".join(response.iter_raw())
+
+        assert gzip.decompress(raw) == b"".join(b"chunk %d\n" % i * 200 for i in range(5))
+
+    def test_streaming_response_brotli(self, compression_client):
+        """Test streamed bodies decode as a single brotli stream."""
+        with compression_client.stream("GET", "/stream", headers={"Accept-Encoding": "br"}) as response:
+            raw = b"".join(response.iter_raw())
+
+        assert brotli.decompress(raw) == b"".join(b"chunk %d\n" % i * 200 for i in range(5))
+
+    def test_event_stream_not_compressed(self, compression_client):
+        """Test server-sent events are passed through untouched."""
+        response = compression_client.get("/events", headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in response.headers
+
+    def test_not_modified_passthrough(self, compression_client):
+        """Test bodiless responses are left alone."""
+        response = compression_client.get("/not-modified", headers={"Accept-Encoding": "gzip"})
+
+        assert response.status_code == 304
+        assert "content-encoding" not in response.headers
+        assert "accept-encoding" in response.headers["vary"].lower()
+
+    def test_not_modified_etag_matches_compressed_response(self, compression_client):
+        """Test a 304 carries the weak ETag its compressed 200 had, and the strong one without compression."""
+        compressed = compression_client.get("/not-modified", headers={"Accept-Encoding": "gzip"})
+        identity = compression_client.get("/not-modified", headers={"Accept-Encoding": "identity"})
+
+        assert compressed.headers["etag"] == 'W/"v1"'
+        assert identity.headers["etag"] == '"v1"'
+
+
+@pytest.fixture
+def timing_app():
+    """Small app instrumented like app.main: Prometheus inside Server-Timing."""
+    test_app = FastAPI()
+    test_app.add_middleware(PrometheusMiddleware)
+    test_app.add_middleware(ServerTimingMiddleware)
+
+    def sync_dependency():
+        # Sync dependencies run in a worker thread
+        with timed("auth"):
+            return {"user_id": "test_user_123"}
+
+    @test_app.get("/timed")
+    async def timed_route(user: dict = Depends(sync_dependency)):
+        with timed("db"):
+            pass
+        with timed("db"):
+            pass
+        return FastJSONResponse({"user": user})
+
+    return test_app
+
+
+class TestServerTiming:
+    """Test suite for the Server-Timing breakdown."""
+
+    def test_header_reports_phases(self, timing_app):
+        """Test auth, db, serialization and total time are reported."""
+        response = TestClient(timing_app).get("/timed")
+
+        metrics = {m.split(";")[0]: m for m in response.headers["server-timing"].split(", ")}
+        assert set(metrics) == {"auth", "db", "serialize", "app"}
+        assert 'desc="2 calls"' in metrics["db"]
+
+    def test_request_log_includes_timings(self, timing_app):
+        """Test the Prometheus request log carries the same breakdown."""
+        with patch("app.utils.middleware.logger") as mock_logger:
+            TestClient(timing_app).get("/timed")
+
+        timings = mock_logger.info.call_args.kwargs["timings"]
+        assert set(timings) == {"auth", "db", "serialize"}
+
+    def test_timings_are_per_request(self, timing_app):
+        """Test phases do not accumulate across requests."""
+        client = TestClient(timing_app)
+        client.get("/timed")
+        response = client.get("/timed")
+
+        assert response.headers["server-timing"].count("db;") == 1
+        assert 'desc="2 calls"' in response.headers["server-timing"]
+
+    def test_timed_is_noop_outside_requests(self):
+        """Test timers outside a request neither fail nor record."""
+        with timed("db"):
+            pass
+
+
+class TestConsumedCapacity:
+    """Test suite for per-route DynamoDB capacity accounting."""
+
+    @pytest.fixture
+    def capacity_client(self):
+        test_app = FastAPI()
+        test_app.add_middleware(PrometheusMiddleware)
+
+        @test_app.get("/items/{item_id}")
+        async def get_item(item_id: str):
+            record_consumed_capacity("get_item", {"TableName": "items", "CapacityUnits": 0.5})
+            record_consumed_capacity("put_item", {"TableName": "audit", "CapacityUnits": 1.0})
+            return {"item_id": item_id}
+
+        return TestClient(test_app)
+
+    def test_request_log_includes_capacity(self, capacity_client):
+        """Test the request log carries read and write units per table."""
+        with patch("app.utils.middleware.logger") as mock_logger:
+            capacity_client.get("/items/1")
+
+        assert mock_logger.info.call_args.kwargs["consumed_capacity"] == {
+            "items": {"rcu": 0.5, "wcu": 0.0},
+            "audit": {"rcu": 0.0, "wcu": 1.0},
+        }
+
+    def test_capacity_counted_per_route_template(self, capacity_client):
+        """Test capacity is attributed to the route template, not the raw path."""
+        labels = {"method": "GET", "route": "/items/{item_id}", "capacity_type": "read"}
+        before = REGISTRY.get_sample_value("http_route_consumed_capacity_units_total", labels) or 0.0
+
+        capacity_client.get("/items/1")
+        capacity_client.get("/items/2")
+
+        after = REGISTRY.get_sample_value("http_route_consumed_capacity_units_total", labels)
+        assert after - before == 1.0
@@ -0,0 +1,58 @@
+import importlib.util
+import json
+import os
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+
+from app.config import settings
+
+
+PM_HANDLER = Path(__file__).resolve().parents[2] / "lambda" / "agents" / "pm_handler.py"
+
+
+class FakeContext:
+    def __init__(self, remaining_ms: int):
+        self.remaining_ms = remaining_ms
+
+    def get_remaining_time_in_millis(self) -> int:
+        return self.remaining_ms
+
+
+@pytest.fixture
+def pm_handler():
+    # The handler creates its Bedrock client at import time
+    os.environ.setdefault("AWS_DEFAULT_REGION", settings.bedrock_region)
+    spec = importlib.util.spec_from_file_location("pm_handler", PM_HANDLER)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def invoke(pm_handler, remaining_ms: int):
+    event = {"body": json.dumps({"message": "plan the schedule", "session_id": "session_1"})}
+    return pm_handler.lambda_handler(event, FakeContext(remaining_ms))
+
+
+def test_handler_gives_up_when_invocation_is_nearly_out_of_time(pm_handler):
+    """Test an invocation with less time left than the response margin never calls Bedrock."""
+    bedrock = Mock()
+    with patch.object(pm_handler, "PM_AGENT_ID", "agent_1"), patch.object(pm_handler, "bedrock_agent", bedrock):
+        response = invoke(pm_handler, remaining_ms=500)
+
+    assert response["statusCode"] == 504
+    bedrock.invoke_agent.assert_not_called()
+
+
+def test_handler_skips_retries_near_the_deadline(pm_handler):
+    """Test a call with little time left goes through the single-attempt client."""
+    last_attempt = Mock()
+    last_attempt.invoke_agent.return_value = {"completion": (event for event in [{"chunk": {"bytes": b"On it"}}])}
+    with patch.object(pm_handler, "PM_AGENT_ID", "agent_1"), \
+         patch.object(pm_handler, "bedrock_agent_last_attempt", last_attempt):
+        response = invoke(pm_handler, remaining_ms=5000)
+
+    assert response["statusCode"] == 200
+    assert json.loads(response["body"])["response"] == {"message": "On it"}
+    assert last_attempt.invoke_agent.call_args.kwargs["sessionId"] == "session_1"
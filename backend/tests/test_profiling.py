@@ -0,0 +1,131 @@
+import threading
+import time
+
+import boto3
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from moto import mock_s3
+from unittest.mock import patch
+
+from app.config import settings
+from app.utils.middleware import ProfilingMiddleware
+from app.utils.profiling import ProfileStore, RequestProfiler, StackSampler, create_request_profiler
+
+
+def spin(seconds: float):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def wait_for_files(directory, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        files = list(directory.rglob("*.folded"))
+        if files:
+            return files
+        time.sleep(0.01)
+    return []
+
+
+class TestStackSampler:
+    """Test suite for the background stack sampler."""
+
+    def test_samples_target_thread(self):
+        """Test stacks of the target thread are collected in folded format."""
+        sampler = StackSampler(threading.get_ident(), interval=0.001)
+
+        sampler.start()
+        spin(0.05)
+        sampler.stop()
+
+        assert sampler.samples > 0
+        assert any("spin (test_profiling.py" in line for line in sampler.folded().splitlines())
+        assert all(line.rsplit(" ", 1)[1].isdigit() for line in sampler.folded().splitlines())
+
+    def test_stops_after_max_duration(self):
+        """Test the sampler stops by itself after max_duration."""
+        sampler = StackSampler(threading.get_ident(), interval=0.001, max_duration=0.01)
+
+        sampler.start()
+        spin(0.05)
+        samples = sampler.samples
+        spin(0.02)
+
+        assert sampler.samples == samples
+        sampler.stop()
+
+
+class TestProfilingMiddleware:
+    """Test suite for on-demand request profiling."""
+
+    @pytest.fixture
+    def profiler(self, tmp_path):
+        return RequestProfiler(
+            store=ProfileStore(storage="local", output_dir=str(tmp_path)),
+            token="secret-token",
+            interval=0.001
+        )
+
+    @pytest.fixture
+    def client(self, profiler):
+        app = FastAPI()
+
+        @app.get("/slow")
+        async def slow():
+            spin(0.05)
+            return {"ok": True}
+
+        app.add_middleware(ProfilingMiddleware, profiler=profiler)
+        return TestClient(app)
+
+    def test_token_triggers_profile(self, client, tmp_path):
+        """Test a request with the profile token is profiled and stored."""
+        response = client.get("/slow", headers={"X-Profile-Token": "secret-token"})
+
+        assert response.status_code == 200
+        profile_id = response.headers["X-Profile-Id"]
+        files = wait_for_files(tmp_path)
+        assert [f.name for f in files] == [f"{profile_id}.folded"]
+        assert "slow (test_profiling.py" in files[0].read_text()
+
+    def test_untriggered_request_not_profiled(self, client, tmp_path):
+        """Test requests without a valid token are not profiled."""
+        missing = client.get("/slow")
+        wrong = client.get("/slow", headers={"X-Profile-Token": "guess"})
+
+        assert "X-Profile-Id" not in missing.headers
+        assert "X-Profile-Id" not in wrong.headers
+        assert wait_for_files(tmp_path, timeout=0.1) == []
+
+    def test_sample_rate_triggers_profile(self, client, profiler):
+        """Test requests are profiled by random sampling when configured."""
+        profiler.sample_rate = 1.0
+
+        response = client.get("/slow")
+
+        assert "X-Profile-Id" in response.headers
+
+    def test_one_profile_at_a_time(self, client, profiler):
+        """Test a request is not profiled while another profile is running."""
+        assert profiler.acquire()
+        try:
+            response = client.get("/slow", headers={"X-Profile-Token": "secret-token"})
+        finally:
+            profiler.release()
+
+        assert response.status_code == 200
+        assert "X-Profile-Id" not in response.headers
+
+    def test_s3_profiles_go_to_the_logs_bucket(self):
+        """Test S3 storage writes under profiles/ in the logs bucket CloudFormation creates."""
+        bucket = settings.get_bucket_name("logs")
+        with mock_s3(), patch.object(settings, "profile_storage", "s3"):
+            s3 = boto3.client("s3", region_name=settings.aws_region)
+            s3.create_bucket(Bucket=bucket)
+
+            location = create_request_profiler().store.save("abc", "main;spin 3", {})
+
+            assert location.startswith(f"s3://{bucket}/profiles/")
+            assert s3.list_objects_v2(Bucket=bucket, Prefix="profiles/")["KeyCount"] == 1
@@ -1,8 +1,14 @@
+import json
 import pytest
 from unittest.mock import patch, AsyncMock
 from datetime import datetime
+from decimal import Decimal
 
-from app.models.project import ProjectStatus
+from app.api.v1 import projects
+from app.models.project import Project, ProjectStatus
+from app.services.dynamodb import DynamoDBService
+from app.utils.circuit_breaker import CircuitOpenError
+from app.utils.responses import FastJSONResponse
 
 
 class TestProjectsAPI:
@@ -352,4 +358,183 @@ class TestProjectsAPI:
     def test_unauthorized_access(self, client):
         """Test unauthorized access to projects API."""
         response = client.get("/api/v1/projects/")
-        assert response.status_code == 403  # No authorization header
\ No newline at end of file
+        assert response.status_code == 403  # No authorization header
+
+class TestProjectResponses:
+    """Test suite for the trusted-data response path."""
+
+    @pytest.fixture
+    def stored_project(self, sample_project_data):
+        """A project as it comes back from DynamoDB after a round trip."""
+        db_service = DynamoDBService.__new__(DynamoDBService)
+        project = Project(
+            **sample_project_data,
+            project_id="proj_123456789abc",
+            user_id="test_user_123",
+            deadline=datetime(2024, 6, 30, 12, 0, 0),
+            active_agents=["agent_pm_001"],
+        )
+        item = db_service._serialize_item(project.model_dump())
+        item["progress_percentage"] = Decimal("12.5")
+        item["total_tasks"] = Decimal("4")
+        return db_service._deserialize_item(item)
+
+    def test_fast_path_matches_validated_output(self, stored_project):
+        """Test skipping validation produces the same JSON as the response_model path."""
+        fast = json.loads(FastJSONResponse(Project.from_db(stored_project)).body)
+        validated = Project(**stored_project).model_dump(mode="json")
+
+        assert fast == validated
+
+    def test_get_project_returns_stored_item(self, projects_client, mock_db_service, stored_project):
+        """Test GET /projects/{id} serializes the stored item directly."""
+        mock_db_service.get_project.return_value = stored_project
+
+        response = projects_client.get("/api/v1/projects/proj_123456789abc")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["project_id"] == "proj_123456789abc"
+        assert data["progress_percentage"] == 12.5
+        assert data["active_agents"] == ["agent_pm_001"]
+        assert data["deadline"] == "2024-06-30T12:00:00"
+
+    def test_list_projects_returns_page(self, projects_client, mock_db_service, stored_project):
+        """Test GET /projects serializes every row without re-validation."""
+        mock_db_service.list_projects.return_value = {
+            "items": [stored_project, {**stored_project, "project_id": "proj_2"}],
+            "last_evaluated_key": {"project_id": "proj_2"},
+            "count": 2,
+        }
+
+        response = projects_client.get("/api/v1/projects/")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [p["project_id"] for p in data["projects"]] == ["proj_123456789abc", "proj_2"]
+        assert data["has_next"] is True
+        assert data["projects"][0]["metadata"]["tags"] == ["test", "demo"]
+
+    def test_open_circuit_returns_503(self, projects_client, mock_db_service):
+        """Test an open DynamoDB circuit surfaces as 503 with Retry-After, not 500."""
+        mock_db_service.get_project.side_effect = CircuitOpenError("dynamodb", retry_after=12.5)
+        mock_db_service.list_projects.side_effect = CircuitOpenError("dynamodb", retry_after=12.5)
+
+        for url in ("/api/v1/projects/proj_123456789abc", "/api/v1/projects/"):
+            response = projects_client.get(url)
+
+            assert response.status_code == 503
+            assert response.headers["retry-after"] == "13"
+
+
+class TestConditionalRequests:
+    """Test suite for ETag / If-None-Match handling."""
+
+    @pytest.fixture(autouse=True)
+    def clear_etag_cache(self):
+        projects.etag_cache.clear()
+        yield
+        projects.etag_cache.clear()
+
+    @pytest.fixture
+    def stored_project(self):
+        return {
+            "project_id": "proj_123456789abc",
+            "name": "Test Project",
+            "user_id": "test_user_123",
+            "team_members": [],
+            "created_at": datetime(2024, 1, 1, 12, 0, 0),
+            "updated_at": datetime(2024, 1, 2, 12, 0, 0),
+        }
+
+    def test_get_project_returns_etag(self, projects_client, mock_db_service, stored_project):
+        """Test project responses carry a strong ETag."""
+        mock_db_service.get_project.return_value = stored_project
+
+        response = projects_client.get("/api/v1/projects/proj_123456789abc")
+
+        assert response.status_code == 200
+        assert response.headers["etag"].startswith('"')
+        assert response.headers["cache-control"] == "private, no-cache"
+
+    def test_get_project_not_modified_from_cache(self, projects_client, mock_db_service, stored_project):
+        """Test a matching If-None-Match is answered without reading DynamoDB."""
+        mock_db_service.get_project.return_value = stored_project
+        etag = projects_client.get("/api/v1/projects/proj_123456789abc").headers["etag"]
+        mock_db_service.get_project.reset_mock()
+
+        response = projects_client.get(
+            "/api/v1/projects/proj_123456789abc",
+            headers={"If-None-Match": etag}
+        )
+
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+        assert response.content == b""
+        mock_db_service.get_project.assert_not_called()
+
+    def test_get_project_not_modified_after_cache_expiry(self, projects_client, mock_db_service, stored_project):
+        """Test a matching If-None-Match still gets a 304 once the cache entry is gone."""
+        mock_db_service.get_project.return_value = stored_project
+        etag = projects_client.get("/api/v1/projects/proj_123456789abc").headers["etag"]
+        projects.etag_cache.clear()
+        mock_db_service.get_project.reset_mock()
+
+        response = projects_client.get(
+            "/api/v1/projects/proj_123456789abc",
+            headers={"If-None-Match": f'W/{etag}, "other"'}
+        )
+
+        assert response.status_code == 304
+        mock_db_service.get_project.assert_called_once()
+
+    def test_update_changes_etag(self, projects_client, mock_db_service, stored_project):
+        """Test an update through this process invalidates the old ETag."""
+        mock_db_service.get_project.return_value = stored_project
+        old_etag = projects_client.get("/api/v1/projects/proj_123456789abc").headers["etag"]
+
+        updated_project = {**stored_project, "name": "Renamed", "updated_at": datetime(2024, 1, 3)}
+        mock_db_service.update_project.return_value = updated_project
+        response = projects_client.put("/api/v1/projects/proj_123456789abc", json={"name": "Renamed"})
+        assert response.headers["etag"] != old_etag
+
+        mock_db_service.get_project.return_value = updated_project
+        response = projects_client.get(
+            "/api/v1/projects/proj_123456789abc",
+            headers={"If-None-Match": old_etag}
+        )
+
+        assert response.status_code == 200
+        assert response.json()["name"] == "Renamed"
+
+    def test_cached_etag_respects_access(self, projects_client, mock_db_service, mock_auth_user, stored_project):
+        """Test cached metadata never answers for users without access."""
+        mock_db_service.get_project.return_value = stored_project
+        etag = projects_client.get("/api/v1/projects/proj_123456789abc").headers["etag"]
+
+        mock_auth_user["user_id"] = "other_user_456"
+        response = projects_client.get(
+            "/api/v1/projects/proj_123456789abc",
+            headers={"If-None-Match": etag}
+        )
+
+        assert response.status_code == 403
+
+    def test_list_projects_not_modified(self, projects_client, mock_db_service, stored_project):
+        """Test list ETags follow the page contents."""
+        mock_db_service.list_projects.return_value = {
+            "items": [stored_project],
+            "last_evaluated_key": None,
+            "count": 1,
+        }
+        etag = projects_client.get("/api/v1/projects/").headers["etag"]
+
+        response = projects_client.get("/api/v1/projects/", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+
+        mock_db_service.list_projects.return_value["items"] = [
+            {**stored_project, "updated_at": datetime(2024, 1, 5)}
+        ]
+        response = projects_client.get("/api/v1/projects/", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
@@ -0,0 +1,83 @@
+import asyncio
+
+import orjson
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+
+from app.services.pubsub import InProcessPubSub, RedisPubSub
+
+
+class FakeRedisPubSub:
+    """Yields the given raw messages, then waits like an idle subscription."""
+
+    def __init__(self, messages):
+        self.messages = messages
+        self.subscribe = AsyncMock()
+        self.aclose = AsyncMock()
+
+    async def listen(self):
+        for message in self.messages:
+            yield {"type": "message", "data": message}
+        await asyncio.Event().wait()
+
+
+class TestInProcessPubSub:
+    """Test suite for the single-node event bus."""
+
+    @pytest.mark.asyncio
+    async def test_publish_reaches_handler(self):
+        """Test events are handed to the started handler."""
+        handler = Mock()
+        pubsub = InProcessPubSub()
+        await pubsub.start(handler)
+
+        await pubsub.publish("channel_1", {"type": "message"})
+
+        handler.assert_called_once_with("channel_1", {"type": "message"})
+
+    @pytest.mark.asyncio
+    async def test_publish_before_start_is_dropped(self):
+        """Test publishing without a consumer does not fail."""
+        await InProcessPubSub().publish("channel_1", {"type": "message"})
+
+
+class TestRedisPubSub:
+    """Test suite for the Redis-backed event bus."""
+
+    @pytest.fixture
+    def redis_client(self):
+        """Patch the Redis client the bus connects with."""
+        client = Mock()
+        client.publish = AsyncMock()
+        client.aclose = AsyncMock()
+        with patch("redis.asyncio.Redis.from_url", return_value=client):
+            yield client
+
+    @pytest.mark.asyncio
+    async def test_publish_sends_channel_and_payload(self, redis_client):
+        """Test events are published to the shared topic with their channel."""
+        pubsub = RedisPubSub("redis://localhost", "events")
+
+        await pubsub.publish("channel_1", {"type": "message", "data": {"content": "hi"}})
+
+        topic, data = redis_client.publish.call_args.args
+        assert topic == "events"
+        assert orjson.loads(data) == ["channel_1", {"type": "message", "data": {"content": "hi"}}]
+
+    @pytest.mark.asyncio
+    async def test_events_from_other_nodes_reach_handler(self, redis_client):
+        """Test received events are delivered and malformed ones are skipped."""
+        redis_client.pubsub.return_value = FakeRedisPubSub([
+            b"not json",
+            orjson.dumps(["channel_1", {"n": 1}]),
+        ])
+        handler = Mock()
+        pubsub = RedisPubSub("redis://localhost", "events")
+
+        await pubsub.start(handler)
+        await asyncio.sleep(0.01)
+        await pubsub.stop()
+
+        handler.assert_called_once_with("channel_1", {"n": 1})
+        redis_client.pubsub.return_value.subscribe.assert_awaited_once_with("events")
+        redis_client.aclose.assert_awaited_once()
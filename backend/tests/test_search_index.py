@@ -0,0 +1,273 @@
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.services.search import get_search_index
+from app.utils.search_index import SearchIndex, _append_posting, _decode, tokenize
+
+
+def message(message_id, content):
+    return {"message_id": message_id, "content": content}
+
+
+def ids(result):
+    return [hit["message_id"] for hit in result["hits"]]
+
+
+class TestTokenize:
+    """Test suite for index term extraction."""
+
+    def test_words_are_normalized(self):
+        """Test words are lowercased and full-width forms folded."""
+        assert tokenize("Deploy the ＡＰＩ, then deploy!") == ["deploy", "the", "api", "then", "deploy"]
+
+    def test_cjk_runs_become_bigrams(self):
+        """Test text without spaces is split into overlapping character pairs."""
+        assert tokenize("設計レビュー ok") == ["設計", "計レ", "レビ", "ビュ", "ュー", "ok"]
+        assert tokenize("字") == ["字"]
+
+    def test_overlong_words_are_skipped(self):
+        """Test tokens longer than any real word are not indexed."""
+        assert tokenize("a" * 100 + " short") == ["short"]
+
+
+class TestPostings:
+    """Test suite for the compact posting list encoding."""
+
+    def test_round_trip(self):
+        """Test documents and term frequencies decode as appended, including large gaps."""
+        entries = [(0, 1), (1, 3), (200, 1), (70000, 2), (70001, 1)]
+        data = None
+        for doc, tf in entries:
+            data = _append_posting(data, doc, tf)
+
+        assert list(_decode(data)) == entries
+
+    def test_small_gaps_take_one_byte(self):
+        """Test a posting with a small gap and frequency one is a single byte."""
+        data = _append_posting(None, 0, 1)
+        grown = _append_posting(data, 5, 1)
+
+        assert len(grown) - len(data) == 1
+
+    def test_long_lists_grow_in_place(self):
+        """Test large posting lists are appended to without copying."""
+        data = None
+        for doc in range(100):
+            data = _append_posting(data, doc, 1)
+
+        assert isinstance(data, bytearray)
+        assert _append_posting(data, 100, 1) is data
+        assert [doc for doc, _ in _decode(data)] == list(range(101))
+
+
+class TestSearchIndex:
+    """Test suite for ranked message search."""
+
+    def test_ranks_by_relevance(self):
+        """Test messages using a query term more often, and rarer terms, rank higher."""
+        index = SearchIndex()
+        index.add("channel_1", message("msg_1", "deploy the api"))
+        index.add("channel_1", message("msg_2", "api api api review"))
+        index.add("channel_1", message("msg_3", "lunch plans"))
+        index.add("channel_1", message("msg_4", "api rollback plan"))
+
+        result = index.search("api rollback", ["channel_1"])
+
+        assert result["total"] == 3
+        assert ids(result)[0] == "msg_4"
+        assert ids(result)[1] == "msg_2"
+
+    def test_searches_only_given_channels(self):
+        """Test messages of other channels are never returned."""
+        index = SearchIndex()
+        index.add("channel_1", message("msg_1", "release notes"))
+        index.add("channel_2", message("msg_2", "release date"))
+        index.add("channel_3", message("msg_3", "release party"))
+
+        assert ids(index.search("release", ["channel_1"])) == ["msg_1"]
+        assert sorted(ids(index.search("release", ["channel_1", "channel_3", "unknown"]))) == ["msg_1", "msg_3"]
+
+    def test_pages_through_ranked_results(self):
+        """Test offset and limit slice one stable ranking, newest first on ties."""
+        index = SearchIndex()
+        for i in range(5):
+            index.add("channel_1", message(f"msg_{i}", "status update"))
+
+        first = index.search("status", ["channel_1"], offset=0, limit=2)
+        second = index.search("status", ["channel_1"], offset=2, limit=2)
+
+        assert first["total"] == 5
+        assert ids(first) == ["msg_4", "msg_3"]
+        assert ids(second) == ["msg_2", "msg_1"]
+
+    def test_japanese_query_matches(self):
+        """Test CJK queries match messages containing the same character pairs."""
+        index = SearchIndex()
+        index.add("channel_1", message("msg_1", "デプロイが完了しました"))
+        index.add("channel_1", message("msg_2", "設計レビューを実施"))
+
+        assert ids(index.search("デプロイ", ["channel_1"])) == ["msg_1"]
+
+    def test_unknown_terms_match_nothing(self):
+        """Test a query without indexed terms returns no hits."""
+        index = SearchIndex()
+        index.add("channel_1", message("msg_1", "hello"))
+
+        assert index.search("goodbye", ["channel_1"]) == {"total": 0, "hits": []}
+        assert index.search("!!!", ["channel_1"]) == {"total": 0, "hits": []}
+
+    def test_backfill_skips_messages_already_added(self):
+        """Test a message seen live and by the backfill scan is indexed once."""
+        index = SearchIndex()
+        index.begin_backfill()
+        index.add("channel_1", message("msg_2", "new message"))
+        index.add_existing("channel_1", message("msg_1", "old message"))
+        index.add_existing("channel_1", message("msg_2", "new message"))
+        index.end_backfill()
+
+        assert index.search("message", ["channel_1"])["total"] == 2
+        assert index.stats()["messages"] == 2
+
+    @pytest.mark.asyncio
+    async def test_async_search_yields_between_channels(self):
+        """Test messages added while an async search yields are indexed without disturbing it."""
+        index = SearchIndex()
+        for i in range(3):
+            index.add(f"channel_{i}", message(f"msg_{i}", "deploy status"))
+
+        async def add_during_search():
+            for i in range(3):
+                index.add(f"channel_{i}", message(f"msg_new_{i}", "deploy " * 50))
+                await asyncio.sleep(0)
+
+        writer = asyncio.create_task(add_during_search())
+        result = await index.search_async("deploy", ["channel_0", "channel_1", "channel_2"], limit=10)
+        await writer
+
+        assert {"msg_0", "msg_1", "msg_2"} <= set(ids(result))
+        assert result["total"] == len(result["hits"])
+        assert index.search("deploy", ["channel_0", "channel_1", "channel_2"], limit=10)["total"] == 6
+
+    def test_removed_messages_not_returned(self):
+        """Test removed messages no longer match or count towards the total."""
+        index = SearchIndex()
+        index.add("channel_1", message("msg_1", "release notes"))
+        index.add("channel_1", message("msg_2", "release date"))
+
+        index.remove("channel_1", ["msg_1"])
+        index.remove("unknown", ["msg_2"])
+
+        result = index.search("release", ["channel_1"])
+        assert result["total"] == 1
+        assert ids(result) == ["msg_2"]
+
+
+class TestSearchRoute:
+    """Test suite for GET /messages/search."""
+
+    @pytest.fixture
+    def search_index(self):
+        index = SearchIndex()
+        index.add("channel_1", message("msg_1", "deploy the api"))
+        index.add("channel_2", message("msg_2", "api review"))
+        return index
+
+    @pytest.fixture
+    def search_client(self, messages_client, search_index):
+        """Messages client with the search index overridden."""
+        messages_client.app.dependency_overrides[get_search_index] = lambda: search_index
+        return messages_client
+
+    def _stored(self, keys):
+        return [
+            {
+                "message_id": key["message_id"], "channel_id": key["channel_id"], "sender_id": "user_1",
+                "sender_name": "User", "content": "...", "timestamp": "2024-01-01T00:00:00"
+            }
+            for key in keys
+        ]
+
+    @pytest.fixture(autouse=True)
+    def own_project(self, mock_db_service, mock_auth_user):
+        mock_db_service.get_project.return_value = {"project_id": "proj_1", "user_id": mock_auth_user["user_id"]}
+
+    def test_search_project_channels(self, search_client, mock_db_service):
+        """Test a project search covers its channels and returns stored messages with scores."""
+        mock_db_service.get_project_channel_ids.return_value = ["channel_1", "channel_2"]
+        mock_db_service.batch_get_messages.side_effect = self._stored
+
+        response = search_client.get(f"{settings.api_v1_prefix}/messages/search", params={"q": "api", "project_id": "proj_1"})
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["total"] == 2
+        assert body["has_next"] is False
+        assert {r["message"]["message_id"] for r in body["results"]} == {"msg_1", "msg_2"}
+        assert all(r["score"] > 0 for r in body["results"])
+
+    def test_search_drops_unreadable_hits(self, search_client, mock_db_service, search_index):
+        """Test hits whose message cannot be read are left out of the total and removed from the index."""
+        mock_db_service.get_project_channel_ids.return_value = ["channel_1", "channel_2"]
+        mock_db_service.batch_get_messages.side_effect = lambda keys: self._stored([k for k in keys if k["message_id"] != "msg_1"])
+
+        response = search_client.get(f"{settings.api_v1_prefix}/messages/search", params={"q": "api", "project_id": "proj_1"})
+
+        assert response.status_code == 200
+        assert response.json()["total"] == 1
+        assert [r["message"]["message_id"] for r in response.json()["results"]] == ["msg_2"]
+        assert ids(search_index.search("api", ["channel_1", "channel_2"])) == ["msg_2"]
+
+    def test_search_channel_outside_project(self, search_client, mock_db_service):
+        """Test a channel filter is limited to the project's channels."""
+        mock_db_service.get_project_channel_ids.return_value = ["channel_2"]
+
+        response = search_client.get(
+            f"{settings.api_v1_prefix}/messages/search",
+            params={"q": "deploy", "project_id": "proj_1", "channel_id": "channel_1"}
+        )
+
+        assert response.status_code == 200
+        assert response.json()["total"] == 0
+        mock_db_service.batch_get_messages.assert_not_called()
+
+    def test_search_other_users_project_denied(self, search_client, mock_db_service):
+        """Test a project search needs access to the project, like the projects routes."""
+        mock_db_service.get_project.return_value = {"project_id": "proj_1", "user_id": "someone_else", "team_members": []}
+
+        response = search_client.get(f"{settings.api_v1_prefix}/messages/search", params={"q": "api", "project_id": "proj_1"})
+
+        assert response.status_code == 403
+        mock_db_service.get_project_channel_ids.assert_not_called()
+
+    def test_search_unknown_project(self, search_client, mock_db_service):
+        """Test a project search for a missing project is a 404."""
+        mock_db_service.get_project.return_value = None
+
+        response = search_client.get(f"{settings.api_v1_prefix}/messages/search", params={"q": "api", "project_id": "proj_1"})
+
+        assert response.status_code == 404
+
+    def test_search_channel_checks_its_project(self, search_client, mock_db_service, mock_auth_user):
+        """Test a channel-only search needs access to the channel's project."""
+        mock_db_service.get_channel.return_value = {"channel_id": "channel_1", "project_id": "proj_2"}
+        mock_db_service.get_project.return_value = {"project_id": "proj_2", "user_id": "someone_else", "team_members": []}
+
+        response = search_client.get(f"{settings.api_v1_prefix}/messages/search", params={"q": "api", "channel_id": "channel_1"})
+
+        assert response.status_code == 403
+        mock_db_service.get_project.assert_called_with("proj_2")
+
+        mock_db_service.get_project.return_value["team_members"] = [mock_auth_user["user_id"]]
+        mock_db_service.batch_get_messages.side_effect = self._stored
+        response = search_client.get(f"{settings.api_v1_prefix}/messages/search", params={"q": "api", "channel_id": "channel_1"})
+
+        assert response.status_code == 200
+        assert [r["message"]["message_id"] for r in response.json()["results"]] == ["msg_1"]
+
+    def test_search_requires_scope(self, search_client):
+        """Test searching needs a channel or project."""
+        response = search_client.get(f"{settings.api_v1_prefix}/messages/search", params={"q": "api"})
+
+        assert response.status_code == 400
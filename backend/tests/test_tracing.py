@@ -0,0 +1,140 @@
+import time
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.trace import Status, StatusCode, set_span_in_context
+
+from app.services.dynamodb import DynamoDBService
+from app.utils.tracing import TailSamplingSpanProcessor
+
+
+def make_provider(**tail_options):
+    exporter = InMemorySpanExporter()
+    processor = SimpleSpanProcessor(exporter)
+    if tail_options:
+        processor = TailSamplingSpanProcessor(processor, **tail_options)
+    provider = TracerProvider()
+    provider.add_span_processor(processor)
+    return provider, exporter
+
+
+class TestTailSampling:
+    """Test suite for whole-trace tail sampling."""
+
+    def test_fast_successful_traces_dropped(self):
+        """Test unremarkable traces are dropped at a zero baseline rate."""
+        provider, exporter = make_provider(slow_threshold_ms=1000, baseline_rate=0.0)
+        tracer = provider.get_tracer(__name__)
+
+        with tracer.start_as_current_span("request"):
+            with tracer.start_as_current_span("DynamoDB.get_item"):
+                pass
+
+        assert exporter.get_finished_spans() == ()
+
+    def test_error_traces_kept_whole(self):
+        """Test an error in any span keeps the complete trace."""
+        provider, exporter = make_provider(slow_threshold_ms=1000, baseline_rate=0.0)
+        tracer = provider.get_tracer(__name__)
+
+        with tracer.start_as_current_span("request"):
+            with tracer.start_as_current_span("DynamoDB.query") as child:
+                child.set_status(Status(StatusCode.ERROR))
+
+        names = [span.name for span in exporter.get_finished_spans()]
+        assert names == ["DynamoDB.query", "request"]
+
+    def test_slow_traces_kept(self):
+        """Test traces slower than the threshold are kept."""
+        provider, exporter = make_provider(slow_threshold_ms=10, baseline_rate=0.0)
+        tracer = provider.get_tracer(__name__)
+
+        with tracer.start_as_current_span("request"):
+            time.sleep(0.02)
+
+        assert [span.name for span in exporter.get_finished_spans()] == ["request"]
+
+    def test_baseline_rate_keeps_normal_traces(self):
+        """Test the baseline rate samples ordinary traces."""
+        provider, exporter = make_provider(slow_threshold_ms=1000, baseline_rate=1.0)
+        tracer = provider.get_tracer(__name__)
+
+        with tracer.start_as_current_span("request"):
+            pass
+
+        assert len(exporter.get_finished_spans()) == 1
+
+    def test_pending_traces_bounded(self):
+        """Test unfinished traces cannot grow the buffer without bound."""
+        processor = TailSamplingSpanProcessor(
+            SimpleSpanProcessor(InMemorySpanExporter()),
+            max_pending_traces=10
+        )
+        provider = TracerProvider()
+        provider.add_span_processor(processor)
+        tracer = provider.get_tracer(__name__)
+
+        # Children end while their roots stay open, so every trace stays pending
+        for _ in range(50):
+            root = tracer.start_span("request")
+            tracer.start_span("child", context=set_span_in_context(root)).end()
+
+        assert len(processor._pending) <= 11
+
+
+class TestDynamoDBSpans:
+    """Test suite for DynamoDB operation spans."""
+
+    @pytest.fixture
+    def traced(self):
+        provider, exporter = make_provider()
+        with patch("app.services.dynamodb.tracer", provider.get_tracer("app.services.dynamodb")):
+            yield provider, exporter
+
+    @pytest.mark.asyncio
+    async def test_query_span_attributes(self, traced):
+        """Test table, operation, capacity and item counts are recorded."""
+        _, exporter = traced
+        db_service = DynamoDBService()
+
+        with patch.object(db_service.projects_table, 'query') as mock_query:
+            mock_query.return_value = {
+                "Items": [],
+                "Count": 0,
+                "ScannedCount": 7,
+                "ConsumedCapacity": {"TableName": db_service.projects_table.name, "CapacityUnits": 0.5},
+            }
+            await db_service.list_projects(user_id="test_user_123", status="active")
+
+        span = exporter.get_finished_spans()[0]
+        assert span.name == "DynamoDB.query"
+        assert span.attributes["db.system"] == "dynamodb"
+        assert span.attributes["aws.dynamodb.table_names"] == (db_service.projects_table.name,)
+        assert span.attributes["aws.dynamodb.index_name"] == "user-projects-index"
+        assert span.attributes["aws.dynamodb.count"] == 0
+        assert span.attributes["aws.dynamodb.scanned_count"] == 7
+        assert '"CapacityUnits": 0.5' in span.attributes["aws.dynamodb.consumed_capacity"][0]
+
+    def test_request_span_parents_dynamodb_span(self, traced):
+        """Test DynamoDB spans nest under the instrumented request span."""
+        provider, exporter = traced
+        db_service = DynamoDBService()
+        test_app = FastAPI()
+
+        @test_app.get("/projects/{project_id}")
+        async def get_project(project_id: str):
+            return await db_service.get_project(project_id)
+
+        FastAPIInstrumentor.instrument_app(test_app, tracer_provider=provider)
+        with patch.object(db_service.projects_table, 'get_item', return_value={}):
+            TestClient(test_app).get("/projects/p1")
+
+        spans = {span.name: span for span in exporter.get_finished_spans()}
+        server_span = spans["GET /projects/{project_id}"]
+        assert spans["DynamoDB.get_item"].parent.span_id == server_span.context.span_id
@@ -1,19 +1,138 @@
 import json
+import os
+import time
 import boto3
+import codecs
+import contextlib
 import logging
-from typing import Dict, Any
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from typing import Dict, Any, Iterator, Optional
 import uuid
 
+try:
+    from opentelemetry import trace
+except ImportError:  # Tracing comes from the ADOT Lambda layer when enabled
+    trace = None
+
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-bedrock_agent = boto3.client('bedrock-agent-runtime')
+BEDROCK_CONNECT_TIMEOUT = float(os.environ.get('BEDROCK_CONNECT_TIMEOUT', 2))
+BEDROCK_READ_TIMEOUT = float(os.environ.get('BEDROCK_READ_TIMEOUT', 30))  # Longest gap between stream chunks
+BEDROCK_MAX_ATTEMPTS = int(os.environ.get('BEDROCK_MAX_ATTEMPTS', 3))
+RETRY_BUDGET_SECONDS = float(os.environ.get('BEDROCK_RETRY_BUDGET', 10))  # Less time left: no retries
+DEADLINE_MARGIN_SECONDS = 1.0  # Kept back to build and return the response
+PM_AGENT_ID = os.environ.get('PM_AGENT_ID')  # Unset: answer with the built-in mock responses
+
+
+def create_bedrock_client(max_attempts: int):
+    return boto3.client('bedrock-agent-runtime', config=Config(
+        connect_timeout=BEDROCK_CONNECT_TIMEOUT,
+        read_timeout=BEDROCK_READ_TIMEOUT,
+        retries={'total_max_attempts': max_attempts, 'mode': 'standard'}
+    ))
+
+
+bedrock_agent = create_bedrock_client(BEDROCK_MAX_ATTEMPTS)
+bedrock_agent_last_attempt = None
+tracer = trace.get_tracer(__name__) if trace else None
+
+
+class CircuitOpenError(Exception):
+    """Bedrock is failing; the call was not attempted"""
+
+
+class CircuitBreaker:
+    """Per-container circuit breaker; its state carries over between warm invocations.
+
+    Opens after ``failure_threshold`` consecutive throttling/5xx/connection
+    errors, fails fast for ``recovery_timeout`` seconds, then lets one trial
+    call through (half-open) to decide whether to close again.
+    """
+
+    RETRYABLE_CODES = {'ThrottlingException', 'ServiceQuotaExceededException', 'InternalServerException',
+                       'DependencyFailedException', 'BadGatewayException', 'ModelNotReadyException'}
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+
+    def before_call(self):
+        if self.state == 'open':
+            if time.monotonic() - self.opened_at < self.recovery_timeout:
+                raise CircuitOpenError(f"{self.name} circuit is open")
+            self._set_state('half_open')
+
+    def record_success(self):
+        self.failures = 0
+        if self.state != 'closed':
+            self._set_state('closed')
+
+    def record_failure(self, error: Exception):
+        if isinstance(error, ClientError):
+            code = error.response.get('Error', {}).get('Code', '')
+            status_code = error.response.get('ResponseMetadata', {}).get('HTTPStatusCode', 0)
+            if code not in self.RETRYABLE_CODES and status_code < 500:
+                # The request was bad, Bedrock itself answered
+                self.record_success()
+                return
+        self.failures += 1
+        if self.state == 'half_open' or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            self._set_state('open')
+
+    def _set_state(self, state: str):
+        logger.warning(json.dumps({'event': 'circuit_breaker_state', 'dependency': self.name, 'state': state}))
+        self.state = state
+
+
+bedrock_breaker = CircuitBreaker(
+    'bedrock',
+    failure_threshold=int(os.environ.get('CIRCUIT_FAILURE_THRESHOLD', 5)),
+    recovery_timeout=float(os.environ.get('CIRCUIT_RECOVERY_TIMEOUT', 30))
+)
+
+
+def request_deadline(context) -> Optional[float]:
+    """Monotonic time by which this invocation must be done, from the Lambda timeout"""
+    if context is None or not hasattr(context, 'get_remaining_time_in_millis'):
+        return None
+    return time.monotonic() + context.get_remaining_time_in_millis() / 1000 - DEADLINE_MARGIN_SECONDS
+
+
+def client_for_deadline(deadline: Optional[float]):
+    """Use a client without retries when there is no time left to retry"""
+    global bedrock_agent_last_attempt
+
+    if deadline is None:
+        return bedrock_agent
+    left = deadline - time.monotonic()
+    if left <= 0:
+        raise TimeoutError("Invocation deadline exceeded before calling Bedrock")
+    if left >= RETRY_BUDGET_SECONDS:
+        return bedrock_agent
+    if bedrock_agent_last_attempt is None:
+        bedrock_agent_last_attempt = create_bedrock_client(1)
+    return bedrock_agent_last_attempt
+
+
+def start_span(name: str, **attributes):
+    """Start a client span, or do nothing when OpenTelemetry is unavailable"""
+    if tracer is None:
+        return contextlib.nullcontext()
+    return tracer.start_as_current_span(name, kind=trace.SpanKind.CLIENT, attributes=attributes)
 
 
 def lambda_handler(event: Dict[str, Any], context) -> Dict[str, Any]:
     """
     Lambda handler for PM Agent invocation
     """
+    deadline = request_deadline(context)
     try:
         logger.info(f"PM Agent invoked with event: {json.dumps(event)}")
         
@@ -24,9 +143,10 @@ def lambda_handler(event: Dict[str, Any], context) -> Dict[str, Any]:
         user_message = body.get('message', '')
         session_id = body.get('session_id', str(uuid.uuid4()))
         
-        # Mock PM Agent response for now
-        # In production, this would invoke Bedrock Agent
-        response = generate_pm_response(project_data, user_message)
+        if PM_AGENT_ID:
+            response = invoke_bedrock_agent(PM_AGENT_ID, session_id, user_message, deadline)
+        else:
+            response = generate_pm_response(project_data, user_message)
         
         return {
             'statusCode': 200,
@@ -45,6 +165,20 @@ def lambda_handler(event: Dict[str, Any], context) -> Dict[str, Any]:
             })
         }
         
+    except TimeoutError as e:
+        logger.error(f"PM Agent ran out of time: {str(e)}")
+        return {
+            'statusCode': 504,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*'
+            },
+            'body': json.dumps({
+                'error': 'Gateway timeout',
+                'message': str(e)
+            })
+        }
+    
     except Exception as e:
         logger.error(f"Error in PM Agent: {str(e)}")
         return {
@@ -170,28 +304,87 @@ def generate_pm_response(project_data: Dict[str, Any], user_message: str) -> Dic
         }
 
 
-def invoke_bedrock_agent(agent_id: str, session_id: str, input_text: str) -> Dict[str, Any]:
+def stream_bedrock_agent(
+    agent_id: str,
+    session_id: str,
+    input_text: str,
+    deadline: Optional[float] = None
+) -> Iterator[str]:
     """
-    Invoke Bedrock Agent (for production use)
+    Yield the agent's answer text chunk by chunk as Bedrock streams it
+    
+    ``deadline`` (see request_deadline) bounds the whole call including the
+    response stream; a stream still running at the deadline is abandoned.
+    Closing the generator early closes the Bedrock stream.
     """
-    try:
-        response = bedrock_agent.invoke_agent(
-            agentId=agent_id,
-            agentAliasId='TSTALIASID',
-            sessionId=session_id,
-            inputText=input_text
-        )
-        
-        # Process the response stream
-        result = ''
-        for event in response['completion']:
-            if 'chunk' in event:
-                chunk = event['chunk']
-                if 'bytes' in chunk:
-                    result += chunk['bytes'].decode('utf-8')
-        
-        return {'message': result}
-        
-    except Exception as e:
-        logger.error(f"Error invoking Bedrock Agent: {str(e)}")
-        raise
\ No newline at end of file
+    with start_span(
+        "Bedrock.InvokeAgent",
+        **{
+            "gen_ai.system": "aws.bedrock",
+            "aws.bedrock.agent_id": agent_id,
+            "aws.bedrock.session_id": session_id,
+        }
+    ) as span:
+        # Out of time before the call: not Bedrock's fault, so outside the breaker
+        client = client_for_deadline(deadline)
+        try:
+            bedrock_breaker.before_call()
+            response = client.invoke_agent(
+                agentId=agent_id,
+                agentAliasId='TSTALIASID',
+                sessionId=session_id,
+                inputText=input_text
+            )
+            
+            # Process the response stream; a character may be split across chunks
+            decoder = codecs.getincrementaldecoder('utf-8')()
+            chunk_count = 0
+            response_length = 0
+            stream = response['completion']
+            try:
+                for event in stream:
+                    if deadline is not None and time.monotonic() > deadline:
+                        raise TimeoutError(f"Bedrock stream exceeded the deadline after {chunk_count} chunks")
+                    if 'chunk' in event:
+                        chunk = event['chunk']
+                        if 'bytes' in chunk:
+                            if span is not None and chunk_count == 0:
+                                span.add_event("first_chunk")
+                            chunk_count += 1
+                            text = decoder.decode(chunk['bytes'])
+                            response_length += len(text)
+                            if text:
+                                yield text
+                text = decoder.decode(b'', final=True)
+                if text:
+                    yield text
+            finally:
+                stream.close()
+            
+            bedrock_breaker.record_success()
+            if span is not None:
+                span.set_attribute("aws.bedrock.chunk_count", chunk_count)
+                span.set_attribute("aws.bedrock.response_length", response_length)
+            
+        except CircuitOpenError:
+            logger.warning("Bedrock circuit open, failing fast")
+            raise
+        except GeneratorExit:
+            # The caller stopped reading; Bedrock did nothing wrong
+            raise
+        except Exception as e:
+            bedrock_breaker.record_failure(e)
+            logger.error(f"Error invoking Bedrock Agent: {str(e)}")
+            raise
+
+
+def invoke_bedrock_agent(
+    agent_id: str,
+    session_id: str,
+    input_text: str,
+    deadline: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Invoke Bedrock Agent (for production use) and wait for the whole answer
+    """
+    return {'message': ''.join(stream_bedrock_agent(agent_id, session_id, input_text, deadline))}